@@ -4,25 +4,50 @@
 Usage:
   python3 AppStore/audit_png_assets.py
   python3 AppStore/audit_png_assets.py --contact-sheet /tmp/untwist_assets.png
+
+Any folder of PNGs works (e.g. AppStore/screenshots or a Social images/
+tree); --jobs N decodes on N worker processes with at most N images
+resident at once; the contact sheet is streamed in row bands with its
+thumbnails made on the same number of workers. --fast only reads PNG
+headers (IHDR, tRNS) to check scale coverage, 1x/2x sizes against the
+largest scale (rounded as the exporters round them) and Contents.json, decodes just the flagged files, prints the findings and
+exits non-zero on errors (suitable as a pre-commit gate).
+
+--optimize first recompresses every PNG losslessly in place (see
+optimize_png_assets.py) and adds the byte savings to the report.
+
+Per-file stats are cached in AppStore/.png_audit_cache.sqlite3 (keyed by
+path, size, mtime and content hash), so unchanged files are not decoded
+again and the report lists what changed since the previous audit.
 """
 
 from __future__ import annotations
 
 import argparse
 import datetime as dt
+import hashlib
 import json
+import sqlite3
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 try:
-    from PIL import Image, ImageDraw
+    import numpy as np
+    from PIL import Image
 except Exception as exc:  # pragma: no cover
     raise SystemExit(
-        "Pillow is required. Install with: python3 -m pip install pillow\n"
+        "Pillow and NumPy are required. Install with: python3 -m pip install pillow numpy\n"
         f"Import error: {exc}"
     )
 
+from export_asset_scales import resized_size
+from optimize_png_assets import OptimizeResult, optimization_lines, optimize_files
+from render_kit import AUDIT_SHEET, make_contact_sheet
+
 
 @dataclass
 class AssetStat:
@@ -37,6 +62,43 @@ class AssetStat:
     margins: tuple[int, int, int, int]  # left, right, top, bottom
 
 
+@dataclass
+class PngHeader:
+    path: Path
+    width: int
+    height: int
+    bit_depth: int
+    color_type: int
+    has_trns: bool
+
+    @property
+    def has_alpha(self) -> bool:
+        return self.color_type in (4, 6) or self.has_trns
+
+
+@dataclass
+class Issue:
+    level: str  # "error" or "warning"
+    path: Path
+    message: str
+
+
+@dataclass
+class CachedStat:
+    size: int
+    mtime_ns: int
+    sha256: str
+    stat: AssetStat
+
+
+@dataclass
+class AssetChange:
+    key: str  # imageset/name
+    kind: str  # "added", "removed" or "changed"
+    old: AssetStat | None
+    new: AssetStat | None
+
+
 def parse_args() -> argparse.Namespace:
     here = Path(__file__).resolve().parent
     default_assets = (here.parent / "Untwist" / "Resources" / "Assets.xcassets").resolve()
@@ -52,6 +114,35 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Optional image output path for a checkerboard contact sheet",
     )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=(here / ".png_audit_cache.sqlite3").resolve(),
+        help="SQLite stat cache (default: AppStore/.png_audit_cache.sqlite3)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Decode on N worker processes (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Header-only structural checks; decode only flagged files, exit 1 on errors",
+    )
+    parser.add_argument(
+        "--scale-tolerance",
+        type=int,
+        default=0,
+        help="Pixels a 1x/2x size may differ from the largest scale, rounded, in --fast (default: 0)",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Losslessly recompress the PNGs in place before auditing; adds a savings section",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Decode every file and leave the cache untouched")
     return parser.parse_args()
 
 
@@ -59,31 +150,47 @@ def png_files(assets_root: Path) -> list[Path]:
     return sorted(assets_root.rglob("*.png"))
 
 
-def file_stats(path: Path) -> AssetStat:
-    img = Image.open(path).convert("RGBA")
+# Images above STRIP_PIXELS are converted and counted STRIP_ROWS rows at a
+# time, so only the decoded source plus one RGBA strip is resident.
+STRIP_PIXELS = 8_000_000
+STRIP_ROWS = 512
+
+
+def _strips(img: Image.Image) -> Iterator[np.ndarray]:
+    """RGBA pixel arrays covering the image top to bottom."""
     w, h = img.size
-    total = w * h
-    data = list(img.getdata())
-
-    transparent = 0
-    opaque = 0
-    partial = 0
-    white_partial = 0
-
-    for r, g, b, a in data:
-        if a == 0:
-            transparent += 1
-        elif a == 255:
-            opaque += 1
-        else:
-            partial += 1
-            if r > 220 and g > 220 and b > 220:
-                white_partial += 1
-
-    alpha_bbox = img.getchannel("A").getbbox()
-    if alpha_bbox:
-        l, t, r, b = alpha_bbox
-        margins = (l, w - r, t, h - b)
+    if w * h <= STRIP_PIXELS:
+        yield np.asarray(img.convert("RGBA"))
+        return
+    img.load()
+    for y in range(0, h, STRIP_ROWS):
+        yield np.asarray(img.crop((0, y, w, min(h, y + STRIP_ROWS))).convert("RGBA"))
+
+
+def file_stats(path: Path) -> AssetStat:
+    with Image.open(path) as img:
+        w, h = img.size
+        total = w * h
+        transparent = 0
+        partial = 0
+        white_partial = 0
+        cols_used = np.zeros(w, dtype=bool)
+        rows_used = []
+
+        for pixels in _strips(img):
+            # One (rows, w, 4) uint8 array instead of a Python tuple per pixel.
+            alpha = pixels[..., 3]
+            transparent += int(np.count_nonzero(alpha == 0))
+            partial_mask = (alpha != 0) & (alpha != 255)
+            partial += int(np.count_nonzero(partial_mask))
+            white_partial += int(np.count_nonzero((pixels[partial_mask][:, :3] > 220).all(axis=1)))
+            cols_used |= alpha.any(axis=0)
+            rows_used.append(alpha.any(axis=1))
+
+    cols = np.flatnonzero(cols_used)
+    rows = np.flatnonzero(np.concatenate(rows_used))
+    if cols.size:
+        margins = (int(cols[0]), w - 1 - int(cols[-1]), int(rows[0]), h - 1 - int(rows[-1]))
     else:
         margins = (0, 0, 0, 0)
 
@@ -100,6 +207,283 @@ def file_stats(path: Path) -> AssetStat:
     )
 
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def png_header(path: Path) -> PngHeader:
+    """Read IHDR and look for tRNS without decoding any pixel data."""
+    with path.open("rb") as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError("not a PNG file")
+        length, ctype = struct.unpack(">I4s", f.read(8))
+        if ctype != b"IHDR" or length != 13:
+            raise ValueError("missing IHDR chunk")
+        width, height, bit_depth, color_type = struct.unpack(">IIBB", f.read(10))
+        f.seek(3 + 4, 1)  # rest of IHDR + CRC
+        has_trns = False
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                break
+            length, ctype = struct.unpack(">I4s", head)
+            if ctype == b"tRNS":
+                has_trns = True
+                break
+            if ctype in (b"IDAT", b"IEND"):  # tRNS must precede the image data
+                break
+            f.seek(length + 4, 1)
+    return PngHeader(path, width, height, bit_depth, color_type, has_trns)
+
+
+def header_stat(header: PngHeader) -> AssetStat:
+    """The AssetStat file_stats gives for a PNG without alpha: fully opaque, no margins."""
+    path = header.path
+    return AssetStat(
+        path=path,
+        name=path.name,
+        imageset=path.parent.name,
+        width=header.width,
+        height=header.height,
+        transparent_pct=0.0,
+        partial_pct=0.0,
+        white_partial_pct=0.0,
+        margins=(0, 0, 0, 0),
+    )
+
+
+def _scale_factor(scale: str) -> int | None:
+    try:
+        return int(scale.rstrip("x"))
+    except ValueError:
+        return None
+
+
+def structure_issues(
+    assets_root: Path, headers: dict[Path, PngHeader], scale_tolerance: int = 0
+) -> list[Issue]:
+    """Contents.json / file agreement, exact 1x:2x:3x sizes and low-resolution masters."""
+    issues: list[Issue] = []
+    referenced: set[Path] = set()
+    masters: set[Path] = set()
+    for cjson in sorted(assets_root.glob("*.*set/Contents.json")):
+        folder = cjson.parent
+        try:
+            entries = json.loads(cjson.read_text()).get("images", [])
+        except Exception as exc:
+            issues.append(Issue("error", cjson, f"unreadable Contents.json: {exc}"))
+            continue
+
+        sized: list[tuple[int, PngHeader]] = []
+        for entry in entries:
+            if "filename" not in entry:
+                continue
+            path = folder / entry["filename"]
+            referenced.add(path)
+            header = headers.get(path)
+            if header is None:
+                issues.append(Issue("error", cjson, f"references missing file `{entry['filename']}`"))
+                continue
+            factor = _scale_factor(entry.get("scale", "1x"))
+            if factor is None:
+                issues.append(Issue("error", path, f"unknown scale `{entry.get('scale')}`"))
+                continue
+            if "size" in entry:  # app icons declare their point size
+                points = [float(v) for v in entry["size"].split("x")]
+                expected = (round(points[0] * factor), round(points[1] * factor))
+                if (header.width, header.height) != expected:
+                    issues.append(Issue(
+                        "error", path,
+                        f"is {header.width}x{header.height}, Contents.json says "
+                        f"{entry['size']}@{factor}x = {expected[0]}x{expected[1]}",
+                    ))
+                if folder.suffix == ".appiconset" and header.has_alpha:
+                    issues.append(Issue("warning", path, "app icon has an alpha channel"))
+                continue  # icon sizes are independent; no cross-scale ratio
+            sized.append((factor, header))
+
+        if len(sized) > 1:
+            # Smaller scales are downsampled from the largest and rounded
+            # (1024 -> 683 -> 341), so they are judged against it the way
+            # export_asset_scales.py sizes them, not against 1x.
+            base_factor, base = max(sized, key=lambda item: item[0])
+            for factor, header in sized:
+                ew, eh = resized_size((base.width, base.height), factor / base_factor)
+                if abs(header.width - ew) > scale_tolerance or abs(header.height - eh) > scale_tolerance:
+                    issues.append(Issue(
+                        "error", header.path,
+                        f"{factor}x is {header.width}x{header.height}, expected {ew}x{eh} "
+                        f"from {base_factor}x {base.width}x{base.height}",
+                    ))
+        if sized:  # smaller scales are small by design; judge the largest
+            masters.add(max(sized, key=lambda item: item[0])[1].path)
+
+    for path, header in headers.items():
+        if path.parent.suffix in (".imageset", ".appiconset") and path not in referenced:
+            issues.append(Issue("warning", path, "not referenced by Contents.json"))
+        if (path in masters or path not in referenced) and max(header.width, header.height) < 420:
+            issues.append(Issue("warning", path, f"low resolution {header.width}x{header.height} (<420)"))
+    return issues
+
+
+def fast_audit(assets_root: Path, files: list[Path], jobs: int = 1, scale_tolerance: int = 0) -> int:
+    """Header-only audit for pre-commit use. Returns the process exit code."""
+    started = time.perf_counter()
+    headers: dict[Path, PngHeader] = {}
+    issues: list[Issue] = []
+    for path in files:
+        try:
+            headers[path] = png_header(path)
+        except (OSError, ValueError, struct.error) as exc:
+            issues.append(Issue("error", path, f"unreadable PNG header: {exc}"))
+    issues += structure_issues(assets_root, headers, scale_tolerance)
+
+    flagged_paths = sorted({i.path for i in issues if i.path in headers})
+    to_decode = [p for p in flagged_paths if headers[p].has_alpha]
+    stats = {p: header_stat(headers[p]) for p in flagged_paths if not headers[p].has_alpha}
+    stats.update({s.path: s for s in iter_file_stats(to_decode, jobs)})
+
+    for issue in sorted(issues, key=lambda i: (i.level, i.path.as_posix())):
+        print(f"{issue.level.upper():7s} {issue.path.relative_to(assets_root)}: {issue.message}")
+    for path, s in sorted(stats.items()):
+        print(
+            f"  {path.relative_to(assets_root)}: partial {s.partial_pct:.2f}%, "
+            f"white partial {s.white_partial_pct:.2f}%, margins {s.margins}"
+        )
+    errors = sum(i.level == "error" for i in issues)
+    print(
+        f"Fast audit: {len(files)} headers, {len(to_decode)} decoded, {errors} error(s), "
+        f"{len(issues) - errors} warning(s) in {time.perf_counter() - started:.3f}s"
+    )
+    return 1 if errors else 0
+
+
+def iter_file_stats(paths: list[Path], jobs: int = 1) -> Iterator[AssetStat]:
+    """Yield file_stats for `paths` as they complete.
+
+    With jobs > 1 the files are spread over a process pool; each worker holds
+    one decoded image at a time, so at most `jobs` are resident.
+    """
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield file_stats(path)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for future in as_completed([pool.submit(file_stats, p) for p in paths]):
+            yield future.result()
+
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS asset_stats (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    transparent_pct REAL NOT NULL,
+    partial_pct REAL NOT NULL,
+    white_partial_pct REAL NOT NULL,
+    margin_left INTEGER NOT NULL,
+    margin_right INTEGER NOT NULL,
+    margin_top INTEGER NOT NULL,
+    margin_bottom INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def open_cache(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(CACHE_SCHEMA)
+    return conn
+
+
+def load_cache(conn: sqlite3.Connection, assets_root: Path) -> dict[str, CachedStat]:
+    """Cached stats keyed by path relative to the catalog."""
+    out: dict[str, CachedStat] = {}
+    for row in conn.execute("SELECT * FROM asset_stats"):
+        rel, size, mtime_ns, sha, w, h, transparent, partial, white_partial, *margins = row
+        path = assets_root / rel
+        out[rel] = CachedStat(
+            size=size,
+            mtime_ns=mtime_ns,
+            sha256=sha,
+            stat=AssetStat(
+                path=path,
+                name=path.name,
+                imageset=path.parent.name,
+                width=w,
+                height=h,
+                transparent_pct=transparent,
+                partial_pct=partial,
+                white_partial_pct=white_partial,
+                margins=tuple(margins),
+            ),
+        )
+    return out
+
+
+def cache_meta(conn: sqlite3.Connection, key: str) -> str | None:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def store_cache(conn: sqlite3.Connection, assets_root: Path, entries: dict[str, CachedStat]) -> None:
+    """Replace the cache with `entries` and stamp the catalog and audit time."""
+    rows = [
+        (rel, e.size, e.mtime_ns, e.sha256, e.stat.width, e.stat.height, e.stat.transparent_pct,
+         e.stat.partial_pct, e.stat.white_partial_pct, *e.stat.margins)
+        for rel, e in entries.items()
+    ]
+    with conn:
+        conn.execute("DELETE FROM asset_stats")
+        conn.executemany(f"INSERT INTO asset_stats VALUES ({', '.join('?' * 13)})", rows)
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            [("assets_root", str(assets_root)), ("last_audit", dt.datetime.now().isoformat(timespec="seconds"))],
+        )
+
+
+def cached_file_stats(
+    files: list[Path], assets_root: Path, previous: dict[str, CachedStat], jobs: int = 1
+) -> tuple[dict[str, CachedStat], list[AssetChange], int]:
+    """Stats for `files`, reusing `previous` where the file is unchanged.
+
+    Size + mtime match -> reused without reading the file; otherwise the
+    content hash decides. Returns (entries, changes vs. previous, reused count).
+    """
+    entries: dict[str, CachedStat] = {}
+    todo: dict[Path, tuple[str, int, int, str]] = {}
+    reused = 0
+    for path in files:
+        rel = path.relative_to(assets_root).as_posix()
+        st = path.stat()
+        old = previous.get(rel)
+        if old is not None and (old.size, old.mtime_ns) == (st.st_size, st.st_mtime_ns):
+            entries[rel] = old
+            reused += 1
+            continue
+        sha = hashlib.sha256(path.read_bytes()).hexdigest()
+        if old is not None and old.sha256 == sha:
+            entries[rel] = CachedStat(size=st.st_size, mtime_ns=st.st_mtime_ns, sha256=sha, stat=old.stat)
+            reused += 1
+        else:
+            todo[path] = (rel, st.st_size, st.st_mtime_ns, sha)
+
+    # Results stream in as workers finish; only the small AssetStat is kept.
+    changes: list[AssetChange] = []
+    for stat in iter_file_stats(list(todo), jobs):
+        rel, size, mtime_ns, sha = todo[stat.path]
+        old = previous.get(rel)
+        entries[rel] = CachedStat(size=size, mtime_ns=mtime_ns, sha256=sha, stat=stat)
+        changes.append(AssetChange(key=rel, kind="changed" if old else "added", old=old and old.stat, new=stat))
+        print(f"  + {rel} ({stat.width}x{stat.height})")
+    for rel in sorted(previous.keys() - entries.keys()):
+        changes.append(AssetChange(key=rel, kind="removed", old=previous[rel].stat, new=None))
+    return entries, changes, reused
+
+
 def scale_map(assets_root: Path) -> dict[str, list[str]]:
     out: dict[str, list[str]] = {}
     for cjson in sorted(assets_root.glob("*.imageset/Contents.json")):
@@ -131,6 +515,9 @@ def write_report(
     white_halo_risk: list[AssetStat],
     low_resolution: list[AssetStat],
     contact_sheet: Path | None,
+    changes: list[AssetChange] | None = None,
+    previous_audit: str | None = None,
+    optimization: list[OptimizeResult] | None = None,
 ) -> None:
     today = dt.date.today().isoformat()
 
@@ -149,7 +536,11 @@ def write_report(
     lines.append(f"2. High partial-alpha outliers: `{len(partial_outliers)}`.")
     lines.append(f"3. White-halo risk candidates: `{len(white_halo_risk)}`.")
     lines.append(f"4. Low-resolution candidates (<420 max dimension): `{len(low_resolution)}`.")
+    if changes is not None and previous_audit is not None:
+        lines.append(f"5. Changed since last audit ({previous_audit}): `{len(changes)}`.")
     lines.append("")
+    if changes is not None:
+        lines.extend(change_lines(changes, previous_audit))
     lines.append("## Scale Coverage")
     lines.append("")
     lines.append("| Imageset | Scales With Filename |")
@@ -189,6 +580,8 @@ def write_report(
             f"`{s.margins}` |"
         )
     lines.append("")
+    if optimization is not None:
+        lines.extend(optimization_lines(optimization, assets_root))
     lines.append("## Next Actions")
     lines.append("")
     lines.append("1. Replace manual/AI-exported images with master-source exports where possible.")
@@ -199,47 +592,35 @@ def write_report(
     output.write_text("\n".join(lines) + "\n")
 
 
-def make_contact_sheet(paths: list[Path], out_path: Path) -> None:
-    cell_w, cell_h = 300, 320
-    cols = 4
-    rows = (len(paths) + cols - 1) // cols
-    sheet = Image.new("RGB", (cols * cell_w + 40, rows * cell_h + 40), (18, 18, 24))
-    draw = ImageDraw.Draw(sheet)
-
-    for idx, p in enumerate(paths):
-        r = idx // cols
-        c = idx % cols
-        x = 20 + c * cell_w
-        y = 20 + r * cell_h
-
-        draw.rounded_rectangle(
-            (x, y, x + cell_w - 16, y + cell_h - 16),
-            radius=20,
-            fill=(34, 32, 48),
-            outline=(76, 72, 108),
-            width=2,
-        )
+def _delta(old: float | None, new: float | None) -> str:
+    if old is None:
+        return f"`{new:.2f}`"
+    if new is None:
+        return f"`{old:.2f}` -> -"
+    return f"`{old:.2f}` -> `{new:.2f}` ({new - old:+.2f})"
 
-        bg_x0, bg_y0 = x + 24, y + 24
-        bg_x1, bg_y1 = x + cell_w - 40, y + cell_h - 90
-        tile = 16
-        for yy in range(bg_y0, bg_y1, tile):
-            for xx in range(bg_x0, bg_x1, tile):
-                color = (58, 58, 70) if ((xx // tile + yy // tile) % 2 == 0) else (44, 44, 56)
-                draw.rectangle((xx, yy, min(xx + tile, bg_x1), min(yy + tile, bg_y1)), fill=color)
 
-        img = Image.open(p).convert("RGBA")
-        target_w = bg_x1 - bg_x0
-        target_h = bg_y1 - bg_y0
-        img.thumbnail((target_w, target_h), Image.Resampling.LANCZOS)
-        paste_x = bg_x0 + (target_w - img.width) // 2
-        paste_y = bg_y0 + (target_h - img.height) // 2
-        sheet.paste(img, (paste_x, paste_y), img)
-
-        draw.text((x + 24, y + cell_h - 60), p.stem, fill=(220, 218, 238))
-
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    sheet.save(out_path)
+def change_lines(changes: list[AssetChange], previous_audit: str | None) -> list[str]:
+    lines = ["## Changed Since Last Audit", ""]
+    if previous_audit is None:
+        return lines + ["_No previous audit in the cache; every file is new._", ""]
+    lines.append(f"Compared with the audit of {previous_audit}.")
+    lines.append("")
+    lines.append("| File | Change | Partial % | White Partial % | Margins (L,R,T,B) |")
+    lines.append("|---|---|---:|---:|---|")
+    for c in sorted(changes, key=lambda x: x.key):
+        old, new = c.old, c.new
+        margins = " -> ".join(f"`{s.margins}`" for s in (old, new) if s is not None)
+        shown = f"{(new or old).imageset}/{(new or old).name}"
+        lines.append(
+            f"| `{shown}` | {c.kind} | "
+            f"{_delta(old and old.partial_pct, new and new.partial_pct)} | "
+            f"{_delta(old and old.white_partial_pct, new and new.white_partial_pct)} | {margins} |"
+        )
+    if not changes:
+        lines.append("| _None_ | - | - | - | - |")
+    lines.append("")
+    return lines
 
 
 def main() -> None:
@@ -249,12 +630,43 @@ def main() -> None:
     contact_sheet: Path | None = args.contact_sheet.resolve() if args.contact_sheet else None
 
     files = png_files(assets_root)
-    stats = [file_stats(p) for p in files]
+    if args.fast:
+        raise SystemExit(fast_audit(assets_root, files, args.jobs, args.scale_tolerance))
+
+    optimization: list[OptimizeResult] | None = None
+    if args.optimize:
+        started = time.perf_counter()
+        optimization = optimize_files(files, write=True, jobs=args.jobs)
+        saved = sum(r.saved for r in optimization)
+        print(f"Optimized: saved {saved / 1024:,.1f} KB in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    changes: list[AssetChange] | None = None
+    previous_audit: str | None = None
+    if args.no_cache:
+        stats = sorted(iter_file_stats(files, args.jobs), key=lambda s: s.path)
+        print(f"Stats: {len(stats)} decoded in {time.perf_counter() - started:.3f}s")
+    else:
+        conn = open_cache(args.cache.resolve())
+        try:
+            previous: dict[str, CachedStat] = {}
+            if cache_meta(conn, "assets_root") == str(assets_root):  # a different catalog starts fresh
+                previous = load_cache(conn, assets_root)
+                previous_audit = cache_meta(conn, "last_audit")
+            entries, changes, reused = cached_file_stats(files, assets_root, previous, args.jobs)
+            store_cache(conn, assets_root, entries)
+        finally:
+            conn.close()
+        stats = [e.stat for _, e in sorted(entries.items())]
+        print(
+            f"Stats: {reused} cached, {len(files) - reused} decoded "
+            f"in {time.perf_counter() - started:.3f}s ({len(changes)} changed since last audit)"
+        )
     scale_info = scale_map(assets_root)
     partial_outliers, white_halo_risk, low_resolution = flagged(stats)
 
     if contact_sheet is not None:
-        make_contact_sheet(files, contact_sheet)
+        make_contact_sheet(contact_sheet, files, [p.stem for p in files], AUDIT_SHEET, jobs=args.jobs)
 
     output.parent.mkdir(parents=True, exist_ok=True)
     write_report(
@@ -266,6 +678,9 @@ def main() -> None:
         white_halo_risk=white_halo_risk,
         low_resolution=low_resolution,
         contact_sheet=contact_sheet,
+        changes=changes,
+        previous_audit=previous_audit,
+        optimization=optimization,
     )
 
     print(f"Audit report written: {output}")
@@ -0,0 +1,61 @@
+"""
+Benchmark the per-locale marginal cost of App Store previews.
+
+Clones the EN copy into N synthetic locales and renders every screen and
+size for each of them twice:
+  - before: base layers rebuilt for every image (the pre-split behaviour)
+  - after:  cached locale-independent base layers + per-locale overlay
+
+Only rendering is timed; PNG encoding costs the same either way and is
+reported once for reference. Nothing is written to Previews/.
+
+Usage: python3 AppStore/bench_preview_locales.py [--locales N]
+"""
+
+import argparse
+import io
+import time
+
+import generate_previews as gp
+
+
+def render_all(locales, cached):
+    """Render every (size, screen, locale); returns seconds spent."""
+    gp.base_layer.cache_clear()
+    start = time.perf_counter()
+    for size in gp.SIZES.values():
+        for idx in range(len(gp.SCREENS)):
+            for lang in locales:
+                if not cached:
+                    gp.base_layer.cache_clear()
+                gp.render_canvas(size, lang, idx, gp.screenshots_for("en"))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-locale preview render benchmark")
+    parser.add_argument("--locales", type=int, default=20, help="Synthetic locales to render (default: 20)")
+    args = parser.parse_args()
+
+    locales = [f"x{i:02d}" for i in range(args.locales)]
+    for lang in locales:
+        gp.COPY[lang] = gp.COPY["en"]
+
+    render_all(locales[:1], cached=True)  # warm fonts and the screenshot cache
+    images_per_locale = len(gp.SIZES) * len(gp.SCREENS)
+    print(f"{args.locales} locales x {images_per_locale} images")
+    for label, cached in (("before (no base cache)", False), ("after (cached bases)", True)):
+        one = render_all(locales[:1], cached)
+        total = render_all(locales, cached)
+        marginal = (total - one) / max(1, args.locales - 1)
+        print(f"  {label:24s} total {total:6.2f}s  per locale {marginal * 1000:7.0f}ms  "
+              f"per image {marginal / images_per_locale * 1000:6.0f}ms")
+
+    canvas = gp.render_canvas(gp.SIZES["iphone67"], "en", 0, gp.screenshots_for("en"))
+    start = time.perf_counter()
+    canvas.convert("RGB").save(io.BytesIO(), "PNG")
+    print(f"  PNG encode (not included above): {(time.perf_counter() - start) * 1000:.0f}ms per image")
+
+
+if __name__ == "__main__":
+    main()
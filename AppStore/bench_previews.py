@@ -0,0 +1,344 @@
+"""
+Per-stage timing benchmark for the App Store preview generator.
+
+Runs anywhere Pillow and NumPy do, including Linux CI:
+  - synthetic 1290x2796 screenshots (one per screen) are drawn into a temp
+    directory and used instead of AppStore/Screenshots/;
+  - fonts resolve as usual, ending at the DejaVu set bundled in
+    render_kit/font_files/ when no system fonts match;
+  - the image cache is kept in memory, so ~/.cache does not affect results.
+
+Stages, timed at every size in generate_previews.SIZES:
+  create_gradient, draw_decorative_circles, draw_pill_badge,
+  draw_phone_bezel, generate_screen_1_hero ... generate_screen_5_breathing
+  (base layer + overlay, nothing cached), save (encode with
+  generate_previews.OUTPUT) and, for sizes in generate_previews.DERIVE_FROM,
+  derive_size from the source render.
+Each stage runs once cold (frame, screenshot and base caches cleared) and
+then --repeat times warm. The fastest warm time is what gets compared, and a
+stage counts as slower only when its median is over --tolerance as well.
+Identical code has timed up to ~40% apart between processes on a shared
+one-CPU machine, while staying steady within each process. Flagged stages
+are therefore timed again in up to CONFIRM_RUNS fresh processes, and they
+stay flagged only if every one of them agrees.
+
+Results are written as JSON and compared with a stored baseline; stages
+slower than --tolerance are flagged (changes under --min-change-ms are
+ignored as timer noise). Every phone-shadow and blob preset drawn by
+render_kit.shadow.soft_layer is also compared with GaussianBlur; --check
+exits 1 on any slower stage or on a preset over shadow.DIFFERENCE_BOUND.
+
+Usage:
+  python3 AppStore/bench_previews.py
+  python3 AppStore/bench_previews.py --repeat 10 --output /tmp/bench.json
+  python3 AppStore/bench_previews.py --save-baseline   # after an intended change
+  python3 AppStore/bench_previews.py --check           # CI: fail on regressions
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Before the generator (and the render_kit caches) are imported or used.
+os.environ["UNTWIST_IMAGE_CACHE"] = ""
+
+import numpy
+import PIL
+from PIL import ImageDraw
+
+import generate_previews as gp
+from render_kit import SoftShape, device_frame, image_cache, load_font, resolve_font, vertical_gradient
+from render_kit.derive import derive_size
+from render_kit.device_frame import frame_template, shadow_shapes
+from render_kit.encode import encode
+from render_kit.shadow import DIFFERENCE_BOUND, clear_of_edge, compare_to_blur
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(SCRIPT_DIR, "bench_previews_baseline.json")
+SCREENSHOT_SIZE = (1290, 2796)
+BENCH_VERSION = 1
+CONFIRM_RUNS = 3  # fresh processes that re-time flagged stages
+MIN_CHANGE_MS = 1.0  # smaller changes are noise, whatever their percentage
+
+
+# ── Synthetic inputs ─────────────────────────────────────────────────────────
+
+def synthetic_screenshot(seed):
+    """A deterministic app-like screenshot: gradient, status bar, cards and text rows."""
+    rng = random.Random(seed)
+    w, h = SCREENSHOT_SIZE
+    top = tuple(rng.randrange(200, 256) for _ in range(3))
+    bottom = tuple(rng.randrange(150, 230) for _ in range(3))
+    img = vertical_gradient(SCREENSHOT_SIZE, top, bottom).convert("RGBA")
+    draw = ImageDraw.Draw(img)
+    title = load_font("bold", 72, gp.FONT_ROLES["bold"])
+    body = load_font("regular", 40, gp.FONT_ROLES["regular"])
+    draw.text((80, 60), "9:41", font=body, fill=gp.TEXT_DARK)
+    draw.text((80, 220), f"Screen {seed}", font=title, fill=gp.TEXT_DARK)
+    y = 380
+    while y < h - 300:
+        card_h = rng.randrange(220, 520)
+        fill = tuple(rng.randrange(230, 256) for _ in range(3))
+        draw.rounded_rectangle((60, y, w - 60, y + card_h), radius=48, fill=fill)
+        for line in range(min(4, card_h // 90)):
+            length = rng.randrange(300, w - 260)
+            draw.text((110, y + 50 + line * 80), "Lorem ipsum dolor sit amet "[: length // 40],
+                      font=body, fill=gp.TEXT_MID)
+        y += card_h + 40
+    draw.rounded_rectangle((w // 2 - 210, h - 60, w // 2 + 210, h - 48), radius=6, fill=(0, 0, 0))
+    return img
+
+
+def write_screenshots(directory):
+    """Synthetic {screen}_en.png for every screen; returns screenshots_for('en')."""
+    for seed, screen in enumerate(gp.SCREENS, start=1):
+        synthetic_screenshot(seed).save(os.path.join(directory, f"{screen}_en.png"))
+    gp.SCREENSHOTS_DIR = directory
+    return gp.screenshots_for("en")
+
+
+# ── Timing ───────────────────────────────────────────────────────────────────
+
+def reset_caches():
+    """Forget frames, decoded/fitted screenshots and base layers (a fresh process)."""
+    frame_template.cache_clear()
+    image_cache.default_cache.cache_clear()
+    gp._SCREENSHOTS.clear()
+    gp.base_layer.cache_clear()
+
+
+def measure(fn, repeat):
+    """Cold run after reset_caches(), then `repeat` warm runs; times in ms."""
+    reset_caches()
+    start = time.perf_counter()
+    fn()
+    cold = time.perf_counter() - start
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        warm.append(time.perf_counter() - start)
+    return {
+        "cold_ms": round(cold * 1000, 2),
+        "median_ms": round(statistics.median(warm) * 1000, 2),
+        "min_ms": round(min(warm) * 1000, 2),
+    }
+
+
+def stages(size, screenshots):
+    """(name, callable) for every timed stage at `size`."""
+    w, h = size
+    s = w / 1290
+    background = gp.create_gradient(size, (30, 20, 55), (50, 35, 85)).convert("RGBA")
+    circles = [
+        (int(w * 0.85), int(h * 0.08), int(w * 0.45), gp.PURPLE_LIGHT, 25),
+        (int(w * 0.1), int(h * 0.75), int(w * 0.25), gp.PURPLE, 15),
+    ]
+    badge_canvas = background.copy()
+    badge_draw = ImageDraw.Draw(badge_canvas)
+    tag_font = gp.get_bold_font(int(28 * s))
+    bezel_canvas = background.copy()
+
+    def pill():
+        gp.draw_pill_badge(badge_draw, gp.COPY["en"][0]["tag"], int(75 * s), int(130 * s), tag_font,
+                           (*gp.PURPLE_LIGHT, 40), gp.PURPLE_LIGHT, padding=(int(24 * s), int(10 * s)))
+
+    out = [
+        ("create_gradient", lambda: gp.create_gradient(size, (30, 20, 55), (50, 35, 85))),
+        ("draw_decorative_circles", lambda: gp.draw_decorative_circles(background, circles)),
+        ("draw_pill_badge", pill),
+        ("draw_phone_bezel", lambda: gp.draw_phone_bezel(bezel_canvas, screenshots["home"], *gp.hero_phone(size))),
+    ]
+    for base, overlay in gp.GENERATORS:
+        # The full screen as the generator used to draw it: base layer, then overlay.
+        out.append((overlay.__name__, lambda base=base, overlay=overlay: overlay(base(size), size, "en", screenshots)))
+    final = gp.render_canvas(size, "en", 0, screenshots)
+    out.append(("save", lambda: encode(final, gp.OUTPUT)))
+    for name, source in gp.DERIVE_FROM.items():
+        if gp.SIZES[name] == size:
+            master = gp.render_canvas(gp.SIZES[source], "en", 0, screenshots).convert("RGB")
+            out.append(("derive_size", lambda master=master: derive_size(master, size)))
+    return out
+
+
+def environment():
+    fonts = {role: resolve_font(role, tuple(pref)) for role, pref in gp.FONT_ROLES.items()}
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "pillow": PIL.__version__,
+        "numpy": numpy.__version__,
+        "fonts": {role: os.path.basename(path) if path else None for role, path in fonts.items()},
+    }
+
+
+def run(repeat, only=None):
+    """Time every stage at every size, or just the (size, stage) pairs in `only`."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="untwist-bench-") as tmp:
+        screenshots = write_screenshots(tmp)
+        for name, size in gp.SIZES.items():
+            if only is not None and not any(n == name for n, _ in only):
+                continue
+            results[name] = {}
+            for stage, fn in stages(size, screenshots):
+                if only is not None and (name, stage) not in only:
+                    continue
+                results[name][stage] = measure(fn, repeat)
+                print(f"  {name:9s} {stage:28s} cold {results[name][stage]['cold_ms']:8.1f}ms  "
+                      f"median {results[name][stage]['median_ms']:8.1f}ms", flush=True)
+        reset_caches()
+    return {"version": BENCH_VERSION, "repeat": repeat, "environment": environment(), "results": results}
+
+
+def rerun(repeat, keys):
+    """run() for just the (size, stage) pairs in `keys`, in a newly spawned interpreter."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(run, repeat, set(keys)).result()
+
+
+# ── Shadow accuracy ──────────────────────────────────────────────────────────
+
+PHONE_STYLES = ("APPSTORE_FRAME", "SOCIAL_FRAME", "LINKEDIN_FRAME")
+# The Social packs' draw_soft_blobs: two ellipses at up to 43/37 alpha, blur 36,
+# on every post size, in the lightest and darkest palette "muted" colour.
+BLOB_CANVASES = ((1080, 1350), (1080, 1080), (1200, 628), (1600, 900), (1500, 500))
+BLOB_COLORS = ((215, 206, 236), (92, 79, 126))
+BLOB_RADIUS = 36
+
+
+def shadow_cases():
+    """(label, layer size, shapes, radius) for every preset drawn by soft_layer."""
+    cases = {}
+    for style_name in PHONE_STYLES:
+        style = getattr(device_frame, style_name)
+        for name, size in gp.SIZES.items():
+            for layout in gp.PHONE_LAYOUTS:
+                *_, screen_w, screen_h = layout(size)
+                layer, shapes = shadow_shapes(style, frame_template(style, screen_w, screen_h).size, screen_w)
+                # Shapes near the layer edge keep GaussianBlur (see shadow_layer); nothing to check.
+                if clear_of_edge(layer, shapes, style.shadow_blur):
+                    key = (layer, tuple(shapes), style.shadow_blur)
+                    cases.setdefault(key, f"{style_name} {name} {layout.__name__}")
+    for w, h in BLOB_CANVASES:
+        for color in BLOB_COLORS:
+            shapes = (
+                SoftShape("ellipse", (int(w * 0.1), int(h * 0.08), int(w * 0.7), int(h * 0.45)), (*color, 43)),
+                SoftShape("ellipse", (int(w * 0.35), int(h * 0.55), int(w * 0.95), int(h * 0.98)), (*color, 37)),
+            )
+            cases[((w, h), shapes, BLOB_RADIUS)] = f"blobs {w}x{h} {color}"
+    return [(label, layer, list(shapes), radius) for (layer, shapes, radius), label in cases.items()]
+
+
+def check_shadows():
+    """compare_to_blur() on every preset; returns the labels over DIFFERENCE_BOUND."""
+    over = []
+    for label, layer, shapes, radius in shadow_cases():
+        diff = compare_to_blur(layer, shapes, radius)
+        flag = ""
+        if diff["max"] > DIFFERENCE_BOUND:
+            flag = "  OVER BOUND"
+            over.append(label)
+        print(f"  {label:48s} max {diff['max']:4.0f}  mean {diff['mean']:.3f}{flag}")
+    return over
+
+
+# ── Baseline ─────────────────────────────────────────────────────────────────
+
+def _change(before, now, key):
+    delta = now[key] - before[key]
+    return delta, delta / max(before[key], 1e-6)
+
+
+def compare(current, baseline, tolerance, floor_ms=MIN_CHANGE_MS):
+    """Print current vs. baseline warm times; returns the (size, stage) pairs slower than
+    `tolerance`. A stage is judged on its fastest warm run (a busy machine only ever
+    adds time) and flags only when its median moved the same way, so one stalled run
+    cannot fail --check. Changes under `floor_ms` are timer noise on sub-millisecond
+    stages and never flag."""
+    slower = []
+    if baseline.get("environment", {}).get("fonts") != current["environment"]["fonts"]:
+        print("  note: baseline was recorded with different fonts; text stages are not comparable")
+    print(f"  {'size':9s} {'stage':28s} {'base min':>10s} {'min':>10s} {'change':>8s} {'median':>8s}")
+    for name, stages_now in current["results"].items():
+        for stage, now in stages_now.items():
+            before = baseline.get("results", {}).get(name, {}).get(stage)
+            if before is None:
+                print(f"  {name:9s} {stage:28s} {'-':>10s} {now['min_ms']:9.1f}ms      new")
+                continue
+            delta, change = _change(before, now, "min_ms")
+            _, median_change = _change(before, now, "median_ms")
+            flag = ""
+            if change > tolerance and median_change > tolerance and delta >= floor_ms:
+                flag = "  SLOWER"
+                slower.append((name, stage))
+            elif change < -tolerance and median_change < -tolerance and -delta >= floor_ms:
+                flag = "  faster"
+            print(f"  {name:9s} {stage:28s} {before['min_ms']:9.1f}ms {now['min_ms']:9.1f}ms "
+                  f"{change * 100:+7.1f}% {median_change * 100:+7.1f}%{flag}")
+    return slower
+
+
+def write_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage preview rendering benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Warm runs per stage (default: 5)")
+    parser.add_argument("--output", help="Write this run's results as JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="Baseline JSON (default: AppStore/bench_previews_baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Relative slowdown flagged as a regression (default: 0.15)")
+    parser.add_argument("--min-change-ms", type=float, default=MIN_CHANGE_MS,
+                        help="Ignore changes smaller than this many ms (default: 1.0)")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit 1 if any stage regressed or a soft shadow exceeds its accuracy bound")
+    args = parser.parse_args()
+
+    print(f"Preview stages, {args.repeat} warm runs each")
+    current = run(max(1, args.repeat))
+    if args.output:
+        write_json(args.output, current)
+        print(f"Results written: {args.output}")
+
+    slower = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Against baseline {args.baseline}:")
+        slower = compare(current, baseline, args.tolerance, args.min_change_ms)
+        for attempt in range(1, CONFIRM_RUNS + 1):
+            if not slower:
+                break
+            print(f"Re-timing {len(slower)} flagged stage(s) in a fresh process ({attempt}/{CONFIRM_RUNS})")
+            slower = compare(rerun(max(1, args.repeat), slower), baseline, args.tolerance, args.min_change_ms)
+        print(f"{len(slower)} stage(s) more than {args.tolerance:.0%} slower")
+    if args.save_baseline:
+        write_json(args.baseline, current)
+        print(f"Baseline written: {args.baseline}")
+
+    print(f"Soft shadows vs. GaussianBlur, composited (bound {DIFFERENCE_BOUND} levels):")
+    over = check_shadows()
+    print(f"{len(over)} preset(s) over the bound")
+    if args.check and (slower or over):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Repair white-halo PNGs flagged by audit_png_assets.py.
+
+Usage:
+  python3 AppStore/defringe_png_assets.py                  # flagged files -> AppStore/tmp/defringed/
+  python3 AppStore/defringe_png_assets.py --all --only 'Twisty*' --only 'Trap*'
+  python3 AppStore/defringe_png_assets.py --all --jobs 4   # every PNG with alpha
+  python3 AppStore/defringe_png_assets.py --in-place
+
+Two vectorized passes per file, alpha is never changed:
+1. Un-matte: partially transparent pixels whose colour is near white
+   (all channels > 220, the audit's white-partial test) are treated as
+   composited over white, F = (C - (1 - a) * 255) / a. Where that is not a
+   plausible colour, or is still white next to non-white art (pure white
+   un-mattes to itself), the pixel takes its nearest opaque pixel's colour.
+2. Bleed: fully transparent pixels within `--bleed` px of the artwork take
+   the colour of the nearest opaque pixel, so resampling (the scale
+   exporter, UIKit) no longer mixes in white from invisible pixels.
+
+The nearest opaque pixel comes from a jump-flooding distance transform
+(log2(bleed) + 2 passes of 8 shifted comparisons over the artwork's
+bounding box padded by the bleed radius).
+Fixed copies are written under --out (or over the originals with
+--in-place); the audit stats are then re-run on them and a before/after
+halo table is printed and written to --report.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except Exception as exc:  # pragma: no cover
+    raise SystemExit(
+        "Pillow and NumPy are required. Install with: python3 -m pip install pillow numpy\n"
+        f"Import error: {exc}"
+    )
+
+from audit_png_assets import AssetStat, flagged, iter_file_stats, png_files
+
+WHITE = 220  # same threshold as audit_png_assets.file_stats
+# Un-matted channels may undershoot 0 by rounding noise amplified by 1/a.
+UNMATTE_SLACK = 16.0
+
+
+def parse_args() -> argparse.Namespace:
+    repo = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Un-matte white edges and bleed colour into transparent pixels")
+    parser.add_argument(
+        "--assets",
+        type=Path,
+        default=repo / "Untwist" / "Resources" / "Assets.xcassets",
+        help="Path to Assets.xcassets (or any folder of PNGs)",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=repo / "AppStore" / "tmp" / "defringed",
+        help="Where fixed copies go, mirroring the asset tree",
+    )
+    parser.add_argument("--in-place", action="store_true", help="Overwrite the originals instead of --out")
+    parser.add_argument(
+        "--only",
+        action="append",
+        help="Imageset name glob (e.g. 'Trap*'); repeatable. Default: every set",
+    )
+    parser.add_argument("--all", action="store_true", help="Fix every PNG with alpha, not just white-halo risks")
+    parser.add_argument("--bleed", type=int, default=16, help="Bleed radius in px (default: 16)")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--report", type=Path, help="Markdown before/after report (default: <out>/DEFRINGE_REPORT.md)")
+    return parser.parse_args()
+
+
+def _shift(a: np.ndarray, dy: int, dx: int, fill: int) -> np.ndarray:
+    """out[y, x] = a[y + dy, x + dx], `fill` outside the array."""
+    h, w = a.shape
+    out = np.full_like(a, fill)
+    if abs(dy) >= h or abs(dx) >= w:
+        return out
+    out[max(0, -dy):h - max(0, dy), max(0, -dx):w - max(0, dx)] = a[max(0, dy):h + min(0, dy), max(0, dx):w + min(0, dx)]
+    return out
+
+
+def nearest_seed(seeds: np.ndarray, reach: int) -> tuple[np.ndarray, np.ndarray]:
+    """Jump flooding: (y, x) of a nearest True pixel within ~`reach` px, -1 where none.
+
+    Exact for nearly all pixels; JFA can pick a seed a fraction of a pixel
+    farther than the true nearest one, which does not matter for colour
+    bleeding.
+    """
+    h, w = seeds.shape
+    ys, xs = np.indices((h, w), dtype=np.int32)
+    sy = np.where(seeds, ys, -1).astype(np.int32)
+    sx = np.where(seeds, xs, -1).astype(np.int32)
+    far = np.int32(2 * (h + w) ** 2)
+    dist = np.where(seeds, 0, far).astype(np.int32)
+    step = 1 << max(0, (max(1, reach) - 1).bit_length())
+    steps = []
+    while step >= 1:
+        steps.append(step)
+        step //= 2
+    for step in steps + [1]:  # the extra 1-step pass fixes most JFA errors
+        for dy in (-step, 0, step):
+            for dx in (-step, 0, step):
+                if dy == dx == 0:
+                    continue
+                cy, cx = _shift(sy, dy, dx, -1), _shift(sx, dy, dx, -1)
+                d = (ys - cy) ** 2 + (xs - cx) ** 2
+                better = (d < dist) & (cy >= 0)
+                sy[better], sx[better], dist[better] = cy[better], cx[better], d[better]
+    too_far = dist > reach * reach
+    sy[too_far] = sx[too_far] = -1
+    return sy, sx
+
+
+def defringe(px: np.ndarray, bleed: int = 16) -> tuple[np.ndarray, dict[str, int]]:
+    """Fixed copy of an (H, W, 4) uint8 RGBA array, plus pixel counts per repair."""
+    out = px.copy()
+    alpha = px[..., 3]
+
+    seeds = alpha == 255
+    if not seeds.any():
+        seeds = alpha > 0
+    reach = max(bleed, 1)
+    # Nothing farther than `reach` from the art gets a colour: transform only its padded bbox.
+    has_seed = np.zeros_like(seeds)
+    nearest = np.zeros_like(px[..., :3])
+    ys, xs = np.nonzero(seeds.any(axis=1))[0], np.nonzero(seeds.any(axis=0))[0]
+    if len(ys):
+        y0, y1 = max(0, ys[0] - reach), min(px.shape[0], ys[-1] + reach + 1)
+        x0, x1 = max(0, xs[0] - reach), min(px.shape[1], xs[-1] + reach + 1)
+        sy, sx = nearest_seed(seeds[y0:y1, x0:x1], reach)
+        found = sy >= 0
+        has_seed[y0:y1, x0:x1] = found
+        nearest[y0:y1, x0:x1][found] = px[y0:y1, x0:x1, :3][sy[found], sx[found]]
+
+    # Un-matte only the near-white partial pixels (a few thousand per asset).
+    partial = (alpha > 0) & (alpha < 255)
+    white = partial & (px[..., :3] > WHITE).all(axis=-1)
+    wy, wx = np.nonzero(white)
+    a = alpha[wy, wx, None] / 255.0
+    unmatted = (px[wy, wx, :3] - (1.0 - a) * 255.0) / a
+    plausible = (unmatted >= -UNMATTE_SLACK).all(axis=-1)
+    # Pure white un-mattes to white; unless the art itself is white there, it is halo.
+    still_white = (unmatted > WHITE).all(axis=-1) & ~(nearest[wy, wx] > WHITE).all(axis=-1)
+    use_nearest = (~plausible | still_white) & has_seed[wy, wx]
+    keep = ~use_nearest & plausible
+    out[wy[keep], wx[keep], :3] = np.clip(unmatted[keep] + 0.5, 0, 255).astype(np.uint8)
+    ny, nx = wy[use_nearest], wx[use_nearest]
+    out[ny, nx, :3] = nearest[ny, nx]
+
+    bled = (alpha == 0) & has_seed if bleed > 0 else np.zeros_like(seeds)
+    out[..., :3][bled] = nearest[bled]
+    counts = {"unmatted": int(keep.sum()), "nearest": int(use_nearest.sum()), "bled": int(bled.sum())}
+    return out, counts
+
+
+def defringe_file(src: Path, dst: Path, bleed: int = 16) -> tuple[Path, dict[str, int]]:
+    with Image.open(src) as img:
+        px = np.asarray(img.convert("RGBA"))
+    fixed, counts = defringe(px, bleed)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    # RLE (see optimize_png_assets.py) is ~5x faster than the default strategy and smaller here.
+    Image.fromarray(fixed, "RGBA").save(tmp, "PNG", compress_level=9, compress_type=zlib.Z_RLE)
+    os.replace(tmp, dst)
+    return dst, counts
+
+
+def report_lines(rows: list[tuple[AssetStat, AssetStat, dict[str, int]]], assets_root: Path) -> list[str]:
+    lines = ["## Defringe Before/After", ""]
+    lines.append("| File | White Partial % | Partial % | Un-matted px | Nearest px | Bled px |")
+    lines.append("|---|---:|---:|---:|---:|---:|")
+    for before, after, counts in rows:
+        lines.append(
+            f"| `{before.path.relative_to(assets_root)}` | "
+            f"`{before.white_partial_pct:.2f}` -> `{after.white_partial_pct:.2f}` | "
+            f"`{before.partial_pct:.2f}` -> `{after.partial_pct:.2f}` | "
+            f"{counts['unmatted']} | {counts['nearest']} | {counts['bled']} |"
+        )
+    if not rows:
+        lines.append("| _None_ | - | - | - | - | - |")
+    lines.append("")
+    return lines
+
+
+def main() -> None:
+    args = parse_args()
+    assets_root: Path = args.assets.resolve()
+    out_root: Path = assets_root if args.in_place else args.out.resolve()
+    report: Path = (args.report or (args.out / "DEFRINGE_REPORT.md")).resolve()
+
+    started = time.perf_counter()
+    files = png_files(assets_root)
+    if args.only:
+        files = [p for p in files if any(fnmatch.fnmatch(p.parent.stem, pat) for pat in args.only)]
+    before = {s.path: s for s in iter_file_stats(files, args.jobs)}
+    if args.all:
+        targets = sorted(p for p, s in before.items() if s.transparent_pct or s.partial_pct)
+    else:
+        targets = sorted(s.path for s in flagged(before.values())[1])
+    if not targets:
+        print("No white-halo risks found; nothing to fix (use --all to process every PNG).")
+        return
+
+    dsts = [out_root / p.relative_to(assets_root) for p in targets]
+    if args.jobs <= 1 or len(targets) <= 1:
+        fixed = [defringe_file(s, d, args.bleed) for s, d in zip(targets, dsts)]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            fixed = list(pool.map(defringe_file, targets, dsts, [args.bleed] * len(targets)))
+    counts = dict(fixed)
+    after = {s.path: s for s in iter_file_stats(dsts, args.jobs)}
+
+    rows = [(before[s], after[d], counts[d]) for s, d in zip(targets, dsts)]
+    lines = report_lines(rows, assets_root)
+    print("\n".join(lines[2:-1]))
+    report.parent.mkdir(parents=True, exist_ok=True)
+    report.write_text("\n".join([f"# PNG Defringe ({assets_root})", ""] + lines))
+    where = "in place" if args.in_place else f"to {out_root}"
+    print(f"Fixed {len(targets)} files {where} in {time.perf_counter() - started:.1f}s; report: {report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Export scale variants for imagesets and the AppIcon size set.
+
+Usage:
+  python3 AppStore/export_asset_scales.py                  # Twisty*, Trap* and AppIcon
+  python3 AppStore/export_asset_scales.py --only 'Twisty*'
+  python3 AppStore/export_asset_scales.py --force --jobs 4
+
+Masters:
+- `<Name>.imageset/<Name>.png` is the 3x master; `<Name>-2x.png` and
+  `<Name>-1x.png` are Lanczos downsamples (sizes rounded: 1024 -> 683 -> 341).
+- `AppIcon.appiconset/AppIcon.png` (1024x1024) is the master for every iOS
+  app icon size in `APPICON_SIZES`; entries with the same pixel size share a
+  file.
+
+Each master is decoded once and every scale is resized from that decode;
+sets are exported in parallel. A `.scales.json` sidecar in each set stores
+the master's sha256 and the export spec, so sets whose master is unchanged
+are skipped. PNGs and Contents.json are written atomically and only when
+their bytes (or, for Contents.json, parsed content) change, so Xcode does not
+reindex untouched sets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from PIL import Image
+
+EXPORTER_VERSION = 1
+SIDECAR = ".scales.json"
+DEFAULT_SETS = ("Twisty*.imageset", "Trap*.imageset", "AppIcon.appiconset")
+IMAGESET_SCALES = (1, 2)  # derived from the 3x master
+# (points, scale) of Xcode's "All Sizes" iOS app icon; the 1024 master is the App Store icon.
+APPICON_SIZES = (
+    ("20", 2), ("20", 3), ("29", 2), ("29", 3), ("38", 2), ("38", 3), ("40", 2), ("40", 3),
+    ("60", 2), ("60", 3), ("64", 2), ("64", 3), ("68", 2), ("76", 2), ("83.5", 2),
+)
+
+
+@dataclass
+class Output:
+    filename: str
+    size: tuple[int, int]
+
+
+@dataclass
+class ExportPlan:
+    folder: Path
+    master: Path
+    mode: str
+    outputs: list[Output]
+    images: list[dict]  # Contents.json "images"
+
+    def spec(self) -> str:
+        data = {"mode": self.mode, "outputs": [asdict(o) for o in self.outputs], "images": self.images}
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def parse_args() -> argparse.Namespace:
+    repo = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Export 1x/2x/3x and app icon sizes from masters")
+    parser.add_argument(
+        "--assets",
+        type=Path,
+        default=repo / "Untwist" / "Resources" / "Assets.xcassets",
+        help="Path to Assets.xcassets",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        help="Set name glob (e.g. 'Twisty*'); repeatable. Default: Twisty*, Trap* and AppIcon",
+    )
+    parser.add_argument("--force", action="store_true", help="Ignore sidecars and re-export every set")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Sets exported in parallel (default: CPU count)",
+    )
+    return parser.parse_args()
+
+
+def resized_size(size: tuple[int, int], scale: float) -> tuple[int, int]:
+    w, h = size
+    return max(1, int(round(w * scale))), max(1, int(round(h * scale)))
+
+
+def select_sets(assets_root: Path, only: list[str] | None) -> list[Path]:
+    patterns = DEFAULT_SETS if not only else [p if "." in p else f"{p}.*set" for p in only]
+    return sorted(
+        p for p in assets_root.iterdir()
+        if p.suffix in (".imageset", ".appiconset") and any(fnmatch.fnmatch(p.name, pat) for pat in patterns)
+    )
+
+
+def plan_for(folder: Path) -> ExportPlan:
+    name = folder.stem
+    master = folder / f"{name}.png"
+    if not master.exists():
+        raise FileNotFoundError(f"Missing master: {master}")
+    with Image.open(master) as img:  # header only
+        size = img.size
+
+    if folder.suffix == ".appiconset":
+        outputs: dict[int, Output] = {}
+        images = []
+        for points, scale in APPICON_SIZES:
+            px = round(float(points) * scale)
+            out = outputs.setdefault(px, Output(f"{name}-{px}.png", (px, px)))
+            images.append({
+                "filename": out.filename,
+                "idiom": "universal",
+                "platform": "ios",
+                "scale": f"{scale}x",
+                "size": f"{points}x{points}",
+            })
+        images.append({"filename": master.name, "idiom": "universal", "platform": "ios", "size": "1024x1024"})
+        return ExportPlan(folder, master, "RGB", list(outputs.values()), images)  # icons stay opaque
+
+    outputs = [Output(f"{name}-{k}x.png", resized_size(size, k / 3)) for k in IMAGESET_SCALES]
+    images = [{"filename": o.filename, "idiom": "universal", "scale": f"{k}x"} for o, k in zip(outputs, IMAGESET_SCALES)]
+    images.append({"filename": master.name, "idiom": "universal", "scale": "3x"})
+    return ExportPlan(folder, master, "RGBA", outputs, images)
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Atomically replace `path` with `data` unless it already holds exactly those bytes."""
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def xcode_json(data: dict) -> bytes:
+    """Serialize the way Xcode writes Contents.json."""
+    return (json.dumps(data, indent=2, separators=(",", " : "), sort_keys=True, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def read_json(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def export_set(folder: Path, force: bool = False) -> str:
+    """Export one set; returns a one-line summary."""
+    plan = plan_for(folder)
+    master_bytes = plan.master.read_bytes()
+    stamp = {
+        "version": EXPORTER_VERSION,
+        "master_sha256": hashlib.sha256(master_bytes).hexdigest(),
+        "spec": plan.spec(),
+    }
+    sidecar = folder / SIDECAR
+    if not force and read_json(sidecar) == stamp and all((folder / o.filename).exists() for o in plan.outputs):
+        return f"{folder.name}: unchanged"
+
+    img = Image.open(io.BytesIO(master_bytes)).convert(plan.mode)  # the only decode of this master
+    written = []
+    for out in plan.outputs:
+        buf = io.BytesIO()
+        img.resize(out.size, Image.Resampling.LANCZOS).save(buf, format="PNG")
+        if write_if_changed(folder / out.filename, buf.getvalue()):
+            written.append(out.filename)
+
+    contents_path = folder / "Contents.json"
+    contents = read_json(contents_path) or {"info": {"author": "xcode", "version": 1}}
+    if contents.get("images") != plan.images:
+        contents["images"] = plan.images
+        write_if_changed(contents_path, xcode_json(contents))
+        written.append("Contents.json")
+    write_if_changed(sidecar, (json.dumps(stamp, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+
+    sizes = " ".join(f"{o.size[0]}x{o.size[1]}" for o in plan.outputs)
+    return f"{folder.name}: master {img.width}x{img.height} -> {sizes}; wrote {', '.join(written) or 'nothing (identical)'}"
+
+
+def main() -> None:
+    args = parse_args()
+    assets_root: Path = args.assets.resolve()
+    sets = select_sets(assets_root, args.only)
+    if not sets:
+        raise SystemExit(f"No matching imagesets found under: {assets_root}")
+
+    if args.jobs <= 1 or len(sets) <= 1:
+        results = [export_set(folder, args.force) for folder in sets]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(export_set, sets, [args.force] * len(sets)))
+    for line in results:
+        print(line)
+    skipped = sum(line.endswith(": unchanged") for line in results)
+    print(f"{len(sets)} sets: {len(sets) - skipped} exported, {skipped} unchanged")
+
+
+if __name__ == "__main__":
+    main()
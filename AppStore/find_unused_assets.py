@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""Find unreferenced imagesets and near-duplicate PNGs.
+
+Usage:
+  python3 AppStore/find_unused_assets.py
+  python3 AppStore/find_unused_assets.py --distance 4 --jobs 4
+  python3 AppStore/find_unused_assets.py --include-scale-variants
+
+References: one pass over `Untwist/**/*.swift` collects every string literal
+with its file and line. `Image("TwistyCalm")` / `UIImage(named:)` calls and
+name mappings such as `ThoughtTrapType.imageName` (`case .labeling:
+"TrapLabeling"`) are both plain literals, so a set counts as referenced when
+any literal equals its name. An interpolated literal (`"Twisty\\(mood)"`)
+references every set starting with its constant prefix, and
+`ASSETCATALOG_COMPILER_*_NAME` build settings in project.yml cover AppIcon.
+
+Duplicates: every PNG under Assets.xcassets, AppStore/screenshots and
+AppStore/Previews is decoded once to a 32x32 grey thumbnail (composited over
+mid grey, so hidden colour in transparent pixels does not count). dHash
+(9x8 gradients) and pHash (8x8 low-frequency DCT vs. median) are computed for
+the whole batch with NumPy, concatenated into a 128-bit key and indexed in a
+BK-tree. Largest files first, each claims the unclaimed files within
+`--distance` bits, so clusters do not chain. Scale variants inside one
+imageset/appiconset are skipped unless asked for. Reclaimable bytes are the
+unreferenced sets plus byte-identical copies inside Assets.xcassets. Copies
+under --hash-dir folders count towards review only: scripts and docs (the
+Social generators, for one) open those by path, and only Swift sources and
+project.yml are indexed. Near-duplicates (often en/tr or per-device
+variants) are listed for review as well.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import hashlib
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except Exception as exc:  # pragma: no cover
+    raise SystemExit(
+        "Pillow and NumPy are required. Install with: python3 -m pip install pillow numpy\n"
+        f"Import error: {exc}"
+    )
+
+STRING_LITERAL = re.compile(r'"((?:[^"\\\n]|\\.)*)"')
+IMAGE_CALL = re.compile(r"\b(?:Image|UIImage)\((?:named:\s*)?$")
+BUILD_SETTING = re.compile(r"ASSETCATALOG_COMPILER_\w+_NAME\s*[:=]\s*\"?(\w+)")
+SET_SUFFIXES = (".imageset", ".appiconset")
+HASH_SIZE = 32
+
+
+@dataclass
+class Reference:
+    path: Path
+    line: int
+    call: bool  # inside Image(...) / UIImage(named:) rather than e.g. a name mapping
+
+
+@dataclass
+class ReferenceIndex:
+    names: dict[str, list[Reference]] = field(default_factory=dict)
+    prefixes: dict[str, list[Reference]] = field(default_factory=dict)  # from "Name\(x)" literals
+
+    def lookup(self, name: str) -> list[Reference]:
+        refs = list(self.names.get(name, []))
+        for prefix, found in self.prefixes.items():
+            if name.startswith(prefix):
+                refs.extend(found)
+        return refs
+
+
+@dataclass
+class AssetSet:
+    path: Path
+    files: list[Path]
+
+    @property
+    def name(self) -> str:
+        return self.path.stem
+
+    @property
+    def bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.files)
+
+
+def parse_args() -> argparse.Namespace:
+    here = Path(__file__).resolve().parent
+    repo = here.parent
+    today = dt.date.today().isoformat()
+    parser = argparse.ArgumentParser(description="Report unreferenced imagesets and near-duplicate PNGs")
+    parser.add_argument("--swift", type=Path, default=repo / "Untwist", help="Swift source root (default: Untwist)")
+    parser.add_argument("--project", type=Path, default=repo / "project.yml", help="XcodeGen spec with build settings")
+    parser.add_argument(
+        "--assets",
+        type=Path,
+        default=repo / "Untwist" / "Resources" / "Assets.xcassets",
+        help="Path to Assets.xcassets",
+    )
+    parser.add_argument(
+        "--hash-dir",
+        type=Path,
+        action="append",
+        help="Extra folder of PNGs to hash; repeatable (default: AppStore/screenshots and AppStore/Previews)",
+    )
+    parser.add_argument("--distance", type=int, default=6, help="Max Hamming distance of 128-bit keys (default: 6)")
+    parser.add_argument(
+        "--include-scale-variants",
+        action="store_true",
+        help="Also pair files inside the same imageset/appiconset (1x/2x/3x)",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Decode on N worker processes (default: 1)")
+    parser.add_argument("--output", type=Path, default=here / f"ASSET_USAGE_{today}.md", help="Markdown report output")
+    args = parser.parse_args()
+    if args.hash_dir is None:
+        args.hash_dir = [here / "screenshots", here / "Previews"]
+    return args
+
+
+# ── References ──────────────────────────────────────────────────────────────
+
+
+def reference_index(swift_root: Path, project: Path | None = None) -> ReferenceIndex:
+    index = ReferenceIndex()
+    sources = sorted(swift_root.rglob("*.swift"))
+    for path in sources:
+        for lineno, line in enumerate(path.read_text(encoding="utf-8", errors="replace").splitlines(), start=1):
+            if line.lstrip().startswith("//"):
+                continue
+            for match in STRING_LITERAL.finditer(line):
+                literal = match.group(1)
+                ref = Reference(path, lineno, bool(IMAGE_CALL.search(line[:match.start()])))
+                if "\\(" in literal:
+                    prefix = literal.split("\\(", 1)[0]
+                    if prefix:
+                        index.prefixes.setdefault(prefix, []).append(ref)
+                elif literal:
+                    index.names.setdefault(literal, []).append(ref)
+    if project is not None and project.exists():
+        for lineno, line in enumerate(project.read_text(encoding="utf-8").splitlines(), start=1):
+            match = BUILD_SETTING.search(line)
+            if match:
+                index.names.setdefault(match.group(1), []).append(Reference(project, lineno, False))
+    return index
+
+
+def asset_sets(assets_root: Path) -> list[AssetSet]:
+    return [
+        AssetSet(p, sorted(p.glob("*.png")))
+        for p in sorted(assets_root.rglob("*"))
+        if p.suffix in SET_SUFFIXES and p.is_dir()
+    ]
+
+
+# ── Perceptual hashes ───────────────────────────────────────────────────────
+
+
+def grey_thumbnail(path: Path) -> np.ndarray:
+    """(32, 32) float32 luminance of `path` composited over mid grey."""
+    with Image.open(path) as img:
+        img.draft("RGB", (HASH_SIZE * 4, HASH_SIZE * 4))
+        rgba = img.convert("RGBA")
+    flat = Image.new("RGBA", rgba.size, (128, 128, 128, 255))
+    flat.alpha_composite(rgba)
+    small = flat.convert("L").resize((HASH_SIZE, HASH_SIZE), Image.Resampling.BILINEAR, reducing_gap=3.0)
+    return np.asarray(small, dtype=np.float32)
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    m = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n))
+    m[0] /= np.sqrt(2)
+    return (m * np.sqrt(2 / n)).astype(np.float32)
+
+
+def _pack(bits: np.ndarray) -> list[int]:
+    """(N, 64) bools -> N Python ints."""
+    packed = np.packbits(bits.astype(np.uint8), axis=1)
+    return [int.from_bytes(row.tobytes(), "big") for row in packed]
+
+
+def perceptual_hashes(thumbs: np.ndarray) -> list[int]:
+    """128-bit pHash << 64 | dHash for a (N, 32, 32) stack of thumbnails."""
+    n = len(thumbs)
+    if not n:
+        return []
+    c = _dct_matrix(HASH_SIZE)
+    low = (c @ thumbs @ c.T)[:, :8, :8].reshape(n, 64)
+    # The DC term only tracks brightness; compare the rest with their median.
+    phash = low > np.median(low[:, 1:], axis=1, keepdims=True)
+    # dHash on a 9x8 box-downsample of the same thumbnail.
+    cols = np.linspace(0, HASH_SIZE, 10).astype(int)
+    rows = np.linspace(0, HASH_SIZE, 9).astype(int)
+    pooled = np.add.reduceat(np.add.reduceat(thumbs, rows[:-1], axis=1), cols[:-1], axis=2)
+    dhash = (pooled[:, :, 1:] > pooled[:, :, :-1]).reshape(n, 64)
+    return [(p << 64) | d for p, d in zip(_pack(phash), _pack(dhash))]
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance on int keys."""
+
+    def __init__(self) -> None:
+        self.root: tuple[int, list, dict[int, tuple]] | None = None  # (key, items, children by distance)
+
+    def add(self, key: int, item) -> None:
+        if self.root is None:
+            self.root = (key, [item], {})
+            return
+        node = self.root
+        while True:
+            d = (key ^ node[0]).bit_count()
+            if d == 0:
+                node[1].append(item)
+                return
+            if d not in node[2]:
+                node[2][d] = (key, [item], {})
+                return
+            node = node[2][d]
+
+    def query(self, key: int, radius: int) -> list[tuple[int, object]]:
+        """(distance, item) for every item within `radius` of `key`."""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node_key, items, children = stack.pop()
+            d = (key ^ node_key).bit_count()
+            if d <= radius:
+                found.extend((d, item) for item in items)
+            stack.extend(child for dist, child in children.items() if d - radius <= dist <= d + radius)
+        return found
+
+
+@dataclass
+class Cluster:
+    keep: Path  # the largest file
+    others: list[tuple[Path, int, bool]]  # (path, key distance to `keep`, byte-identical)
+
+    @property
+    def identical_bytes(self) -> int:
+        return sum(p.stat().st_size for p, _, same in self.others if same)
+
+    @property
+    def similar_bytes(self) -> int:
+        return sum(p.stat().st_size for p, _, same in self.others if not same)
+
+
+def duplicate_clusters(
+    paths: list[Path],
+    keys: list[int],
+    distance: int,
+    include_scale_variants: bool = False,
+    demote: set[Path] | None = None,
+) -> list[Cluster]:
+    """Leader clustering: largest files first, each claiming the unclaimed files within `distance`.
+
+    Unlike joining every close pair, this cannot chain A~B~C into one
+    cluster when A and C are far apart. Files in `demote` (unreferenced
+    sets) only lead a cluster when no other file can.
+    """
+    demote = demote or set()
+    tree = BKTree()
+    for i, key in enumerate(keys):
+        tree.add(key, i)
+    sizes = [p.stat().st_size for p in paths]
+    claimed: set[int] = set()
+    digests: dict[int, bytes] = {}
+
+    def digest(i: int) -> bytes:
+        if i not in digests:
+            digests[i] = hashlib.sha256(paths[i].read_bytes()).digest()
+        return digests[i]
+
+    clusters = []
+    for i in sorted(range(len(paths)), key=lambda k: (paths[k] in demote, -sizes[k], paths[k])):
+        if i in claimed:
+            continue
+        claimed.add(i)
+        others = []
+        for d, j in sorted(tree.query(keys[i], distance), key=lambda x: (x[0], paths[x[1]])):
+            if j in claimed:
+                continue
+            same_set = paths[i].parent == paths[j].parent and paths[i].parent.suffix in SET_SUFFIXES
+            if same_set and not include_scale_variants:
+                continue
+            claimed.add(j)
+            identical = d == 0 and sizes[i] == sizes[j] and digest(i) == digest(j)
+            others.append((paths[j], d, identical))
+        if others:
+            clusters.append(Cluster(paths[i], others))
+    return clusters
+
+
+# ── Report ──────────────────────────────────────────────────────────────────
+
+
+def _rel(path: Path, repo: Path) -> str:
+    try:
+        return str(path.relative_to(repo))
+    except ValueError:
+        return str(path)
+
+
+def _kb(n: int) -> str:
+    return f"{n / 1024:,.1f} KB"
+
+
+def write_report(
+    output: Path,
+    repo: Path,
+    assets_root: Path,
+    sets: list[AssetSet],
+    index: ReferenceIndex,
+    clusters: list[Cluster],
+    hashed: int,
+    distance: int,
+) -> int:
+    """Write the markdown report; returns bytes reclaimable without review."""
+    unused = [s for s in sets if not index.lookup(s.name)]
+    known = {s.name for s in sets}
+    missing = sorted(
+        (name, refs) for name, refs in index.names.items()
+        if name not in known and any(r.call for r in refs)
+    )
+    unused_bytes = sum(s.bytes for s in unused)
+    unused_files = {p for s in unused for p in s.files}
+    # Files already counted with an unused set are not counted again for duplicates.
+    copies = [(p, same) for c in clusters for p, _, same in c.others if p not in unused_files]
+    # Only catalog files are known to be referenced by name alone; anything else may be opened by path.
+    identical = sum(p.stat().st_size for p, same in copies if same and assets_root in p.parents)
+    outside = sum(p.stat().st_size for p, same in copies if same and assets_root not in p.parents)
+    similar = sum(p.stat().st_size for p, same in copies if not same)
+
+    lines = [f"# Asset Usage ({dt.date.today().isoformat()})", ""]
+    lines.append("Scope:")
+    lines.append(f"- Sets in `{_rel(sets[0].path.parent, repo) if sets else '-'}`: `{len(sets)}`")
+    lines.append(f"- PNGs hashed: `{hashed}` (near-duplicate radius `{distance}` of 128 bits)")
+    lines.append("")
+    lines.append("## Summary")
+    lines.append("")
+    lines.append(f"1. Unreferenced sets: `{len(unused)}` (`{_kb(unused_bytes)}`).")
+    lines.append(
+        f"2. Duplicate clusters: `{len(clusters)}`; byte-identical copies `{_kb(identical)}` in the catalog "
+        f"and `{_kb(outside)}` outside it, near-duplicates `{_kb(similar)}` "
+        f"(files in unreferenced sets counted once, above)."
+    )
+    lines.append(f"3. Image names used in code with no set: `{len(missing)}`.")
+    lines.append(
+        f"4. Reclaimable: `{_kb(unused_bytes + identical)}` safely (unused sets + identical catalog copies), "
+        f"up to `{_kb(unused_bytes + identical + outside + similar)}` after reviewing near-duplicates and "
+        f"identical copies outside the catalog, which scripts and docs may open by path."
+    )
+    lines.append("")
+
+    lines.append("## Unreferenced Sets")
+    lines.append("")
+    lines.append("| Set | Files | Size |")
+    lines.append("|---|---:|---:|")
+    for s in sorted(unused, key=lambda x: x.bytes, reverse=True):
+        lines.append(f"| `{s.path.name}` | {len(s.files)} | `{_kb(s.bytes)}` |")
+    if not unused:
+        lines.append("| _None_ | - | - |")
+    lines.append("")
+
+    lines.append("## Referenced Sets")
+    lines.append("")
+    lines.append("| Set | References | First |")
+    lines.append("|---|---:|---|")
+    for s in sets:
+        refs = index.lookup(s.name)
+        if refs:
+            first = refs[0]
+            lines.append(f"| `{s.path.name}` | {len(refs)} | `{_rel(first.path, repo)}:{first.line}` |")
+    lines.append("")
+
+    lines.append("## Missing Images")
+    lines.append("")
+    lines.append("| Name | Used at |")
+    lines.append("|---|---|")
+    for name, refs in missing:
+        used = ", ".join(f"`{_rel(r.path, repo)}:{r.line}`" for r in refs if r.call)
+        lines.append(f"| `{name}` | {used} |")
+    if not missing:
+        lines.append("| _None_ | - |")
+    lines.append("")
+
+    lines.append("## Duplicate Clusters")
+    lines.append("")
+    lines.append("Each cluster keeps its largest file; the others are listed with their key distance to it.")
+    lines.append("Near-duplicates (distance > 0 or different bytes) are often localized or per-device variants: review before deleting.")
+    lines.append("Identical copies outside the asset catalog are not searched for in scripts or docs: check for path references first.")
+    lines.append("")
+    lines.append("| # | Keep | Duplicates | Identical | Near |")
+    lines.append("|---:|---|---|---:|---:|")
+    ordered = sorted(clusters, key=lambda c: (c.identical_bytes, c.similar_bytes), reverse=True)
+    for n, c in enumerate(ordered, start=1):
+        dups = "<br>".join(
+            f"`{_rel(p, repo)}` ({_kb(p.stat().st_size)}, {'identical' if same else f'd={d}'})" for p, d, same in c.others
+        )
+        lines.append(
+            f"| {n} | `{_rel(c.keep, repo)}` ({_kb(c.keep.stat().st_size)}) | {dups} | "
+            f"`{_kb(c.identical_bytes)}` | `{_kb(c.similar_bytes)}` |"
+        )
+    if not clusters:
+        lines.append("| - | _None_ | - | - | - |")
+    lines.append("")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text("\n".join(lines))
+    return unused_bytes + identical
+
+
+def main() -> None:
+    args = parse_args()
+    repo = Path(__file__).resolve().parent.parent
+    assets_root: Path = args.assets.resolve()
+
+    started = time.perf_counter()
+    index = reference_index(args.swift.resolve(), args.project.resolve())
+    sets = asset_sets(assets_root)
+    unused_files = {p for s in sets if not index.lookup(s.name) for p in s.files}
+
+    paths = sorted(assets_root.rglob("*.png"))
+    for folder in args.hash_dir:
+        if folder.is_dir():
+            paths.extend(sorted(folder.resolve().rglob("*.png")))
+    if args.jobs <= 1 or len(paths) <= 1:
+        thumbs = [grey_thumbnail(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            thumbs = list(pool.map(grey_thumbnail, paths, chunksize=8))
+    keys = perceptual_hashes(np.stack(thumbs) if thumbs else np.empty((0, HASH_SIZE, HASH_SIZE), np.float32))
+    clusters = duplicate_clusters(paths, keys, args.distance, args.include_scale_variants, unused_files)
+
+    reclaimable = write_report(args.output, repo, assets_root, sets, index, clusters, len(paths), args.distance)
+    unused = sum(1 for s in sets if not index.lookup(s.name))
+    print(
+        f"{len(sets)} sets, {unused} unreferenced; {len(paths)} PNGs, {len(clusters)} duplicate clusters; "
+        f"{_kb(reclaimable)} safely reclaimable in {time.perf_counter() - started:.1f}s"
+    )
+    print(f"Asset usage report written: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,38 @@ Usage:
   1. Take app screenshots from simulator (with sample data)
   2. Place in AppStore/Screenshots/ with naming: {screen}_{lang}.png
      e.g. home_en.png, unwinder_tr.png, mood_en.png, insights_tr.png, breathing_en.png
-  3. Run: python3 AppStore/generate_previews.py
+  3. Run: python3 AppStore/generate_previews.py [--jobs N] [--force]
+     Unchanged previews are skipped via Previews/.preview_manifest.json.
+     PNGs are encoded (OUTPUT, render_kit/encode.py) on a background thread
+     while the next preview renders; identical files are not rewritten.
+     SIZE_POLICY sets which sizes are rendered natively or downscaled from
+     another size's render in memory; --derive/--native NAME override it and
+     --check-derived compares the two by SSIM.
+  4. Iterating on copy: --watch keeps fonts, screenshots and frames loaded and
+     re-renders only the previews affected by each save (render_kit/watch.py).
+  5. Optional: --trace out.json (or UNTWIST_TRACE=1) writes a Chrome trace and
+     a per-stage / per-preview timing table; see render_kit/trace.py.
 """
 
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PIL import Image, ImageDraw
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+import argparse
+import hashlib
+import inspect
+import json
 import os
+import sys
+
+from render_kit import derive, device_frame, encode, fonts, gradient, image_cache, shadow, trace
+from render_kit import load_font, resolve_font, vertical_gradient
+from render_kit.derive import derive_size, text_ssim
+from render_kit.device_frame import APPSTORE_FRAME, frame_template, place_phone, place_screen
+from render_kit.encode import APP_STORE, OutputWriter, write_output
+from render_kit.image_cache import fit_cached
+from render_kit.watch import serve
 
 # Paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -27,6 +54,46 @@ def screenshots_for(lang):
     return {s: os.path.join(SCREENSHOTS_DIR, f"{s}_{lang}.png") for s in SCREENS}
 
 
+# Decoded RGBA screenshots, keyed by path. Filled lazily in serial runs and
+# from shared memory in --jobs workers, so every file is decoded once.
+_SCREENSHOTS = {}
+_SHARED_BLOCKS = []
+
+
+def load_screenshot(path):
+    """Return the decoded RGBA screenshot at path, or None if it is missing."""
+    img = _SCREENSHOTS.get(path)
+    if img is None and os.path.exists(path):
+        img = Image.open(path).convert("RGBA")
+        _SCREENSHOTS[path] = img
+    return img
+
+
+def share_screenshots(paths):
+    """Decode screenshots into shared memory blocks.
+    Returns (blocks, specs); specs maps path -> (block name, size) for workers.
+    """
+    blocks, specs = [], {}
+    for path in paths:
+        img = load_screenshot(path)
+        if img is None:
+            continue
+        data = img.tobytes()
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        shm.buf[:len(data)] = data
+        blocks.append(shm)
+        specs[path] = (shm.name, img.size)
+    return blocks, specs
+
+
+def attach_screenshots(specs):
+    """Worker initializer: map shared screenshots without copying them."""
+    for path, (name, size) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _SHARED_BLOCKS.append(shm)
+        _SCREENSHOTS[path] = Image.frombuffer("RGBA", size, shm.buf, "raw", "RGBA", 0, 1)
+
+
 # ── Fonts ────────────────────────────────────────────────────────────────────
 
 FONT_BOLD = "/System/Library/Fonts/Supplemental/Arial Bold.ttf"
@@ -38,26 +105,24 @@ NY_SERIF_ITALIC = "/System/Library/Fonts/NewYorkItalic.ttf"
 FALLBACK_ITALIC = "/System/Library/Fonts/Supplemental/Georgia Italic.ttf"
 
 
-def _try_font(paths, size):
-    for p in paths:
-        if os.path.exists(p):
-            try:
-                return ImageFont.truetype(p, size)
-            except Exception:
-                continue
-    return ImageFont.truetype(FONT_BOLD, size)
+# Preferred files per role; render_kit.fonts falls back to a local match.
+FONT_ROLES = {
+    "bold": (SF_BOLD, FONT_BOLD),
+    "serif-italic": (NY_SERIF_ITALIC, FALLBACK_ITALIC),
+    "regular": (FONT_REG,),
+}
 
 
 def get_bold_font(size):
-    return _try_font([SF_BOLD, FONT_BOLD], size)
+    return load_font("bold", size, FONT_ROLES["bold"])
 
 
 def get_serif_italic_font(size):
-    return _try_font([NY_SERIF_ITALIC, FALLBACK_ITALIC], size)
+    return load_font("serif-italic", size, FONT_ROLES["serif-italic"])
 
 
 def get_body_font(size):
-    return _try_font([SF_BOLD, FONT_BOLD], size)
+    return load_font("bold", size, FONT_ROLES["bold"])
 
 
 # App Store required sizes
@@ -66,6 +131,20 @@ SIZES = {
     "iphone61": (1179, 2556),
 }
 
+# Per-size policy: "native" lays the screen out again at that size; "derive"
+# downscales the render of DERIVE_FROM[size] in memory (render_kit.derive).
+# Override per run with --derive NAME / --native NAME; --check-derived compares
+# the two. iphone61 stays native: deriving halves render_canvas time, but the
+# 0.914x Lanczos pass costs more than that, and resampling the smooth (undithered)
+# gradients adds low-bit noise that compresses poorly, so derived previews
+# encode to ~2x larger PNGs (measured with --trace, 20 previews).
+SIZE_POLICY = {"iphone67": "native", "iphone61": "native"}
+DERIVE_FROM = {"iphone61": "iphone67"}
+
+# Encoder settings (render_kit.encode). Screenshots must be RGB without alpha;
+# PNG keeps small UI text lossless. Files whose bytes would not change are left alone.
+OUTPUT = APP_STORE
+
 # ── Brand Colors ─────────────────────────────────────────────────────────────
 
 PURPLE_DEEP = (75, 50, 140)
@@ -78,10 +157,6 @@ WHITE = (255, 255, 255)
 TEXT_DARK = (45, 35, 68)
 TEXT_MID = (107, 97, 137)
 
-# Phone bezel
-BEZEL_BLACK = (20, 20, 22)
-BEZEL_EDGE = (40, 40, 42)
-
 # iPhone screen aspect ratio (1290:2796 ≈ 1:2.168)
 IPHONE_ASPECT = 2796 / 1290
 
@@ -157,18 +232,13 @@ COPY = {
 
 # ── Drawing Helpers ──────────────────────────────────────────────────────────
 
+@trace.stage
 def create_gradient(size, top_color, bot_color):
     """Create a vertical gradient image."""
-    w, h = size
-    img = Image.new("RGB", size)
-    px = img.load()
-    for y in range(h):
-        r = y / h
-        for x in range(w):
-            px[x, y] = tuple(int(top_color[i] + (bot_color[i] - top_color[i]) * r) for i in range(3))
-    return img
+    return vertical_gradient(size, top_color, bot_color)
 
 
+@trace.stage
 def round_corners(img, radius):
     """Round the corners of an image with alpha mask."""
     mask = Image.new("L", img.size, 0)
@@ -178,6 +248,7 @@ def round_corners(img, radius):
     return result
 
 
+@trace.stage
 def draw_decorative_circles(canvas, circles):
     """Draw semi-transparent decorative circles on canvas.
     circles: list of (cx, cy, radius, (r,g,b), alpha)
@@ -189,6 +260,7 @@ def draw_decorative_circles(canvas, circles):
     return Image.alpha_composite(canvas, overlay)
 
 
+@trace.stage
 def draw_pill_badge(draw, text, x, y, font, bg_color, text_color, padding=(24, 10)):
     """Draw a pill-shaped badge with text. Returns (width, height)."""
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -199,106 +271,59 @@ def draw_pill_badge(draw, text, x, y, font, bg_color, text_color, padding=(24, 1
     return w, h
 
 
+@trace.stage
+def draw_phone_frame(canvas, center_x, top_y, screen_w, screen_h):
+    """Draw the empty iPhone bezel (shadow, frame, Dynamic Island); locale-independent."""
+    phone_w = frame_template(APPSTORE_FRAME, screen_w, screen_h).size[0]
+    place_phone(canvas, APPSTORE_FRAME, None, center_x - phone_w // 2, top_y, screen_w, screen_h)
+
+
+@trace.stage
+def draw_phone_screen(canvas, screenshot_path, center_x, top_y, screen_w, screen_h):
+    """Fill a frame from draw_phone_frame with the screenshot (or a placeholder)."""
+    tpl = frame_template(APPSTORE_FRAME, screen_w, screen_h)
+    phone_x = center_x - tpl.size[0] // 2
+    screenshot = fit_cached(screenshot_path, (screen_w, screen_h), loader=load_screenshot)
+    if screenshot is not None:
+        place_screen(canvas, APPSTORE_FRAME, screenshot, phone_x, top_y, screen_w, screen_h)
+        return
+
+    print(f"    ! Missing: {os.path.basename(screenshot_path)}")
+    pf = load_font("regular", 32, FONT_ROLES["regular"])
+    screen_x = phone_x + tpl.screen_origin[0]
+    screen_y = top_y + tpl.screen_origin[1]
+    ImageDraw.Draw(canvas).text((screen_x + screen_w // 4, screen_y + screen_h // 2),
+                                "Screenshot\nNeeded", fill=WHITE, font=pf)
+
+
+@trace.stage
 def draw_phone_bezel(canvas, screenshot_path, center_x, top_y, screen_w, screen_h):
     """Draw a realistic iPhone bezel frame with Dynamic Island."""
-    bezel_thickness = int(screen_w * 0.04)
-    outer_radius = int(screen_w * 0.14)
-    inner_radius = int(screen_w * 0.10)
-
-    phone_w = screen_w + bezel_thickness * 2
-    phone_h = screen_h + bezel_thickness * 2
-    phone_x = center_x - phone_w // 2
-    phone_y = top_y
-
-    phone = Image.new("RGBA", (phone_w, phone_h), (0, 0, 0, 0))
-    pd = ImageDraw.Draw(phone)
-
-    # Outer bezel
-    pd.rounded_rectangle(
-        [(0, 0), (phone_w - 1, phone_h - 1)],
-        radius=outer_radius, fill=(*BEZEL_BLACK, 255)
-    )
-    # Subtle edge highlight
-    pd.rounded_rectangle(
-        [(1, 1), (phone_w - 2, phone_h - 2)],
-        radius=outer_radius, fill=(*BEZEL_EDGE, 255)
-    )
-    # Inner bezel fill
-    pd.rounded_rectangle(
-        [(3, 3), (phone_w - 4, phone_h - 4)],
-        radius=outer_radius - 2, fill=(*BEZEL_BLACK, 255)
-    )
-
-    # Screen area
-    screen_x = bezel_thickness
-    screen_y = bezel_thickness
-    pd.rounded_rectangle(
-        [(screen_x, screen_y), (screen_x + screen_w - 1, screen_y + screen_h - 1)],
-        radius=inner_radius, fill=(200, 200, 200, 255)
-    )
-
-    # Dynamic Island
-    di_w = int(screen_w * 0.28)
-    di_h = int(screen_w * 0.075)
-    di_x = phone_w // 2 - di_w // 2
-    di_y = bezel_thickness + int(screen_h * 0.015)
-    di_radius = di_h // 2
-    pd.rounded_rectangle(
-        [(di_x, di_y), (di_x + di_w, di_y + di_h)],
-        radius=di_radius, fill=(*BEZEL_BLACK, 255)
-    )
-
-    # Load and paste screenshot
-    if os.path.exists(screenshot_path):
-        screenshot = Image.open(screenshot_path).convert("RGBA")
-        screenshot = screenshot.resize((screen_w, screen_h), Image.LANCZOS)
-        ss_mask = Image.new("L", (screen_w, screen_h), 0)
-        ImageDraw.Draw(ss_mask).rounded_rectangle(
-            [(0, 0), (screen_w - 1, screen_h - 1)],
-            radius=inner_radius, fill=255
-        )
-        phone.paste(screenshot, (screen_x, screen_y), ss_mask)
-        # Re-draw Dynamic Island on top
-        pd2 = ImageDraw.Draw(phone)
-        pd2.rounded_rectangle(
-            [(di_x, di_y), (di_x + di_w, di_y + di_h)],
-            radius=di_radius, fill=(*BEZEL_BLACK, 255)
-        )
-    else:
-        print(f"    ! Missing: {os.path.basename(screenshot_path)}")
-        try:
-            pf = ImageFont.truetype(FONT_REG, 32)
-        except Exception:
-            pf = ImageFont.load_default()
-        pd.text((screen_x + screen_w // 4, screen_y + screen_h // 2),
-                "Screenshot\nNeeded", fill=WHITE, font=pf)
-
-    # Drop shadow behind phone
-    shadow_pad = 60
-    shadow_img = Image.new("RGBA",
-                           (phone_w + shadow_pad * 2, phone_h + shadow_pad * 2),
-                           (0, 0, 0, 0))
-    ImageDraw.Draw(shadow_img).rounded_rectangle(
-        [(shadow_pad, shadow_pad),
-         (phone_w + shadow_pad - 1, phone_h + shadow_pad - 1)],
-        radius=outer_radius, fill=(0, 0, 0, 55)
-    )
-    shadow_img = shadow_img.filter(ImageFilter.GaussianBlur(radius=35))
-
-    canvas.paste(shadow_img,
-                 (phone_x - shadow_pad, phone_y - shadow_pad + 15),
-                 shadow_img)
-    canvas.paste(phone, (phone_x, phone_y), phone)
+    draw_phone_frame(canvas, center_x, top_y, screen_w, screen_h)
+    draw_phone_screen(canvas, screenshot_path, center_x, top_y, screen_w, screen_h)
 
 
+# Each screen is split into a locale-independent base (background, decorative
+# circles, empty phone frame) and a per-locale overlay (text, pills and the
+# screenshot) drawn on a copy of the cached base. `*_phone(size)` returns the
+# (center_x, top_y, screen_w, screen_h) both halves share.
+
 # ── Screen 1: Hero/Home ─────────────────────────────────────────────────────
 
-def generate_screen_1_hero(size, lang, screenshots):
-    """Text left-top, phone shifted right & overflowing bottom.
-    Dark purple gradient + large decorative circle top-right."""
+def hero_phone(size):
+    """Phone: 55% width, shifted right, overflowing bottom ~15%."""
     w, h = size
     s = w / 1290
-    copy = COPY[lang][0]
+    screen_w = int(590 * s)
+    screen_h = int(screen_w * IPHONE_ASPECT)
+    # starts below text, overflows bottom
+    return int(w * 0.62), int(h * 0.42), screen_w, screen_h
+
+
+@trace.stage
+def hero_base(size):
+    """Dark purple gradient + large decorative circle top-right."""
+    w, h = size
 
     # Background: dark purple gradient
     canvas = create_gradient(size, (30, 20, 55), (50, 35, 85)).convert("RGBA")
@@ -309,6 +334,17 @@ def generate_screen_1_hero(size, lang, screenshots):
         (int(w * 0.1), int(h * 0.75), int(w * 0.25), PURPLE, 15),
     ])
 
+    draw_phone_frame(canvas, *hero_phone(size))
+    return canvas
+
+
+@trace.stage
+def generate_screen_1_hero(canvas, size, lang, screenshots):
+    """Text left-top, phone shifted right & overflowing bottom."""
+    w, h = size
+    s = w / 1290
+    copy = COPY[lang][0]
+
     draw = ImageDraw.Draw(canvas)
     margin = int(75 * s)
 
@@ -334,25 +370,26 @@ def generate_screen_1_hero(size, lang, screenshots):
     for i, line in enumerate(copy.get("sub", "").split("\n")):
         draw.text((margin, sub_y + i * int(48 * s)), line, font=sub_font, fill=(190, 180, 210))
 
-    # Phone: 55% width, shifted right, overflowing bottom ~15%
-    screen_w = int(590 * s)
-    screen_h = int(screen_w * IPHONE_ASPECT)
-    phone_center_x = int(w * 0.62)
-    phone_top_y = int(h * 0.42)  # starts below text, overflows bottom
-
-    draw_phone_bezel(canvas, screenshots["home"], phone_center_x, phone_top_y, screen_w, screen_h)
+    draw_phone_screen(canvas, screenshots["home"], *hero_phone(size))
 
     return canvas
 
 
 # ── Screen 2: Thought Unwinder ───────────────────────────────────────────────
 
-def generate_screen_2_unwinder(size, lang, screenshots):
-    """Text top-center, phone center, feature pills at bottom.
-    Light lavender background + subtle decorative arcs."""
+def unwinder_phone(size):
+    """Phone — centered, standard size."""
     w, h = size
     s = w / 1290
-    copy = COPY[lang][1]
+    screen_w = int(540 * s)
+    screen_h = int(screen_w * IPHONE_ASPECT)
+    return w // 2, int(h * 0.28), screen_w, screen_h
+
+
+@trace.stage
+def unwinder_base(size):
+    """Light lavender background + subtle decorative arcs."""
+    w, h = size
 
     # Background: light lavender
     canvas = create_gradient(size, LAVENDER_BG, (245, 240, 255)).convert("RGBA")
@@ -363,6 +400,17 @@ def generate_screen_2_unwinder(size, lang, screenshots):
         (int(w * 0.05), int(h * 0.55), int(w * 0.12), LAVENDER, 20),
     ])
 
+    draw_phone_frame(canvas, *unwinder_phone(size))
+    return canvas
+
+
+@trace.stage
+def generate_screen_2_unwinder(canvas, size, lang, screenshots):
+    """Text top-center, phone center, feature pills at bottom."""
+    w, h = size
+    s = w / 1290
+    copy = COPY[lang][1]
+
     draw = ImageDraw.Draw(canvas)
 
     # Pill badge tag — centered
@@ -390,12 +438,7 @@ def generate_screen_2_unwinder(size, lang, screenshots):
     l2_w = l2_bbox[2] - l2_bbox[0]
     draw.text(((w - l2_w) // 2, line2_y), copy["line2"], font=italic_font, fill=PURPLE)
 
-    # Phone — centered, standard size
-    screen_w = int(540 * s)
-    screen_h = int(screen_w * IPHONE_ASPECT)
-    phone_top_y = int(h * 0.28)
-
-    draw_phone_bezel(canvas, screenshots["unwinder"], w // 2, phone_top_y, screen_w, screen_h)
+    draw_phone_screen(canvas, screenshots["unwinder"], *unwinder_phone(size))
 
     # Feature pills at bottom — 3 pills in a row
     pill_font = get_bold_font(int(26 * s))
@@ -424,12 +467,19 @@ def generate_screen_2_unwinder(size, lang, screenshots):
 
 # ── Screen 3: Mood Check ────────────────────────────────────────────────────
 
-def generate_screen_3_mood(size, lang, screenshots):
-    """Short headline top, very large phone centered.
-    Warm lavender gradient + '10 sec' badge near phone."""
+def mood_phone(size):
+    """Phone — large (65%), centered, slightly overflowing bottom."""
     w, h = size
     s = w / 1290
-    copy = COPY[lang][2]
+    screen_w = int(700 * s)
+    screen_h = int(screen_w * IPHONE_ASPECT)
+    return w // 2, int(h * 0.32), screen_w, screen_h
+
+
+@trace.stage
+def mood_base(size):
+    """Warm lavender gradient + decorative circles."""
+    w, h = size
 
     # Background: warm lavender gradient
     canvas = create_gradient(size, (245, 240, 255), LAVENDER_BG).convert("RGBA")
@@ -440,6 +490,17 @@ def generate_screen_3_mood(size, lang, screenshots):
         (int(w * 0.88), int(h * 0.85), int(w * 0.22), LAVENDER, 18),
     ])
 
+    draw_phone_frame(canvas, *mood_phone(size))
+    return canvas
+
+
+@trace.stage
+def generate_screen_3_mood(canvas, size, lang, screenshots):
+    """Short headline top, very large phone centered, '10 sec' badge near phone."""
+    w, h = size
+    s = w / 1290
+    copy = COPY[lang][2]
+
     draw = ImageDraw.Draw(canvas)
 
     # Pill badge tag — centered
@@ -467,12 +528,9 @@ def generate_screen_3_mood(size, lang, screenshots):
     l2_w = l2_bbox[2] - l2_bbox[0]
     draw.text(((w - l2_w) // 2, line2_y), copy["line2"], font=italic_font, fill=PURPLE)
 
-    # Phone — large (65%), centered, slightly overflowing bottom
-    screen_w = int(700 * s)
-    screen_h = int(screen_w * IPHONE_ASPECT)
-    phone_top_y = int(h * 0.32)
-
-    draw_phone_bezel(canvas, screenshots["mood"], w // 2, phone_top_y, screen_w, screen_h)
+    phone = mood_phone(size)
+    _, phone_top_y, screen_w, _ = phone
+    draw_phone_screen(canvas, screenshots["mood"], *phone)
 
     # "10 sec" badge — top-right of phone
     badge_text = copy.get("badge", "10 sec")
@@ -487,12 +545,19 @@ def generate_screen_3_mood(size, lang, screenshots):
 
 # ── Screen 4: Insights ──────────────────────────────────────────────────────
 
-def generate_screen_4_insights(size, lang, screenshots):
-    """Phone left side, text right side (horizontal split).
-    Medium-dark purple gradient + decorative circles."""
+def insights_phone(size):
+    """Phone — left side, 50% width, overflowing bottom."""
     w, h = size
     s = w / 1290
-    copy = COPY[lang][3]
+    screen_w = int(540 * s)
+    screen_h = int(screen_w * IPHONE_ASPECT)
+    return int(w * 0.32), int(h * 0.22), screen_w, screen_h
+
+
+@trace.stage
+def insights_base(size):
+    """Medium-dark purple gradient + decorative circles."""
+    w, h = size
 
     # Background: medium-dark purple gradient
     canvas = create_gradient(size, (55, 40, 100), (75, 55, 130)).convert("RGBA")
@@ -503,15 +568,20 @@ def generate_screen_4_insights(size, lang, screenshots):
         (int(w * 0.7), int(h * 0.75), int(w * 0.2), PURPLE, 15),
     ])
 
-    draw = ImageDraw.Draw(canvas)
+    draw_phone_frame(canvas, *insights_phone(size))
+    return canvas
 
-    # Phone — left side, 50% width, overflowing bottom
-    screen_w = int(540 * s)
-    screen_h = int(screen_w * IPHONE_ASPECT)
-    phone_center_x = int(w * 0.32)
-    phone_top_y = int(h * 0.22)
 
-    draw_phone_bezel(canvas, screenshots["insights"], phone_center_x, phone_top_y, screen_w, screen_h)
+@trace.stage
+def generate_screen_4_insights(canvas, size, lang, screenshots):
+    """Phone left side, text right side (horizontal split)."""
+    w, h = size
+    s = w / 1290
+    copy = COPY[lang][3]
+
+    draw = ImageDraw.Draw(canvas)
+
+    draw_phone_screen(canvas, screenshots["insights"], *insights_phone(size))
 
     # Text — right side
     right_x = int(w * 0.62)
@@ -549,12 +619,19 @@ def generate_screen_4_insights(size, lang, screenshots):
 
 # ── Screen 5: Breathing ─────────────────────────────────────────────────────
 
-def generate_screen_5_breathing(size, lang, screenshots):
-    """Phone upper-center, text at bottom.
-    Deep purple gradient + large decorative circles."""
+def breathing_phone(size):
+    """Phone — upper-center."""
     w, h = size
     s = w / 1290
-    copy = COPY[lang][4]
+    screen_w = int(560 * s)
+    screen_h = int(screen_w * IPHONE_ASPECT)
+    return w // 2, int(h * 0.13), screen_w, screen_h
+
+
+@trace.stage
+def breathing_base(size):
+    """Deep purple gradient + large decorative circles."""
+    w, h = size
 
     # Background: deep purple gradient
     canvas = create_gradient(size, (65, 45, 125), (35, 25, 70)).convert("RGBA")
@@ -566,6 +643,17 @@ def generate_screen_5_breathing(size, lang, screenshots):
         (int(w * 0.5), int(h * 0.45), int(w * 0.15), PURPLE_LIGHT, 12),
     ])
 
+    draw_phone_frame(canvas, *breathing_phone(size))
+    return canvas
+
+
+@trace.stage
+def generate_screen_5_breathing(canvas, size, lang, screenshots):
+    """Phone upper-center, text at bottom."""
+    w, h = size
+    s = w / 1290
+    copy = COPY[lang][4]
+
     draw = ImageDraw.Draw(canvas)
 
     # Pill badge tag — top center
@@ -579,12 +667,7 @@ def generate_screen_5_breathing(size, lang, screenshots):
     draw_pill_badge(draw, copy["tag"], tag_x, tag_y, tag_font,
                     (*WHITE, 35), WHITE, padding=(tag_pad_x, int(10 * s)))
 
-    # Phone — upper-center
-    screen_w = int(560 * s)
-    screen_h = int(screen_w * IPHONE_ASPECT)
-    phone_top_y = int(h * 0.13)
-
-    draw_phone_bezel(canvas, screenshots["breathing"], w // 2, phone_top_y, screen_w, screen_h)
+    draw_phone_screen(canvas, screenshots["breathing"], *breathing_phone(size))
 
     # Headline — bottom, large
     title_font = get_bold_font(int(110 * s))
@@ -628,40 +711,305 @@ def generate_screen_5_breathing(size, lang, screenshots):
 
 # ── Dispatcher ───────────────────────────────────────────────────────────────
 
+# Per screen: (locale-independent base, per-locale overlay).
 GENERATORS = [
-    generate_screen_1_hero,
-    generate_screen_2_unwinder,
-    generate_screen_3_mood,
-    generate_screen_4_insights,
-    generate_screen_5_breathing,
+    (hero_base, generate_screen_1_hero),
+    (unwinder_base, generate_screen_2_unwinder),
+    (mood_base, generate_screen_3_mood),
+    (insights_base, generate_screen_4_insights),
+    (breathing_base, generate_screen_5_breathing),
 ]
-
-
-def generate_preview(size, prefix, lang, idx, screenshots):
-    """Generate a single preview image using the screen-specific layout."""
-    canvas = GENERATORS[idx](size, lang, screenshots)
-
-    out_name = f"{prefix}_preview_{idx + 1}_{lang}.png"
-    canvas.convert("RGB").save(os.path.join(OUT_DIR, out_name), quality=95)
-    print(f"  + {out_name}")
+PHONE_LAYOUTS = [hero_phone, unwinder_phone, mood_phone, insights_phone, breathing_phone]
+
+
+@lru_cache(maxsize=len(GENERATORS) * len(SIZES))
+def base_layer(idx, size):
+    """Cached base layer of screen idx; shared, so overlays draw on a copy."""
+    return GENERATORS[idx][0](size)
+
+
+@trace.stage
+def render_canvas(size, lang, idx, screenshots):
+    """Per-locale overlay on a copy of the cached base layer."""
+    overlay = GENERATORS[idx][1]
+    return overlay(base_layer(idx, size).copy(), size, lang, screenshots)
+
+
+def preview_name(prefix, lang, idx):
+    return f"{prefix}_preview_{idx + 1}_{lang}{OUTPUT.suffix}"
+
+
+def size_groups(policy):
+    """{rendered size name: [size names derived from its render]} for a SIZE_POLICY."""
+    groups = {name: [] for name in SIZES if policy[name] == "native"}
+    for name in SIZES:
+        if policy[name] == "derive":
+            groups[DERIVE_FROM[name]].append(name)
+    return groups
+
+
+def generate_preview(size, prefix, lang, idx, screenshots, derived=(), writer=None):
+    """Generate a single preview image using the screen-specific layout, plus the
+    `derived` sizes scaled from it in memory. Returns a WriteResult per output,
+    or futures of them when encoding is handed to `writer`."""
+    image = render_canvas(size, lang, idx, screenshots).convert("RGB")
+
+    results = []
+    for name in (prefix, *derived):
+        path = os.path.join(OUT_DIR, preview_name(name, lang, idx))
+        out = image if name == prefix else derive_size(image, SIZES[name])
+        results.append(writer.submit(out, path, OUTPUT) if writer else write_output(out, path, OUTPUT))
+    return results
+
+
+def render_job(job, writer=None):
+    """Render one (lang, size name, screen index, derived size names) job; used by the process pool."""
+    lang, name, idx, derived = job
+    return generate_preview(SIZES[name], name, lang, idx, screenshots_for(lang), derived, writer)
+
+
+def in_order(rendered, lag=1):
+    """WriteResults of per-job result lists, in job order. Futures are only waited
+    on once `lag` more jobs have rendered, so encoding overlaps the next render."""
+    pending = deque()
+    for results in rendered:
+        pending.append(results)
+        while len(pending) > lag:
+            yield from (r.result() if isinstance(r, Future) else r for r in pending.popleft())
+    while pending:
+        yield from (r.result() if isinstance(r, Future) else r for r in pending.popleft())
+
+
+def render_parallel(jobs, workers):
+    """Fan jobs out to a process pool and yield each job's WriteResults in job order.
+    Screenshots are decoded once here and shared with the workers; output is
+    byte-identical to a serial run. Consecutive jobs that share a base layer
+    go to the same worker in one chunk."""
+    paths = sorted({p for lang in COPY for p in screenshots_for(lang).values()})
+    blocks, specs = share_screenshots(paths)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_screenshots,
+                                 initargs=(specs,)) as pool:
+            yield from pool.map(render_job, jobs, chunksize=len(COPY))
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+# ── Incremental Builds ───────────────────────────────────────────────────────
+
+MANIFEST_NAME = ".preview_manifest.json"
+
+# Everything a generator draws with; a source change here invalidates every preview.
+RENDER_HELPERS = [
+    create_gradient,
+    round_corners,
+    draw_decorative_circles,
+    draw_pill_badge,
+    draw_phone_frame,
+    draw_phone_screen,
+    render_canvas,
+]
+# Every render_kit module a preview's pixels or bytes depend on.
+RENDER_MODULES = [derive, device_frame, encode, fonts, gradient, image_cache, shadow]
+
+_FILE_DIGESTS = {}
+
+
+def _file_digest(path):
+    """sha256 of a file's bytes (memoized per run); 'missing' if absent."""
+    if path not in _FILE_DIGESTS:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                _FILE_DIGESTS[path] = hashlib.sha256(f.read()).hexdigest()
+        else:
+            _FILE_DIGESTS[path] = "missing"
+    return _FILE_DIGESTS[path]
+
+
+def _resolved_fonts():
+    """Font file each role resolves to ("default" for Pillow's built-in font)."""
+    return [resolve_font(role, paths) or "default" for role, paths in FONT_ROLES.items()]
+
+
+def _style_constants():
+    """Module-level colours, aspect ratio and font paths by name. Dicts and lists
+    (COPY, SIZES, ...) enter preview_inputs per preview; *_DIR paths vary by checkout."""
+    return {
+        k: v for k, v in sorted(globals().items())
+        if k.isupper() and not k.endswith("_DIR") and isinstance(v, (int, float, str, tuple))
+    }
+
+
+def preview_inputs(lang, name, idx, source=None):
+    """Every input of one preview by name: copy, screenshot, fonts, constants, size and code.
+    A size derived from `source` has that render's hash plus the derivation."""
+    if source is not None:
+        return {
+            "source": preview_input_hash(lang, source, idx),
+            "size": SIZES[name],
+            "derive": inspect.getsource(derive),
+            "output": repr(OUTPUT),
+        }
+    screenshot = screenshots_for(lang)[SCREENS[idx]]
+    return {
+        "copy": COPY[lang][idx],
+        "size": SIZES[name],
+        "screenshot": _file_digest(screenshot),
+        "fonts": {p: _file_digest(p) for p in _resolved_fonts()},
+        "constants": _style_constants(),
+        "generator": [inspect.getsource(fn) for fn in (*GENERATORS[idx], PHONE_LAYOUTS[idx])],
+        "helpers": [inspect.getsource(fn) for fn in RENDER_HELPERS],
+        "render_kit": [inspect.getsource(mod) for mod in RENDER_MODULES],
+        "output": repr(OUTPUT),
+    }
+
+
+def preview_input_hash(lang, name, idx, source=None):
+    """Hash of preview_inputs(); the manifest stores it per output file."""
+    blob = json.dumps(preview_inputs(lang, name, idx, source), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def load_manifest():
+    try:
+        with open(os.path.join(OUT_DIR, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    path = os.path.join(OUT_DIR, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def stale_jobs(jobs, manifest, force=False):
+    """Split jobs by manifest hash; a job runs if any of its outputs is stale.
+    Returns (jobs to render, {out_name: hash}, hits)."""
+    todo, hashes, hits = [], {}, 0
+    for lang, name, idx, derived in jobs:
+        outputs = {}
+        for size, source in [(name, None)] + [(d, name) for d in derived]:
+            outputs[preview_name(size, lang, idx)] = preview_input_hash(lang, size, idx, source)
+        fresh = [out_name for out_name, digest in outputs.items()
+                 if manifest.get(out_name) == digest and os.path.exists(os.path.join(OUT_DIR, out_name))]
+        if len(fresh) == len(outputs) and not force:
+            hits += len(outputs)
+            continue
+        todo.append((lang, name, idx, derived))
+        hashes.update(outputs)
+    return todo, hashes, hits
+
+
+def check_derived():
+    """Render every derivable size both ways and compare text sharpness (SSIM).
+    Prints one line per preview; returns the number of degraded ones."""
+    degraded = 0
+    for name, source in DERIVE_FROM.items():
+        for lang in COPY:
+            screenshots = screenshots_for(lang)
+            for idx in range(len(SCREENS)):
+                master = render_canvas(SIZES[source], lang, idx, screenshots).convert("RGB")
+                native = render_canvas(SIZES[name], lang, idx, screenshots).convert("RGB")
+                report = text_ssim(native, derive_size(master, SIZES[name]))
+                flag = "  DEGRADED: keep this size native" if report.degraded else ""
+                degraded += report.degraded
+                print(f"  {preview_name(name, lang, idx)} from {source}: SSIM {report.score:.3f} over "
+                      f"{report.tiles} tiles, worst {report.worst:.3f} at {report.worst_box}{flag}")
+    return degraded
+
+
+def preview_jobs(groups):
+    """(lang, size name, screen index, derived size names) per rendered preview.
+    Locale innermost: consecutive jobs reuse the same cached base layer."""
+    return [(lang, name, i, tuple(derived)) for name, derived in groups.items()
+            for i in range(len(SCREENS)) for lang in COPY]
+
+
+def watch_previews(groups, force=False):
+    """--watch: build stale previews, then re-render each preview whose inputs
+    change (COPY, colours, layout code, screenshots) in this warm process."""
+    manifest = load_manifest()
+
+    def jobs(gp):
+        return {job: {**gp.preview_inputs(*job[:3]), "derived": job[3]} for job in gp.preview_jobs(groups)}
+
+    def built(gp, job, results):
+        lang, name, idx, derived = job
+        for size, source in [(name, None)] + [(d, name) for d in derived]:
+            manifest[gp.preview_name(size, lang, idx)] = gp.preview_input_hash(lang, size, idx, source)
+        gp.save_manifest(manifest)
+
+    initial, _, _ = stale_jobs(preview_jobs(groups), manifest, force=force)
+    serve(sys.modules[__name__], [SCREENSHOTS_DIR], jobs, lambda gp, job, writer: gp.render_job(job, writer),
+          initial=initial, built=built, carry=("_SCREENSHOTS", "_FILE_DIGESTS"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate App Store preview images")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Render on N worker processes (default: 1, serial)")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the build manifest and re-render every preview")
+    parser.add_argument("--derive", action="append", default=[], choices=sorted(DERIVE_FROM),
+                        help="Downscale this size from its source render instead of SIZE_POLICY (repeatable)")
+    parser.add_argument("--native", action="append", default=[], choices=sorted(DERIVE_FROM),
+                        help="Render this size natively instead of SIZE_POLICY (repeatable)")
+    parser.add_argument("--check-derived", action="store_true",
+                        help="Compare derived sizes with native renders (SSIM) and exit; 1 if any degrade")
+    parser.add_argument("--watch", action="store_true",
+                        help="Stay running and re-render previews whose copy, code or screenshots change")
+    parser.add_argument("--trace", metavar="OUT.json",
+                        help="Write a Chrome trace of every render stage (read by render_kit.trace)")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
+    args = parse_args()
     os.makedirs(OUT_DIR, exist_ok=True)
     os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
 
     print(f"Screenshots: {SCREENSHOTS_DIR}")
     print(f"Output: {OUT_DIR}\n")
 
-    for lang in ["en", "tr"]:
-        shots = screenshots_for(lang)
-        print(f"\n=== {lang.upper()} ===")
-        for name, size in SIZES.items():
-            print(f"\n--- {name} ({size[0]}x{size[1]}) ---")
-            for i in range(len(SCREENS)):
-                generate_preview(size, name, lang, i, shots)
+    if args.check_derived:
+        print("Derived sizes vs. native renders:")
+        raise SystemExit(1 if check_derived() else 0)
+    policy = {**SIZE_POLICY, **{n: "derive" for n in args.derive}, **{n: "native" for n in args.native}}
+    groups = size_groups(policy)
+    if args.watch:
+        watch_previews(groups, force=args.force)
+        raise SystemExit(0)
+
+    manifest = load_manifest()
+    jobs, hashes, hits = stale_jobs(preview_jobs(groups), manifest, force=args.force)
+    print(f"Build cache: {hits} hit, {len(hashes)} miss")
+
+    writer = OutputWriter()
+    if args.jobs > 1 and len(jobs) > 1:
+        print(f"Rendering {len(jobs)} previews on {args.jobs} workers")
+        rendered = render_parallel(jobs, args.jobs)
+    else:
+        rendered = (render_job(job, writer) for job in jobs)
+    try:
+        for result in in_order(rendered):
+            out_name = result.path.name
+            manifest[out_name] = hashes[out_name]
+            if result.written:
+                print(f"  + {out_name} ({result.size // 1024} KB, {result.encoding})")
+            else:
+                print(f"  = {out_name} (unchanged)")
+    finally:
+        writer.close()
+        save_manifest(manifest)
 
     print(f"\nDone! Output: {OUT_DIR}")
     print(f"\nRequired screenshots (place in {SCREENSHOTS_DIR}):")
-    for lang in ["en", "tr"]:
+    for lang in COPY:
         print(f"  {lang.upper()}: " + ", ".join(f"{s}_{lang}.png" for s in SCREENS))
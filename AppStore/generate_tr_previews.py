@@ -1,10 +1,22 @@
 """
 Generate TR App Store previews by reusing the same layout as EN previews.
 Uses TR onboarding screenshots + proper Turkish copy with correct characters.
+Tracing: add --trace out.json (or set UNTWIST_TRACE=1); see render_kit/trace.py.
+Iterating on COPY_TR: --watch re-renders only the previews each save affects.
 """
 
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PIL import ImageDraw
+import argparse
+import inspect
 import os
+import sys
+
+from render_kit import load_font, trace, vertical_gradient
+from render_kit.derive import derive_size
+from render_kit.device_frame import APPSTORE_FRAME, frame_template, place_phone
+from render_kit.encode import APP_STORE, OutputWriter
+from render_kit.image_cache import default_cache, fit_cached
+from render_kit.watch import serve
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUT_DIR = os.path.join(SCRIPT_DIR, "Previews")
@@ -19,23 +31,14 @@ SF_HEAVY = "/Library/Fonts/SF-Pro-Display-Heavy.otf"
 SF_BLACK = "/Library/Fonts/SF-Pro-Display-Black.otf"
 SF_BOLD = "/System/Library/Fonts/SFNS.ttf"
 
-def _try_font(paths, size):
-    for p in paths:
-        if os.path.exists(p):
-            try:
-                return ImageFont.truetype(p, size)
-            except Exception:
-                continue
-    return ImageFont.truetype(FONT_BOLD, size)
-
 def get_title_font(size):
-    return _try_font([SF_BLACK, SF_HEAVY, SF_BOLD, FONT_BOLD], size)
+    return load_font("black", size, (SF_BLACK, SF_HEAVY, SF_BOLD, FONT_BOLD))
 
 def get_body_font(size):
-    return _try_font([SF_BOLD, FONT_BOLD], size)
+    return load_font("bold", size, (SF_BOLD, FONT_BOLD))
 
 def get_sub_font(size):
-    return _try_font([FONT_REG], size)
+    return load_font("regular", size, (FONT_REG,))
 
 # Untwist brand colors
 PURPLE_DEEP = (75, 50, 140)
@@ -48,8 +51,6 @@ BG_DARK = (26, 21, 40)
 WHITE = (255, 255, 255)
 TEXT_DARK = (45, 35, 68)
 TEXT_MID = (107, 97, 137)
-BEZEL_BLACK = (20, 20, 22)
-BEZEL_EDGE = (40, 40, 42)
 
 THEMES = [
     {"bg_top": (30, 20, 55), "bg_bot": (50, 35, 85), "title": WHITE, "accent": PURPLE_LIGHT, "sub": (190, 180, 210), "tag": PURPLE_LIGHT, "cta_bg": PURPLE, "cta_text": WHITE},
@@ -99,62 +100,21 @@ COPY_TR = [
 ]
 
 
+@trace.stage
 def create_gradient(size, top_color, bot_color):
-    w, h = size
-    img = Image.new("RGB", size)
-    px = img.load()
-    for y in range(h):
-        r = y / h
-        for x in range(w):
-            px[x, y] = tuple(int(top_color[i] + (bot_color[i] - top_color[i]) * r) for i in range(3))
-    return img
+    return vertical_gradient(size, top_color, bot_color)
 
 
+@trace.stage
 def draw_phone_bezel(canvas, screenshot_path, center_x, top_y, screen_w, screen_h):
-    bezel_thickness = int(screen_w * 0.04)
-    outer_radius = int(screen_w * 0.14)
-    inner_radius = int(screen_w * 0.10)
-    phone_w = screen_w + bezel_thickness * 2
-    phone_h = screen_h + bezel_thickness * 2
-    phone_x = center_x - phone_w // 2
-    phone_y = top_y
-
-    phone = Image.new("RGBA", (phone_w, phone_h), (0, 0, 0, 0))
-    pd = ImageDraw.Draw(phone)
-    pd.rounded_rectangle([(0, 0), (phone_w - 1, phone_h - 1)], radius=outer_radius, fill=(*BEZEL_BLACK, 255))
-    pd.rounded_rectangle([(1, 1), (phone_w - 2, phone_h - 2)], radius=outer_radius, fill=(*BEZEL_EDGE, 255))
-    pd.rounded_rectangle([(3, 3), (phone_w - 4, phone_h - 4)], radius=outer_radius - 2, fill=(*BEZEL_BLACK, 255))
-
-    screen_x = bezel_thickness
-    screen_y = bezel_thickness
-    pd.rounded_rectangle([(screen_x, screen_y), (screen_x + screen_w - 1, screen_y + screen_h - 1)], radius=inner_radius, fill=(200, 200, 200, 255))
-
-    di_w = int(screen_w * 0.28)
-    di_h = int(screen_w * 0.075)
-    di_x = phone_w // 2 - di_w // 2
-    di_y = bezel_thickness + int(screen_h * 0.015)
-    di_radius = di_h // 2
-    pd.rounded_rectangle([(di_x, di_y), (di_x + di_w, di_y + di_h)], radius=di_radius, fill=(*BEZEL_BLACK, 255))
-
-    if os.path.exists(screenshot_path):
-        screenshot = Image.open(screenshot_path).convert("RGBA")
-        screenshot = screenshot.resize((screen_w, screen_h), Image.LANCZOS)
-        ss_mask = Image.new("L", (screen_w, screen_h), 0)
-        ImageDraw.Draw(ss_mask).rounded_rectangle([(0, 0), (screen_w - 1, screen_h - 1)], radius=inner_radius, fill=255)
-        phone.paste(screenshot, (screen_x, screen_y), ss_mask)
-        pd2 = ImageDraw.Draw(phone)
-        pd2.rounded_rectangle([(di_x, di_y), (di_x + di_w, di_y + di_h)], radius=di_radius, fill=(*BEZEL_BLACK, 255))
-    else:
+    screenshot = fit_cached(screenshot_path, (screen_w, screen_h))
+    if screenshot is None:
         print(f"    ! Missing: {screenshot_path}")
-
-    shadow_pad = 60
-    shadow_img = Image.new("RGBA", (phone_w + shadow_pad * 2, phone_h + shadow_pad * 2), (0, 0, 0, 0))
-    ImageDraw.Draw(shadow_img).rounded_rectangle([(shadow_pad, shadow_pad), (phone_w + shadow_pad - 1, phone_h + shadow_pad - 1)], radius=outer_radius, fill=(0, 0, 0, 55))
-    shadow_img = shadow_img.filter(ImageFilter.GaussianBlur(radius=35))
-    canvas.paste(shadow_img, (phone_x - shadow_pad, phone_y - shadow_pad + 15), shadow_img)
-    canvas.paste(phone, (phone_x, phone_y), phone)
+    phone_w = frame_template(APPSTORE_FRAME, screen_w, screen_h).size[0]
+    place_phone(canvas, APPSTORE_FRAME, screenshot, center_x - phone_w // 2, top_y, screen_w, screen_h)
 
 
+@trace.stage
 def draw_cta_button(draw, text, center_x, y, font, bg_color, text_color, s):
     bbox = draw.textbbox((0, 0), text, font=font)
     tw = bbox[2] - bbox[0]
@@ -171,6 +131,7 @@ def draw_cta_button(draw, text, center_x, y, font, bg_color, text_color, s):
     draw.text((center_x - tw // 2, text_y), text, font=font, fill=text_color)
 
 
+@trace.stage
 def generate_tr_preview(size, idx):
     w, h = size
     s = w / 1290
@@ -225,24 +186,58 @@ def generate_tr_preview(size, idx):
     return canvas.convert("RGB")
 
 
+def render_tr_pack(idx, writer):
+    """6.7" (1290x2796) preview `idx`, plus 6.5" (1284x2778) derived from it in memory.
+    PNGs are encoded in the background while the next preview renders."""
+    img = generate_tr_preview((1290, 2796), idx)
+    resized = derive_size(img, (1284, 2778))
+    return [
+        writer.submit(img, os.path.join(OUT_DIR, f"appstore_tr_{idx+1}.png"), APP_STORE),
+        writer.submit(resized, os.path.join(OUT_DIR, f"appstore_tr_65_{idx+1}.png"), APP_STORE),
+    ]
+
+
+def style_constants():
+    """Colours and font paths defined above, by name (*_DIR paths vary by checkout)."""
+    return {k: v for k, v in sorted(globals().items())
+            if k.isupper() and not k.endswith("_DIR") and isinstance(v, (str, tuple))}
+
+
+def tr_inputs(idx):
+    """Everything preview `idx` is drawn from, by name (for --watch)."""
+    screenshot = os.path.join(SCREENSHOTS_DIR, f"onboard_{SCREENS[idx]}_tr.png")
+    code = (get_title_font, get_body_font, get_sub_font, create_gradient, draw_phone_bezel,
+            draw_cta_button, generate_tr_preview, render_tr_pack)
+    return {
+        "copy": COPY_TR[idx],
+        "theme": THEMES[idx],
+        "constants": style_constants(),
+        "screenshot": default_cache().digest(screenshot),
+        "code": [inspect.getsource(fn) for fn in code],
+    }
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate TR App Store previews")
+    parser.add_argument("--watch", action="store_true",
+                        help="Stay running and re-render previews whose copy, theme, colours, code or screenshot change")
+    parser.add_argument("--trace", metavar="OUT.json",
+                        help="Write a Chrome trace of every render stage (read by render_kit.trace)")
+    args = parser.parse_args()
     os.makedirs(OUT_DIR, exist_ok=True)
 
-    # Generate 6.7" (1290x2796)
-    print("=== TR 6.7\" (1290x2796) ===")
-    for i in range(5):
-        img = generate_tr_preview((1290, 2796), i)
-        path = os.path.join(OUT_DIR, f"appstore_tr_{i+1}.png")
-        img.save(path, "PNG")
-        print(f"  + appstore_tr_{i+1}.png: {img.size}")
-
-    # Generate 6.5" (1284x2778) by resize
-    print("\n=== TR 6.5\" (1284x2778) ===")
-    for i in range(5):
-        src = Image.open(os.path.join(OUT_DIR, f"appstore_tr_{i+1}.png"))
-        resized = src.resize((1284, 2778), Image.LANCZOS)
-        path = os.path.join(OUT_DIR, f"appstore_tr_65_{i+1}.png")
-        resized.save(path, "PNG")
-        print(f"  + appstore_tr_65_{i+1}.png: {resized.size}")
+    if args.watch:
+        serve(sys.modules[__name__], [SCREENSHOTS_DIR],
+              lambda m: {i: m.tr_inputs(i) for i in range(len(m.COPY_TR))},
+              lambda m, i, writer: m.render_tr_pack(i, writer))
+        raise SystemExit(0)
+
+    print("=== TR 6.7\" (1290x2796) + 6.5\" (1284x2778) ===")
+    with OutputWriter() as writer:
+        pending = [future for i in range(5) for future in render_tr_pack(i, writer)]
+        for future in pending:
+            result = future.result()
+            state = f"{result.size // 1024} KB" if result.written else "unchanged"
+            print(f"  + {result.path.name} ({state})")
 
     print("\nDone!")
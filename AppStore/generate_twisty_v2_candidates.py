@@ -6,15 +6,28 @@ Output:
   AppStore/tmp/twisty_v2_candidate/twisty_v2_contact_sheet.png
 
 The script does NOT touch current production Assets.xcassets.
+
+  --matting guided   refine the classifier's alpha with a guided filter
+                     (soft edges that follow the yarn, decontaminated edge
+                     colours) instead of blurring and thresholding it;
+                     --radius/--eps/--band tune it
+  --compare          time the vectorized background removal against the
+                     original per-pixel loop (and the guided filter) on
+                     AppIcon.png and check they agree (writes nothing)
 """
 
 from __future__ import annotations
 
 from pathlib import Path
+import argparse
 import colorsys
 import math
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
 
-from PIL import Image, ImageDraw, ImageFilter, ImageFont
+from render_kit import CANDIDATE_SHEET, make_contact_sheet
 
 
 ROOT = Path(__file__).resolve().parent.parent
@@ -54,8 +67,58 @@ def is_purple_bg(r: int, g: int, b: int) -> float:
     return 0.0
 
 
-def extract_mascot(appicon: Image.Image) -> Image.Image:
-    src = appicon.convert("RGBA")
+# Reference colours of the AppIcon background, matched by is_purple_bg.
+BG_REFERENCES = ((36, 18, 68), (86, 52, 132))
+# Threshold + gain applied to the blurred alpha.
+ALPHA_LUT = np.array([0 if v < 14 else min(255, int((v - 14) * 1.15)) for v in range(256)], np.uint8)
+
+
+def background_weight(rgb: np.ndarray) -> np.ndarray:
+    """is_purple_bg over a (..., 3) uint8 array, same float64 arithmetic."""
+    c = rgb.astype(np.float64)
+    r, g, b = c[..., 0] / 255, c[..., 1] / 255, c[..., 2] / 255
+
+    # colorsys.rgb_to_hsv; grey pixels (max == min) get h = s = 0.
+    maxc = np.maximum(np.maximum(r, g), b)
+    rangec = maxc - np.minimum(np.minimum(r, g), b)
+    grey = rangec == 0
+    safe_range = np.where(grey, 1.0, rangec)
+    rc, gc, bc = (maxc - r) / safe_range, (maxc - g) / safe_range, (maxc - b) / safe_range
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.where(grey, 0.0, np.mod(h / 6.0, 1.0))
+    s = np.where(grey, 0.0, rangec / np.where(grey, 1.0, maxc))
+    v = maxc
+
+    # Squared distances are exact integers, so sqrt matches math.dist.
+    d = np.sqrt(np.minimum(*(((c - ref) ** 2).sum(axis=-1) for ref in BG_REFERENCES)))
+
+    purple = (h >= 0.63) & (h <= 0.92) & (s > 0.14)
+    return np.select(
+        [purple & (d <= 48), purple & (d <= 98), (v < 0.38) & (d < 80)],
+        [1.0, (98 - d) / 50, np.maximum(0.5, (80 - d) / 80)],
+        0.0,
+    )
+
+
+def pixel_weights(px: np.ndarray) -> np.ndarray:
+    """background_weight for every pixel of an (H, W, 3+) uint8 array."""
+    # The icon has ~60k distinct colours for 1M pixels: weigh each colour once.
+    packed = (px[..., 0].astype(np.uint32) << 16) | (px[..., 1].astype(np.uint32) << 8) | px[..., 2]
+    colours, index = np.unique(packed.ravel(), return_inverse=True)
+    rgb = np.stack([colours >> 16, (colours >> 8) & 0xFF, colours & 0xFF], axis=-1).astype(np.uint8)
+    return background_weight(rgb)[index].reshape(packed.shape)
+
+
+def mascot_alpha(src: Image.Image) -> Image.Image:
+    """Alpha that removes the purple background from an RGBA AppIcon, blurred and thresholded."""
+    px = np.asarray(src)
+    alpha = (px[..., 3] * (1.0 - pixel_weights(px))).astype(np.uint8)
+    blurred = Image.fromarray(alpha, "L").filter(ImageFilter.GaussianBlur(radius=1.2))
+    return Image.fromarray(ALPHA_LUT[np.asarray(blurred)], "L")
+
+
+def reference_mascot_alpha(src: Image.Image) -> Image.Image:
+    """The original per-pixel loop, kept for --compare."""
     w, h = src.size
     px = src.load()
 
@@ -69,8 +132,122 @@ def extract_mascot(appicon: Image.Image) -> Image.Image:
             out_px[x, y] = (r, g, b, new_a)
 
     alpha = out.split()[-1].filter(ImageFilter.GaussianBlur(radius=1.2))
-    alpha = alpha.point(lambda v: 0 if v < 14 else min(255, int((v - 14) * 1.15)))
-    out.putalpha(alpha)
+    return alpha.point(lambda v: 0 if v < 14 else min(255, int((v - 14) * 1.15)))
+
+
+def box_mean(x: np.ndarray, r: int) -> np.ndarray:
+    """Mean over the (2r+1)^2 window clipped to the image, O(N) via cumulative sums.
+
+    Filters the last two axes of an (..., H, W) array.
+    """
+    out = x.astype(np.float64)
+    count = np.ones((1, 1))
+    for axis in (-2, -1):
+        n = out.shape[axis]
+        idx = np.arange(n)
+        hi, lo = np.minimum(idx + r + 1, n), np.maximum(idx - r, 0)
+        pad = [(0, 0)] * out.ndim
+        pad[axis] = (1, 0)
+        csum = np.pad(np.cumsum(out, axis=axis), pad)
+        out = np.take(csum, hi, axis=axis) - np.take(csum, lo, axis=axis)
+        count = count * ((hi - lo)[:, None] if axis == -2 else (hi - lo)[None, :])
+    return out / count
+
+
+def _resize(x: np.ndarray, size: tuple[int, int]) -> np.ndarray:
+    """Bilinear resize of each (H, W) plane of a (C, H, W) array to size=(w, h)."""
+    return np.stack([
+        np.asarray(Image.fromarray(plane.astype(np.float32), "F").resize(size, Image.BILINEAR))
+        for plane in x
+    ])
+
+
+def guided_filter(guide: np.ndarray, p: np.ndarray, r: int, eps: float, subsample: int = 4) -> np.ndarray:
+    """Colour guided filter (He et al.): `p` smoothed so its edges follow `guide`.
+
+    `guide` is (3, H, W) in [0, 1], `p` is (H, W). Every step is a box mean
+    or a per-pixel 3x3 solve, so the cost is linear in the pixel count and
+    independent of `r`. The linear coefficients are fitted on a 1/`subsample`
+    scale copy and upsampled (the "fast guided filter"); only the final
+    q = a . I + b runs at full resolution.
+    """
+    h, w = p.shape
+    small = (max(1, w // subsample), max(1, h // subsample))
+    r_small = max(1, round(r / subsample))
+    guide_s = _resize(guide, small) if subsample > 1 else guide
+    p_s = _resize(p[None], small)[0] if subsample > 1 else p
+
+    pairs = [(0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2)]
+    means = box_mean(np.concatenate(
+        [guide_s, p_s[None], guide_s * p_s] + [(guide_s[i] * guide_s[j])[None] for i, j in pairs]
+    ), r_small)
+    mean_i, mean_p, mean_ip = means[:3], means[3], means[4:7]
+    cov_ip = mean_ip - mean_i * mean_p
+
+    sigma = np.empty(p_s.shape + (3, 3))
+    for k, (i, j) in enumerate(pairs):
+        sigma[..., i, j] = sigma[..., j, i] = means[7 + k] - mean_i[i] * mean_i[j]
+    sigma += eps * np.eye(3)
+
+    a = np.moveaxis(np.linalg.solve(sigma, np.moveaxis(cov_ip, 0, -1)[..., None])[..., 0], -1, 0)
+    b = mean_p - (a * mean_i).sum(axis=0)
+    ab = box_mean(np.concatenate([a, b[None]]), r_small)
+    if subsample > 1:
+        ab = _resize(ab, (w, h))
+    return (ab[:3] * guide).sum(axis=0) + ab[3]
+
+
+def guided_matte(src: Image.Image, radius: int = 8, eps: float = 1e-4, band: int = 6) -> Image.Image:
+    """RGBA mascot with a guided-filter alpha and decontaminated edge colours.
+
+    The classifier's alpha is split into a trimap: pixels at least `band` px
+    inside the sure foreground/background keep alpha 1/0, the rest is
+    re-estimated by the guided filter with the image itself as the guide.
+    Edge colours are then un-mixed from the local background colour:
+    F = (I - (1 - alpha) B) / alpha.
+    """
+    px = np.asarray(src)
+    image = np.moveaxis(px[..., :3], -1, 0) / 255.0
+    prior = px[..., 3] / 255.0 * (1.0 - pixel_weights(px))
+
+    fg, bg = prior >= 0.999, prior <= 0.001
+    sure_fg, sure_bg = box_mean(np.stack([fg, bg]), band) >= 0.999
+    trimap = np.where(sure_fg, 1.0, np.where(sure_bg, 0.0, prior))
+
+    alpha = np.clip(guided_filter(image, trimap, radius, eps), 0.0, 1.0)
+    alpha[sure_fg], alpha[sure_bg] = 1.0, 0.0
+    alpha[alpha < 0.05] = 0.0  # stray haze would otherwise widen the crop
+    alpha[alpha > 0.97] = 1.0
+
+    # Local background colour: mean of sure-background pixels within `radius`
+    # (full-resolution px, so scaled down with the 1/4 copy), else the global one.
+    h, w = alpha.shape
+    subsample = 4
+    small = (max(1, w // subsample), max(1, h // subsample))
+    near = box_mean(_resize(np.concatenate([image * bg, bg[None]]), small), max(1, round(radius / subsample)))
+    near = _resize(near, (w, h))
+    global_bg = image[:, bg].mean(axis=1) if bg.any() else np.zeros(3)
+    background = np.where(near[3] > 1e-3, near[:3] / np.maximum(near[3], 1e-3), global_bg[:, None, None])
+
+    edge = (alpha > 0) & (alpha < 1)
+    a = alpha[edge]
+    image[:, edge] = np.clip((image[:, edge] - (1 - a) * background[:, edge]) / a, 0.0, 1.0)
+
+    out = np.dstack([*image, alpha]) * 255 + 0.5
+    return Image.fromarray(out.astype(np.uint8), "RGBA")
+
+
+MATTING = ("threshold", "guided")
+
+
+def extract_mascot(appicon: Image.Image, matting: str = "threshold", **guided) -> Image.Image:
+    if matting not in MATTING:
+        raise ValueError(f"Unknown matting {matting!r}; expected one of {MATTING}.")
+    out = appicon.convert("RGBA")
+    if matting == "guided":
+        out = guided_matte(out, **guided)
+    else:
+        out.putalpha(mascot_alpha(out))
 
     bbox = out.getbbox()
     if not bbox:
@@ -192,44 +369,47 @@ def add_expression(base: Image.Image, mood: str) -> Image.Image:
     return base
 
 
-def make_contact_sheet(masters: dict[str, Image.Image], out_path: Path) -> None:
-    card_w, card_h = 360, 420
-    cols = 3
-    rows = 3
-    sheet = Image.new("RGB", (cols * card_w + 80, rows * card_h + 120), (246, 243, 252))
-    draw = ImageDraw.Draw(sheet)
-
-    try:
-        font = ImageFont.truetype("/System/Library/Fonts/Supplemental/Arial Bold.ttf", 22)
-        title_font = ImageFont.truetype("/System/Library/Fonts/Supplemental/Arial Bold.ttf", 34)
-    except Exception:
-        font = ImageFont.load_default()
-        title_font = ImageFont.load_default()
-
-    draw.text((40, 24), "Twisty V2 Candidate Set", fill=(48, 35, 86), font=title_font)
-
-    names = list(masters.keys())
-    for idx, name in enumerate(names):
-        r = idx // cols
-        c = idx % cols
-        x = 40 + c * card_w
-        y = 80 + r * card_h
-        draw.rounded_rectangle((x, y, x + 320, y + 380), radius=28, fill=(255, 255, 255), outline=(218, 210, 241), width=2)
-
-        img = masters[name].copy().resize((250, 250), Image.LANCZOS)
-        sheet.paste(img, (x + 35, y + 44), img)
-
-        draw.text((x + 20, y + 320), name.replace("Twisty", ""), fill=(63, 52, 108), font=font)
-
-    sheet.save(out_path, format="PNG")
+def compare_extraction(appicon: Image.Image) -> None:
+    src = appicon.convert("RGBA")
+    timings = {}
+    alphas = {}
+    for label, fn in (("per-pixel loop", reference_mascot_alpha), ("vectorized", mascot_alpha)):
+        start = time.perf_counter()
+        alphas[label] = np.asarray(fn(src), np.int16)
+        timings[label] = time.perf_counter() - start
+        print(f"  {label:15s} {timings[label] * 1000:8.0f}ms")
+    diff = np.abs(alphas["per-pixel loop"] - alphas["vectorized"])
+    print(
+        f"  speedup {timings['per-pixel loop'] / timings['vectorized']:.0f}x, "
+        f"alpha max diff {diff.max()}, {np.count_nonzero(diff)} px differ"
+    )
+    start = time.perf_counter()
+    guided_matte(src)
+    print(f"  {'guided matting':15s} {(time.perf_counter() - start) * 1000:8.0f}ms")
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate Twisty V2 candidates from the AppIcon")
+    parser.add_argument("--matting", choices=MATTING, default="threshold", help="Background removal mode")
+    parser.add_argument("--radius", type=int, default=8, help="Guided filter window radius (default: 8)")
+    parser.add_argument("--eps", type=float, default=1e-4, help="Guided filter regularization (default: 1e-4)")
+    parser.add_argument("--band", type=int, default=6, help="Unknown band half-width in px (default: 6)")
+    parser.add_argument("--compare", action="store_true", help="Benchmark background removal and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_extraction(Image.open(APPICON))
+        return
+
     OUT_DIR.mkdir(parents=True, exist_ok=True)
     MASTER_DIR.mkdir(parents=True, exist_ok=True)
 
     appicon = Image.open(APPICON).convert("RGBA")
-    base = extract_mascot(appicon)
+    start = time.perf_counter()
+    base = extract_mascot(appicon, args.matting, **(
+        {"radius": args.radius, "eps": args.eps, "band": args.band} if args.matting == "guided" else {}
+    ))
+    print(f"Extracted mascot ({args.matting}) in {time.perf_counter() - start:.2f}s")
     base.save(MASTER_DIR / "TwistyBase.png")
 
     masters: dict[str, Image.Image] = {}
@@ -238,7 +418,13 @@ def main() -> None:
         masters[mood] = img
         img.save(MASTER_DIR / f"{mood}.png")
 
-    make_contact_sheet(masters, OUT_DIR / "twisty_v2_contact_sheet.png")
+    make_contact_sheet(
+        OUT_DIR / "twisty_v2_contact_sheet.png",
+        list(masters.values()),
+        [name.replace("Twisty", "") for name in masters],
+        CANDIDATE_SHEET,
+        title="Twisty V2 Candidate Set",
+    )
     print(f"Generated {len(MOODS)} candidates in: {MASTER_DIR}")
     print(f"Contact sheet: {OUT_DIR / 'twisty_v2_contact_sheet.png'}")
 
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Normalize Twisty masters to one canvas, padding and perceived body size.
+
+Usage:
+  python3 AppStore/normalize_twisty_masters.py --dry-run
+  python3 AppStore/normalize_twisty_masters.py --export      # then re-export 1x/2x
+  python3 AppStore/normalize_twisty_masters.py --target-area min --padding 0.1
+
+For every `Twisty*.imageset/<Name>.png` master (decoded once):
+- the content box is the bbox of pixels with alpha >= `--alpha-threshold`
+  (stray near-invisible specks outside it are dropped);
+- the alpha-weighted area, sum(alpha) / 255, stands in for perceived size;
+- the content is scaled by sqrt(target / area) so every mood covers the same
+  weighted area, and centred on a `--canvas`-square transparent canvas.
+
+The target is the median area of the set (or the smallest, or a fraction of
+the canvas), lowered if needed so that every scaled box keeps `--padding` of
+the canvas free on each edge. Masters whose content already sits within
+a pixel of its target placement are left untouched, so re-running is a
+no-op. The masters are rewritten in place for export_asset_scales.py, which
+picks them up through its sidecar hash (`--export` runs it straight away).
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except Exception as exc:  # pragma: no cover
+    raise SystemExit(
+        "Pillow and NumPy are required. Install with: python3 -m pip install pillow numpy\n"
+        f"Import error: {exc}"
+    )
+
+from export_asset_scales import export_set, select_sets, write_if_changed
+
+# Lanczos edges can move the thresholded bbox by a pixel; closer than this is "already normalized".
+TOLERANCE = 1
+
+
+@dataclass
+class Mascot:
+    path: Path
+    pixels: np.ndarray  # full RGBA master, the only decode
+    box: tuple[int, int, int, int]  # left, top, right, bottom (exclusive)
+    area: float  # alpha-weighted pixels inside `box`
+
+    @property
+    def box_size(self) -> tuple[int, int]:
+        return self.box[2] - self.box[0], self.box[3] - self.box[1]
+
+
+@dataclass
+class Placement:
+    mascot: Mascot
+    scale: float
+    size: tuple[int, int]
+    offset: tuple[int, int]
+
+    @property
+    def padding(self) -> int:
+        return min(self.offset)  # offsets are centred, so this is the tightest edge
+
+
+def parse_args() -> argparse.Namespace:
+    repo = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Rescale and re-centre Twisty masters to a common body size")
+    parser.add_argument(
+        "--assets",
+        type=Path,
+        default=repo / "Untwist" / "Resources" / "Assets.xcassets",
+        help="Path to Assets.xcassets",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        help="Set name glob; repeatable (default: Twisty*)",
+    )
+    parser.add_argument("--canvas", type=int, default=1024, help="Master canvas size in px (default: 1024)")
+    parser.add_argument("--padding", type=float, default=0.09, help="Minimum free edge, fraction of canvas (default: 0.09)")
+    parser.add_argument(
+        "--target-area",
+        default="median",
+        help="'median' or 'min' of the set's weighted areas, or a fraction of the canvas (default: median)",
+    )
+    parser.add_argument("--alpha-threshold", type=int, default=8, help="Alpha counted as content for the bbox (default: 8)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without writing")
+    parser.add_argument("--export", action="store_true", help="Run export_asset_scales for the rewritten sets")
+    return parser.parse_args()
+
+
+def measure(path: Path, alpha_threshold: int = 8) -> Mascot:
+    with Image.open(path) as img:
+        px = np.asarray(img.convert("RGBA"))
+    alpha = px[..., 3]
+    solid = alpha >= alpha_threshold
+    rows, cols = np.flatnonzero(solid.any(axis=1)), np.flatnonzero(solid.any(axis=0))
+    if not rows.size:
+        raise ValueError(f"No content with alpha >= {alpha_threshold}: {path}")
+    box = (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+    area = float(alpha[box[1]:box[3], box[0]:box[2]].sum(dtype=np.int64)) / 255.0
+    return Mascot(path, px, box, area)
+
+
+def target_area(mascots: list[Mascot], spec: str, canvas: int) -> float:
+    areas = [m.area for m in mascots]
+    if spec == "median":
+        return float(np.median(areas))
+    if spec == "min":
+        return min(areas)
+    return float(spec) * canvas * canvas
+
+
+def plan(mascots: list[Mascot], target: float, canvas: int, padding: float) -> list[Placement]:
+    usable = canvas - 2 * round(padding * canvas)
+    # The largest area at which every mascot's scaled box still fits the padded canvas.
+    fit = min(m.area * (usable / max(m.box_size)) ** 2 for m in mascots)
+    target = min(target, fit)
+    placements = []
+    for m in mascots:
+        scale = (target / m.area) ** 0.5
+        w, h = m.box_size
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        placements.append(Placement(m, scale, size, ((canvas - size[0]) // 2, (canvas - size[1]) // 2)))
+    return placements
+
+
+def unchanged(p: Placement, canvas: int) -> bool:
+    """True when the master is already placed to within `TOLERANCE` px."""
+    m = p.mascot
+    near = [abs(a - b) <= TOLERANCE for a, b in zip(p.size + p.offset, m.box_size + m.box[:2])]
+    return m.pixels.shape[:2] == (canvas, canvas) and all(near)
+
+
+def render(p: Placement, canvas: int) -> bytes:
+    """Encoded PNG of the placed mascot; RGBA resize in Pillow is premultiplied, so edges stay clean."""
+    left, top, right, bottom = p.mascot.box
+    content = Image.fromarray(np.ascontiguousarray(p.mascot.pixels[top:bottom, left:right]), "RGBA")
+    if p.size != content.size:
+        content = content.resize(p.size, Image.Resampling.LANCZOS)
+    out = Image.new("RGBA", (canvas, canvas), (0, 0, 0, 0))
+    out.paste(content, p.offset)
+    buf = io.BytesIO()
+    out.save(buf, "PNG", compress_level=9, compress_type=zlib.Z_RLE)
+    return buf.getvalue()
+
+
+def main() -> None:
+    args = parse_args()
+    assets_root: Path = args.assets.resolve()
+    sets = select_sets(assets_root, args.only or ["Twisty*"])
+    sets = [s for s in sets if s.suffix == ".imageset"]
+    if not sets:
+        raise SystemExit(f"No matching imagesets found under: {assets_root}")
+
+    mascots = [measure(folder / f"{folder.stem}.png", args.alpha_threshold) for folder in sets]
+    wanted = target_area(mascots, args.target_area, args.canvas)
+    placements = plan(mascots, wanted, args.canvas, args.padding)
+    target = placements[0].scale ** 2 * mascots[0].area
+    capped = " (capped by padding)" if target < wanted - 0.5 else ""
+    print(f"Target weighted area: {100 * target / args.canvas ** 2:.2f}% of {args.canvas}x{args.canvas}{capped}")
+
+    rewritten = []
+    for p in placements:
+        m = p.mascot
+        w, h = m.box_size
+        status = "unchanged"
+        if not unchanged(p, args.canvas):
+            status = "would rewrite" if args.dry_run else "rewritten"
+            if args.dry_run or write_if_changed(m.path, render(p, args.canvas)):
+                rewritten.append(m.path.parent)
+        print(
+            f"  {m.path.parent.stem}: box {w}x{h} at {m.box[:2]}, area {100 * m.area / m.pixels[..., 3].size:.2f}%"
+            f" -> x{p.scale:.3f} {p.size[0]}x{p.size[1]} at {p.offset}, padding {p.padding}px; {status}"
+        )
+
+    if args.export and rewritten and not args.dry_run:
+        for folder in rewritten:
+            print(export_set(folder))
+    print(f"{len(placements)} masters, {len(rewritten)} {'to rewrite' if args.dry_run else 'rewritten'}")
+
+
+if __name__ == "__main__":
+    main()
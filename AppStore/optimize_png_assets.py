@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Losslessly shrink PNG files in place.
+
+Usage:
+  python3 AppStore/optimize_png_assets.py --dry-run
+  python3 AppStore/optimize_png_assets.py --assets AppStore/screenshots --jobs 4
+  python3 AppStore/audit_png_assets.py --optimize   # same, plus a savings section in the report
+
+Candidates for every PNG:
+- the pixels as RGBA; RGB when every alpha is 255; L/LA when every pixel is grey;
+- a palette (<= 256 colours, tRNS for translucent entries) when the image has
+  that few distinct RGBA values;
+each encoded with the RLE, default and filtered zlib strategies. RLE is
+cheap and usually wins on large art; default/filtered are tried at level 6
+and only re-run at level 9 (4-5x slower) when within `ESCALATE` of the best.
+
+Only colour chunks (iCCP, sRGB, gAMA, cHRM) are carried over; text, EXIF,
+tIME, pHYs and private chunks (e.g. caBX provenance) are dropped. The
+smallest candidate that decodes to exactly the original RGBA pixels replaces
+the file, atomically, and only if it is smaller. 16-bit PNGs are skipped
+(Pillow decodes them to 8 bits, so a re-encode would not be lossless).
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image, PngImagePlugin
+except Exception as exc:  # pragma: no cover
+    raise SystemExit(
+        "Pillow and NumPy are required. Install with: python3 -m pip install pillow numpy\n"
+        f"Import error: {exc}"
+    )
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+COLOUR_CHUNKS = (b"sRGB", b"gAMA", b"cHRM")
+# zlib strategies tried, RLE first (Huffman-only never won on our assets).
+STRATEGIES = (zlib.Z_RLE, zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+ESCALATE = 1.05
+STRATEGY_NAMES = {zlib.Z_DEFAULT_STRATEGY: "default", zlib.Z_FILTERED: "filtered", zlib.Z_RLE: "rle"}
+
+
+@dataclass
+class OptimizeResult:
+    path: Path
+    before: int
+    after: int  # == before when the file was kept
+    encoding: str  # e.g. "RGBA, rle 9" or "kept"
+
+    @property
+    def saved(self) -> int:
+        return self.before - self.after
+
+
+def parse_args() -> argparse.Namespace:
+    repo = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Losslessly recompress PNGs in place")
+    parser.add_argument(
+        "--assets",
+        type=Path,
+        default=repo / "Untwist" / "Resources" / "Assets.xcassets",
+        help="Folder searched recursively for PNGs (default: Assets.xcassets)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Report savings without writing")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)",
+    )
+    return parser.parse_args()
+
+
+def png_chunks(data: bytes) -> list[tuple[bytes, bytes]]:
+    """(type, payload) for every chunk; ValueError if `data` is not a PNG."""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, ctype = struct.unpack(">I4s", data[pos:pos + 8])
+        chunks.append((ctype, data[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+        if ctype == b"IEND":
+            break
+    return chunks
+
+
+def _candidates(px: np.ndarray) -> list[tuple[str, Image.Image, dict]]:
+    """(label, image, extra save kwargs) for every lossless representation of RGBA `px`."""
+    opaque = bool((px[..., 3] == 255).all())
+    grey = bool(((px[..., 0] == px[..., 1]) & (px[..., 1] == px[..., 2])).all())
+    if grey:
+        mode = "L" if opaque else "LA"
+        base = Image.fromarray(px[..., 0] if opaque else px[..., [0, 3]], mode)
+    else:
+        mode = "RGB" if opaque else "RGBA"
+        base = Image.fromarray(np.ascontiguousarray(px[..., :3]) if opaque else px, mode)
+    out = [(mode, base, {})]
+
+    packed = px.view(np.uint32)[..., 0]
+    colours = np.unique(packed)
+    if len(colours) <= 256:
+        entries = colours.view(np.uint8).reshape(-1, 4)
+        # Translucent entries first keeps tRNS as short as possible.
+        order = np.argsort(entries[:, 3] == 255, kind="stable")
+        entries, colours = entries[order], colours[order]
+        lookup = np.argsort(colours)
+        index = lookup[np.searchsorted(colours[lookup], packed)].astype(np.uint8)
+        pal = Image.fromarray(index, "P")
+        pal.putpalette(entries[:, :3].tobytes(), "RGB")
+        extra = {}
+        translucent = int((entries[:, 3] < 255).sum())
+        if translucent:
+            extra["transparency"] = entries[:translucent, 3].tobytes()
+        out.append((f"P ({len(colours)} colours)", pal, extra))
+    return out
+
+
+def optimize_file(path: Path, write: bool = True) -> OptimizeResult:
+    original = path.read_bytes()
+    chunks = png_chunks(original)
+    bit_depth = chunks[0][1][8] if chunks and chunks[0][0] == b"IHDR" else 0
+    if bit_depth == 16:
+        return OptimizeResult(path, len(original), len(original), "kept (16-bit)")
+
+    with Image.open(io.BytesIO(original)) as img:
+        icc = img.info.get("icc_profile")
+        px = np.ascontiguousarray(np.asarray(img.convert("RGBA")))
+    keep = PngImagePlugin.PngInfo()
+    for ctype, payload in chunks:
+        if ctype in COLOUR_CHUNKS and not (icc and ctype == b"sRGB"):
+            keep.add(ctype, payload)
+
+    best: tuple[bytes, str] | None = None
+    for label, candidate, extra in _candidates(px):
+        for strategy in STRATEGIES:
+            for level in (9,) if strategy == zlib.Z_RLE else (6, 9):
+                buf = io.BytesIO()
+                candidate.save(
+                    buf, "PNG", compress_level=level, compress_type=strategy, pnginfo=keep, icc_profile=icc, **extra
+                )
+                data = buf.getvalue()
+                if best is not None and len(data) > ESCALATE * len(best[0]):
+                    break  # level 9 would not close the gap
+                if best is None or len(data) < len(best[0]):
+                    best = (data, f"{label}, {STRATEGY_NAMES[strategy]} {level}")
+
+    data, encoding = best
+    if len(data) >= len(original):
+        return OptimizeResult(path, len(original), len(original), "kept")
+    with Image.open(io.BytesIO(data)) as check:
+        if not np.array_equal(np.asarray(check.convert("RGBA")), px):
+            return OptimizeResult(path, len(original), len(original), "kept (candidate not identical)")
+    if write:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return OptimizeResult(path, len(original), len(data), encoding)
+
+
+def optimize_files(paths: list[Path], write: bool = True, jobs: int = 1) -> list[OptimizeResult]:
+    if jobs <= 1 or len(paths) <= 1:
+        return [optimize_file(p, write) for p in paths]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(optimize_file, paths, [write] * len(paths)))
+
+
+def _kb(n: int) -> str:
+    return f"{n / 1024:,.1f} KB"
+
+
+def optimization_lines(results: list[OptimizeResult], root: Path, written: bool = True) -> list[str]:
+    """Markdown section for the audit report."""
+    before = sum(r.before for r in results)
+    after = sum(r.after for r in results)
+    lines = ["## Lossless PNG Optimization", ""]
+    verb = "Saved" if written else "Would save"
+    pct = 100 * (before - after) / before if before else 0.0
+    lines.append(f"{verb} `{_kb(before - after)}` of `{_kb(before)}` ({pct:.1f}%) across `{len(results)}` files.")
+    lines.append("")
+    lines.append("| File | Before | After | Saved | Encoding |")
+    lines.append("|---|---:|---:|---:|---|")
+    for r in sorted(results, key=lambda x: x.saved, reverse=True):
+        if r.saved:
+            lines.append(
+                f"| `{r.path.relative_to(root)}` | `{_kb(r.before)}` | `{_kb(r.after)}` | "
+                f"`{100 * r.saved / r.before:.1f}%` | {r.encoding} |"
+            )
+    if before == after:
+        lines.append("| _None_ | - | - | - | - |")
+    lines.append("")
+    return lines
+
+
+def main() -> None:
+    args = parse_args()
+    root: Path = args.assets.resolve()
+    files = sorted(root.rglob("*.png"))
+    started = time.perf_counter()
+    results = optimize_files(files, write=not args.dry_run, jobs=args.jobs)
+    for r in sorted(results, key=lambda x: x.path):
+        shown = f"-{100 * r.saved / r.before:4.1f}%  {r.encoding}" if r.saved else r.encoding
+        print(f"  {r.path.relative_to(root)}: {_kb(r.before)} -> {_kb(r.after)}  {shown}")
+    before = sum(r.before for r in results)
+    saved = sum(r.saved for r in results)
+    verb = "would save" if args.dry_run else "saved"
+    print(f"{len(files)} files, {verb} {_kb(saved)} of {_kb(before)} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
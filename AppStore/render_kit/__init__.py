@@ -0,0 +1,56 @@
+"""Shared rendering helpers for the App Store and Social image generators.
+
+Scripts under `AppStore/` import this package directly; scripts under
+`Social/` add `AppStore/` to `sys.path` first. Requires Pillow and NumPy
+(`python3 -m pip install pillow numpy`).
+
+`render_kit.trace` is opt-in per-stage timing (`UNTWIST_TRACE=1` or
+`--trace out.json`); the helpers here and the generators' own drawing
+functions are decorated with `trace.stage`, a no-op unless tracing is on.
+`render_kit.encode` holds the per-channel output encoders (App Store PNG,
+Instagram / X JPEG under their size limits). `render_kit.watch` drives the
+generators' `--watch` mode.
+"""
+
+from .contact_sheet import AUDIT_SHEET, CANDIDATE_SHEET, SheetStyle, make_contact_sheet
+from .derive import SsimReport, derive_size, text_ssim
+from .device_frame import FrameStyle, compose_phone, frame_template, place_phone
+from .encode import APP_STORE, INSTAGRAM, LOSSLESS, X, OutputTarget, OutputWriter, WriteResult, encode, write_output
+from .fonts import load_font, resolve_font
+from .gradient import linear_gradient, radial_gradient, vertical_gradient
+from .image_cache import ImageCache, fit_cached
+from .shadow import SoftShape, fast_blur, shadow_layer, soft_layer
+
+__all__ = [
+    "AUDIT_SHEET",
+    "CANDIDATE_SHEET",
+    "SheetStyle",
+    "make_contact_sheet",
+    "SsimReport",
+    "derive_size",
+    "text_ssim",
+    "FrameStyle",
+    "compose_phone",
+    "frame_template",
+    "place_phone",
+    "APP_STORE",
+    "INSTAGRAM",
+    "LOSSLESS",
+    "X",
+    "OutputTarget",
+    "OutputWriter",
+    "WriteResult",
+    "encode",
+    "write_output",
+    "load_font",
+    "resolve_font",
+    "linear_gradient",
+    "radial_gradient",
+    "vertical_gradient",
+    "ImageCache",
+    "fit_cached",
+    "SoftShape",
+    "fast_blur",
+    "shadow_layer",
+    "soft_layer",
+]
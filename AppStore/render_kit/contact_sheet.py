@@ -0,0 +1,270 @@
+"""Streaming contact sheets: a grid of labelled thumbnails on cards.
+
+One engine behind `audit_png_assets.py --contact-sheet` (checkerboard
+cells, so transparency is visible) and the Twisty candidate sheet. Compared
+with drawing the whole sheet in one image:
+
+- the checkerboard is a precomputed panel pasted per cell instead of one
+  `draw.rectangle` per 16px square;
+- sources given as paths are opened with `draft()` (JPEG decodes at a
+  reduced scale) and shrunk with `thumbnail()`, which `reduce()`s by an
+  integer factor before the Lanczos pass; with `jobs > 1` thumbnails are
+  made on a process pool;
+- `.png` outputs are written in bands of `band_rows` grid rows straight to
+  a streamed PNG, so memory is bounded by one band (plus its thumbnails)
+  however many assets there are. Other formats are assembled in memory.
+
+Band cuts fall on cell boundaries, so a streamed sheet is pixel-identical
+to the in-memory one.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Sequence, Union
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .fonts import load_font
+
+RGB = tuple[int, int, int]
+Source = Union[str, os.PathLike, Image.Image]
+# (role, size, preferred files) for fonts.load_font; None uses Pillow's default font.
+FontSpec = Optional[tuple[str, int, tuple[str, ...]]]
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+LANCZOS = Image.Resampling.LANCZOS
+
+
+@dataclass(frozen=True)
+class SheetStyle:
+    cols: int
+    cell: tuple[int, int]  # grid pitch
+    origin: tuple[int, int]  # top-left of the first cell
+    pad: tuple[int, int]  # extra width/height after the last column/row
+    background: RGB
+    card_size: tuple[int, int]
+    card_radius: int
+    card_fill: RGB
+    card_outline: RGB
+    image_box: tuple[int, int, int, int]  # x, y, w, h relative to the cell
+    label_offset: tuple[int, int]
+    label_fill: RGB
+    label_font: FontSpec = None
+    # (tile, even colour, odd colour); None leaves the card fill behind the image.
+    checker: Optional[tuple[int, RGB, RGB]] = None
+    card_outline_width: int = 2
+    title_offset: tuple[int, int] = (0, 0)
+    title_fill: RGB = (0, 0, 0)
+    title_font: FontSpec = None
+
+
+AUDIT_SHEET = SheetStyle(
+    cols=4,
+    cell=(300, 320),
+    origin=(20, 20),
+    pad=(20, 20),
+    background=(18, 18, 24),
+    card_size=(284, 304),
+    card_radius=20,
+    card_fill=(34, 32, 48),
+    card_outline=(76, 72, 108),
+    image_box=(24, 24, 236, 206),
+    label_offset=(24, 260),
+    label_fill=(220, 218, 238),
+    checker=(16, (58, 58, 70), (44, 44, 56)),
+)
+
+_ARIAL_BOLD = ("/System/Library/Fonts/Supplemental/Arial Bold.ttf",)
+CANDIDATE_SHEET = SheetStyle(
+    cols=3,
+    cell=(360, 420),
+    origin=(40, 80),
+    pad=(40, 40),
+    background=(246, 243, 252),
+    card_size=(320, 380),
+    card_radius=28,
+    card_fill=(255, 255, 255),
+    card_outline=(218, 210, 241),
+    image_box=(35, 44, 250, 250),
+    label_offset=(20, 320),
+    label_fill=(63, 52, 108),
+    label_font=("bold", 22, _ARIAL_BOLD),
+    title_offset=(40, 24),
+    title_fill=(48, 35, 86),
+    title_font=("bold", 34, _ARIAL_BOLD),
+)
+
+
+def sheet_size(style: SheetStyle, count: int) -> tuple[int, int]:
+    rows = (count + style.cols - 1) // style.cols
+    return (
+        style.origin[0] + style.cols * style.cell[0] + style.pad[0],
+        style.origin[1] + rows * style.cell[1] + style.pad[1],
+    )
+
+
+def _font(spec: FontSpec):
+    return None if spec is None else load_font(spec[0], spec[1], spec[2])
+
+
+# ── Thumbnails ──────────────────────────────────────────────────────────────
+
+
+def thumbnail(source: Source, box: tuple[int, int]) -> Image.Image:
+    """RGBA thumbnail of `source` fitting inside `box`, aspect preserved."""
+    if isinstance(source, Image.Image):
+        img = source.convert("RGBA")
+    else:
+        img = Image.open(source)
+        img.draft("RGB", box)  # no-op for PNG; JPEG decodes at 1/2..1/8 scale
+        img = img.convert("RGBA")
+    img.thumbnail(box, LANCZOS)
+    return img
+
+
+def _thumbnails(sources: Sequence[Source], box: tuple[int, int], pool) -> list[Image.Image]:
+    if pool is None or len(sources) <= 1:
+        return [thumbnail(s, box) for s in sources]
+    # In-memory images are already decoded; only ship paths to the workers.
+    paths = [s for s in sources if not isinstance(s, Image.Image)]
+    done = iter(pool.map(thumbnail, paths, [box] * len(paths)))
+    return [thumbnail(s, box) if isinstance(s, Image.Image) else next(done) for s in sources]
+
+
+# ── Drawing ─────────────────────────────────────────────────────────────────
+
+
+@lru_cache(maxsize=8)
+def _checker_panel(size: tuple[int, int], checker: tuple[int, RGB, RGB], phase: int) -> Image.Image:
+    """Checkerboard of `size` built by pasting one 2x2-square tile."""
+    tile, even, odd = checker
+    unit = Image.new("RGB", (2 * tile, 2 * tile), odd if phase else even)
+    unit.paste(even if phase else odd, (tile, 0, 2 * tile, tile))
+    unit.paste(even if phase else odd, (0, tile, tile, 2 * tile))
+    panel = Image.new("RGB", size)
+    for y in range(0, size[1], 2 * tile):
+        for x in range(0, size[0], 2 * tile):
+            panel.paste(unit, (x, y))
+    return panel
+
+
+def _draw_cell(band: Image.Image, draw: ImageDraw.ImageDraw, style: SheetStyle, x: int, y: int,
+               band_y: int, thumb: Image.Image, label: str, font) -> None:
+    """Draw one card with its top-left at sheet (x, y) into a band starting at sheet row `band_y`."""
+    cw, ch = style.card_size
+    by = y - band_y
+    draw.rounded_rectangle(
+        (x, by, x + cw, by + ch),
+        radius=style.card_radius,
+        fill=style.card_fill,
+        outline=style.card_outline,
+        width=style.card_outline_width,
+    )
+    ix, iy, iw, ih = style.image_box
+    bx, bg_y = x + ix, y + iy
+    if style.checker is not None:
+        tile = style.checker[0]
+        # The phase follows sheet coordinates; the panel covers the box edges inclusively.
+        phase = (bx // tile + bg_y // tile) % 2
+        band.paste(_checker_panel((iw + 1, ih + 1), style.checker, phase), (bx, bg_y - band_y))
+    band.paste(thumb, (bx + (iw - thumb.width) // 2, bg_y - band_y + (ih - thumb.height) // 2), thumb)
+    lx, ly = style.label_offset
+    draw.text((x + lx, by + ly), label, fill=style.label_fill, font=font)
+
+
+def iter_bands(sources: Sequence[Source], labels: Sequence[str], style: SheetStyle, title: str = "",
+               jobs: int = 1, band_rows: int = 8):
+    """Yield RGB bands of the sheet top to bottom; their heights sum to the sheet height."""
+    if len(labels) != len(sources):
+        raise ValueError("Need one label per source.")
+    width, height = sheet_size(style, len(sources))
+    rows = (len(sources) + style.cols - 1) // style.cols
+    box = style.image_box[2:]
+    label_font = _font(style.label_font)
+    band_rows = max(1, band_rows)
+
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        top = 0
+        for first_row in range(0, max(rows, 1), band_rows):
+            last_row = min(first_row + band_rows, rows)
+            bottom = height if last_row >= rows else style.origin[1] + last_row * style.cell[1]
+            band = Image.new("RGB", (width, bottom - top), style.background)
+            draw = ImageDraw.Draw(band)
+            if top == 0 and title:
+                draw.text(style.title_offset, title, fill=style.title_fill, font=_font(style.title_font))
+
+            first, last = first_row * style.cols, min(last_row * style.cols, len(sources))
+            thumbs = _thumbnails(sources[first:last], box, pool)
+            for idx, thumb in enumerate(thumbs, start=first):
+                r, c = divmod(idx, style.cols)
+                x = style.origin[0] + c * style.cell[0]
+                y = style.origin[1] + r * style.cell[1]
+                _draw_cell(band, draw, style, x, y, top, thumb, labels[idx], label_font)
+            yield band
+            top = bottom
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+# ── Output ──────────────────────────────────────────────────────────────────
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png_bands(path, size: tuple[int, int], bands, level: int = 6) -> None:
+    """Write 8-bit RGB `bands` (top to bottom) as one PNG without holding the full image."""
+    width, height = size
+    tmp = f"{os.fspath(path)}.tmp"
+    compressor = zlib.compressobj(level)
+    rows = 0
+    previous = np.zeros((1, width * 3), np.uint8)
+    with open(tmp, "wb") as f:
+        f.write(PNG_SIGNATURE)
+        f.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        for band in bands:
+            pixels = np.asarray(band, np.uint8).reshape(band.height, width * 3)
+            # Filter type 2 (Up) on every scanline: cards and backgrounds repeat row to row.
+            filtered = np.empty((band.height, width * 3 + 1), np.uint8)
+            filtered[:, 0] = 2
+            filtered[:, 1:] = pixels - np.vstack([previous, pixels[:-1]])
+            previous = pixels[-1:]
+            raw = filtered.tobytes()
+            rows += band.height
+            compressed = compressor.compress(raw)
+            if compressed:
+                f.write(_chunk(b"IDAT", compressed))
+        f.write(_chunk(b"IDAT", compressor.flush()))
+        f.write(_chunk(b"IEND", b""))
+    if rows != height:
+        os.remove(tmp)
+        raise ValueError(f"Bands cover {rows} rows, expected {height}.")
+    os.replace(tmp, path)
+
+
+def make_contact_sheet(out_path, sources: Sequence[Source], labels: Sequence[str], style: SheetStyle = AUDIT_SHEET,
+                       title: str = "", jobs: int = 1, band_rows: int = 8) -> None:
+    """Render the sheet to `out_path`; `.png` is streamed band by band."""
+    out_path = os.fspath(out_path)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    size = sheet_size(style, len(sources))
+    bands = iter_bands(sources, labels, style, title=title, jobs=jobs, band_rows=band_rows)
+    if out_path.lower().endswith(".png"):
+        write_png_bands(out_path, size, bands)
+        return
+    sheet = Image.new("RGB", size)
+    top = 0
+    for band in bands:
+        sheet.paste(band, (0, top))
+        top += band.height
+    sheet.save(out_path)
@@ -0,0 +1,135 @@
+"""Derive secondary App Store sizes from a master render held in memory.
+
+Rendering every size natively re-runs the whole layout (gradients, glows,
+phone frames, text), and the TR script re-decoded the PNGs it had just
+written in order to resize them. `derive_size` downscales the in-memory
+master instead:
+
+- an integer ratio on both axes takes `Image.reduce`, an exact box
+  average with no resampling kernel at all;
+- ratios of 2x or more resize with `reducing_gap`, which reduces by the
+  integer part first and leaves Lanczos only the last step;
+- anything else (1290 -> 1179 px is 0.914x) is a single Lanczos resize.
+
+Downscaled text is softer than text laid out at the smaller size. The
+generators declare, per size, whether it is derived or rendered natively,
+and `text_ssim` compares a derived image with a native render of the same
+layout. The two are not pixel-aligned: fonts are sized with `int()`, so
+native lines run up to ~2% narrower and drift by up to ~10 px. Therefore:
+
+- the image is cut into 64 px tiles, keeping only tiles with detail (on
+  these layouts that means text and the UI inside the screenshots);
+- each derived tile is registered to its native tile by phase correlation
+  (batched FFT);
+- SSIM (uniform 7 px window, on luma) is computed at that offset.
+
+The mean over tiles is the score. Across all ten preview layouts, Lanczos
+derivation 1290 -> 1179 px scored 0.947-0.972. A 1 px blur, a 0.62x
+round trip and a half-resolution round trip all scored at most 0.946.
+`TEXT_SSIM_FLOOR` sits between the two. The worst tile is reported for
+inspection only: a tile whose content moved across its edge scores low
+whatever the derivation.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from .trace import stage
+
+LANCZOS = Image.Resampling.LANCZOS
+REDUCING_GAP = 2.0
+SSIM_WINDOW = 7
+SSIM_TILE = 64
+MAX_SHIFT = 12  # px a native tile may be offset from the derived one
+DETAIL_STD = 12.0  # luma std-dev (native render) above which a tile counts as detail
+TEXT_SSIM_FLOOR = 0.94
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+
+
+class SsimReport(NamedTuple):
+    score: float  # mean SSIM over registered detail tiles (1.0 if there are none)
+    worst: float  # lowest tile SSIM
+    worst_box: tuple[int, int, int, int]  # that tile in the native image, (left, top, right, bottom)
+    tiles: int  # detail tiles compared
+
+    @property
+    def degraded(self) -> bool:
+        return self.score < TEXT_SSIM_FLOOR
+
+
+@stage
+def derive_size(master: Image.Image, size: tuple[int, int]) -> Image.Image:
+    """`master` scaled to `size` along the cheapest exact path; always a new image."""
+    w, h = master.size
+    tw, th = size
+    if (w, h) == (tw, th):
+        return master.copy()
+    if w % tw == 0 and h % th == 0 and w // tw == h // th:
+        return master.reduce(w // tw)
+    gap = REDUCING_GAP if min(w / tw, h / th) >= REDUCING_GAP else None
+    return master.resize((tw, th), LANCZOS, reducing_gap=gap)
+
+
+def _luma(img: Image.Image) -> np.ndarray:
+    return np.asarray(img.convert("L"), dtype=np.float64)
+
+
+def _box_mean(a: np.ndarray, k: int) -> np.ndarray:
+    """Mean over every k x k window of the last two axes ("valid" region, k - 1 smaller)."""
+    pad = [(0, 0)] * (a.ndim - 2) + [(1, 0), (1, 0)]
+    c = np.cumsum(np.cumsum(np.pad(a, pad), axis=-2), axis=-1)
+    return (c[..., k:, k:] - c[..., :-k, k:] - c[..., k:, :-k] + c[..., :-k, :-k]) / (k * k)
+
+
+def ssim(a: np.ndarray, b: np.ndarray, window: int = SSIM_WINDOW) -> np.ndarray:
+    """Mean SSIM of each pair of equal-shape luma arrays (stacked on leading axes)."""
+    ma, mb = _box_mean(a, window), _box_mean(b, window)
+    va = _box_mean(a * a, window) - ma * ma
+    vb = _box_mean(b * b, window) - mb * mb
+    cov = _box_mean(a * b, window) - ma * mb
+    s = ((2 * ma * mb + _C1) * (2 * cov + _C2)) / ((ma * ma + mb * mb + _C1) * (va + vb + _C2))
+    return s.mean(axis=(-2, -1))
+
+
+def _register(a: np.ndarray, b: np.ndarray, max_shift: int) -> tuple[np.ndarray, np.ndarray]:
+    """Phase correlation of (N, T, T) tile stacks: (dy, dx) moving each `a` tile onto `b`."""
+    t = a.shape[-1]
+    window = np.outer(np.hanning(t), np.hanning(t))
+    fa = np.fft.rfft2((a - a.mean(axis=(1, 2), keepdims=True)) * window)
+    fb = np.fft.rfft2((b - b.mean(axis=(1, 2), keepdims=True)) * window)
+    cross = fb * np.conj(fa)
+    peak = np.fft.irfft2(cross / (np.abs(cross) + 1e-9), s=(t, t)).reshape(len(a), -1).argmax(axis=1)
+    dy, dx = peak // t, peak % t
+    dy = np.clip(np.where(dy > t // 2, dy - t, dy), -max_shift, max_shift)
+    dx = np.clip(np.where(dx > t // 2, dx - t, dx), -max_shift, max_shift)
+    return dy, dx
+
+
+@stage
+def text_ssim(native: Image.Image, derived: Image.Image, tile: int = SSIM_TILE,
+              max_shift: int = MAX_SHIFT) -> SsimReport:
+    """Registered tile SSIM of a derived image against a native render of the same size."""
+    if native.size != derived.size:
+        raise ValueError(f"SSIM needs equal sizes, got {native.size} and {derived.size}")
+    x, y = _luma(native), _luma(derived)
+    h, w = x.shape
+    m = max_shift
+    boxes = [(top, left) for top in range(m, h - tile - m + 1, tile) for left in range(m, w - tile - m + 1, tile)]
+    if boxes:
+        a = np.stack([x[top:top + tile, left:left + tile] for top, left in boxes])
+        detail = a.std(axis=(1, 2)) >= DETAIL_STD
+        a, boxes = a[detail], [box for box, keep in zip(boxes, detail) if keep]
+    if not boxes:
+        return SsimReport(1.0, 1.0, (0, 0, 0, 0), 0)
+    b = np.stack([y[top:top + tile, left:left + tile] for top, left in boxes])
+    dy, dx = _register(a, b, m)
+    b = np.stack([y[top + u:top + u + tile, left + v:left + v + tile] for (top, left), u, v in zip(boxes, dy, dx)])
+    scores = ssim(a, b)
+    i = int(scores.argmin())
+    top, left = boxes[i]
+    return SsimReport(float(scores.mean()), float(scores[i]), (left, top, left + tile, top + tile), len(boxes))
@@ -0,0 +1,309 @@
+"""Cached phone-mockup compositor shared by every phone-frame renderer.
+
+The bezel, screen mask, Dynamic Island and soft drop shadow only depend on
+(style, screen_w, screen_h), so they are built once into a `FrameTemplate`
+and kept in an LRU cache. A render then only pastes the (already fitted)
+screenshot into a copy of the template and composites it onto the canvas.
+
+Style presets reproduce the look of the painters this replaced:
+- APPSTORE_FRAME  -> draw_phone_bezel (generate_previews / generate_tr_previews)
+- PHONE_PNG_FRAME -> generate_phone_png (generate_phone_pngs.py)
+- SOCIAL_FRAME    -> paste_phone (Social generate_assets.py)
+- KITAP_FRAME     -> draw_phone (generate_1000kitap_single.py)
+- LINKEDIN_FRAME  -> build_phone (generate_linkedin_hero_untwist_tr.py)
+
+Geometry fields accept a float (fraction of screen_w, or screen_h for
+`island_top`) or an int (absolute pixels).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Optional, Union
+
+from PIL import Image, ImageChops, ImageDraw
+
+from .shadow import SoftShape, shadow_layer
+from .trace import stage
+
+RGBA = tuple[int, int, int, int]
+Length = Union[int, float]
+# (inset, radius delta, fill, outline) drawn as rounded rectangles, outside-in.
+BezelLayer = tuple[int, int, Optional[RGBA], Optional[RGBA]]
+
+BLENDS = ("paste", "alpha")
+
+
+@dataclass(frozen=True)
+class FrameStyle:
+    bezel: Length
+    outer_radius: Length
+    inner_radius: Length
+    layers: tuple[BezelLayer, ...]
+    island_w: Length
+    island_h: Length
+    island_top: Length
+    island_color: RGBA
+    # Legacy painters drew the island box as (x, y, x + w, y + h); -1 gives (x + w - 1).
+    island_box_adjust: int = 0
+    screen_fill: Optional[RGBA] = None
+    # Extra pixels the screen fill box extends past the screen on the right/bottom.
+    screen_fill_overdraw: int = 0
+    shadow_pad: int = 60
+    shadow_alpha: int = 55
+    shadow_blur: float = 35
+    shadow_radius: Optional[Length] = None  # None -> outer radius
+    shadow_insets: tuple[int, int, int, int] = (0, 0, 0, 0)  # left, top, right, bottom
+    shadow_offset: tuple[int, int] = (-60, -45)  # shadow image origin relative to phone
+    shadow_blend: str = "paste"
+    phone_blend: str = "paste"
+    rotate: float = 0.0
+
+
+@dataclass(frozen=True)
+class FrameTemplate:
+    size: tuple[int, int]  # phone image size (after rotation)
+    screen_origin: tuple[int, int]  # screen top-left inside the unrotated phone
+    underlay: Image.Image  # bezel + screen fill + island
+    screen_mask: Image.Image  # L mask for the screenshot
+    island: Image.Image  # RGBA island layer, re-applied over the screenshot
+    shadow: Image.Image
+
+
+def _px(value: Length, ref: int) -> int:
+    return value if isinstance(value, int) else int(ref * value)
+
+
+def _check_blend(mode: str) -> None:
+    if mode not in BLENDS:
+        raise ValueError(f"Unknown blend {mode!r}; expected one of {BLENDS}.")
+
+
+def shadow_shapes(style: FrameStyle, size: tuple[int, int], screen_w: int) -> tuple[tuple[int, int], list[SoftShape]]:
+    """(layer size, shapes) of the drop shadow behind a phone image of `size`,
+    blurred by `style.shadow_blur`."""
+    pad = style.shadow_pad
+    left, top, right, bottom = style.shadow_insets
+    outer_radius = _px(style.outer_radius, screen_w)
+    shadow_radius = outer_radius if style.shadow_radius is None else _px(style.shadow_radius, screen_w)
+    return (size[0] + pad * 2, size[1] + pad * 2), [SoftShape(
+        "rounded_rectangle",
+        (pad + left, pad + top, pad + size[0] - 1 - right, pad + size[1] - 1 - bottom),
+        (0, 0, 0, style.shadow_alpha),
+        shadow_radius,
+    )]
+
+
+@lru_cache(maxsize=64)
+def frame_template(style: FrameStyle, screen_w: int, screen_h: int) -> FrameTemplate:
+    """Build (or fetch from cache) the static parts of a phone mockup.
+
+    Returned images are shared; callers must copy before drawing on them.
+    """
+    _check_blend(style.shadow_blend)
+    _check_blend(style.phone_blend)
+    bezel = _px(style.bezel, screen_w)
+    outer_radius = _px(style.outer_radius, screen_w)
+    inner_radius = _px(style.inner_radius, screen_w)
+    phone_w = screen_w + bezel * 2
+    phone_h = screen_h + bezel * 2
+
+    underlay = Image.new("RGBA", (phone_w, phone_h), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(underlay)
+    for inset, radius_delta, fill, outline in style.layers:
+        draw.rounded_rectangle(
+            (inset, inset, phone_w - 1 - inset, phone_h - 1 - inset),
+            radius=outer_radius + radius_delta, fill=fill, outline=outline,
+            width=1,
+        )
+    if style.screen_fill is not None:
+        end = style.screen_fill_overdraw - 1
+        draw.rounded_rectangle(
+            (bezel, bezel, bezel + screen_w + end, bezel + screen_h + end),
+            radius=inner_radius, fill=style.screen_fill,
+        )
+
+    island = Image.new("RGBA", (phone_w, phone_h), (0, 0, 0, 0))
+    di_w = _px(style.island_w, screen_w)
+    di_h = _px(style.island_h, screen_w)
+    di_x = phone_w // 2 - di_w // 2
+    di_y = bezel + _px(style.island_top, screen_h)
+    di_box = (di_x, di_y, di_x + di_w + style.island_box_adjust, di_y + di_h + style.island_box_adjust)
+    for layer in (underlay, island):
+        ImageDraw.Draw(layer).rounded_rectangle(di_box, radius=di_h // 2, fill=style.island_color)
+
+    screen_mask = Image.new("L", (screen_w, screen_h), 0)
+    ImageDraw.Draw(screen_mask).rounded_rectangle(
+        (0, 0, screen_w - 1, screen_h - 1), radius=inner_radius, fill=255
+    )
+
+    size = (phone_w, phone_h)
+    if style.rotate:
+        size = Image.new("L", size).rotate(style.rotate, expand=True).size
+
+    shadow = shadow_layer(*shadow_shapes(style, size, screen_w), style.shadow_blur)
+
+    return FrameTemplate(
+        size=size,
+        screen_origin=(bezel, bezel),
+        underlay=underlay,
+        screen_mask=screen_mask,
+        island=island,
+        shadow=shadow,
+    )
+
+
+@stage
+def compose_phone(style: FrameStyle, screen: Image.Image | None, screen_w: int, screen_h: int) -> Image.Image:
+    """Return the phone image with `screen` (already sized to screen_w x screen_h) inside."""
+    tpl = frame_template(style, screen_w, screen_h)
+    phone = tpl.underlay.copy()
+    if screen is not None:
+        if screen.size != (screen_w, screen_h):
+            raise ValueError(f"Screen image is {screen.size}, expected {(screen_w, screen_h)}.")
+        phone.paste(screen, tpl.screen_origin, tpl.screen_mask)
+        phone.paste(tpl.island, (0, 0), tpl.island)
+    if style.rotate:
+        phone = phone.rotate(style.rotate, resample=Image.Resampling.BICUBIC, expand=True)
+    return phone
+
+
+def _blend(canvas: Image.Image, layer: Image.Image, pos: tuple[int, int], mode: str) -> None:
+    if mode == "paste":
+        canvas.paste(layer, pos, layer)
+    else:
+        canvas.alpha_composite(layer, pos)
+
+
+@stage
+def place_phone(
+    canvas: Image.Image,
+    style: FrameStyle,
+    screen: Image.Image | None,
+    x: int,
+    y: int,
+    screen_w: int,
+    screen_h: int,
+) -> FrameTemplate:
+    """Composite the shadow and phone onto `canvas` with the phone's top-left at (x, y).
+
+    Returns the template so callers can read the frame geometry.
+    """
+    tpl = frame_template(style, screen_w, screen_h)
+    dx, dy = style.shadow_offset
+    _blend(canvas, tpl.shadow, (x + dx, y + dy), style.shadow_blend)
+    _blend(canvas, compose_phone(style, screen, screen_w, screen_h), (x, y), style.phone_blend)
+    return tpl
+
+
+@stage
+def place_screen(
+    canvas: Image.Image,
+    style: FrameStyle,
+    screen: Image.Image,
+    x: int,
+    y: int,
+    screen_w: int,
+    screen_h: int,
+) -> None:
+    """Fill the screen of a phone that `place_phone(..., screen=None, ...)` drew at (x, y).
+
+    Gives the same pixels as passing `screen` to `place_phone`, so the empty
+    frame can live in a cached base layer. Needs an unrotated style with
+    phone_blend="paste" (the frame then fully covers the screen area).
+    """
+    if style.rotate or style.phone_blend != "paste":
+        raise ValueError("place_screen needs an unrotated style with phone_blend='paste'.")
+    if screen.size != (screen_w, screen_h):
+        raise ValueError(f"Screen image is {screen.size}, expected {(screen_w, screen_h)}.")
+    tpl = frame_template(style, screen_w, screen_h)
+    mask = tpl.screen_mask
+    if screen.mode == "RGBA" and screen.getextrema()[3][0] < 255:
+        # place_phone would blend a translucent screen by its alpha.
+        mask = ImageChops.multiply(mask, screen.getchannel("A"))
+    ox, oy = tpl.screen_origin
+    canvas.paste(screen, (x + ox, y + oy), mask)
+    canvas.paste(tpl.island, (x, y), tpl.island)
+
+
+BEZEL_BLACK = (20, 20, 22, 255)
+BEZEL_EDGE = (40, 40, 42, 255)
+
+APPSTORE_FRAME = FrameStyle(
+    bezel=0.04,
+    outer_radius=0.14,
+    inner_radius=0.10,
+    layers=((0, 0, BEZEL_BLACK, None), (1, 0, BEZEL_EDGE, None), (3, -2, BEZEL_BLACK, None)),
+    island_w=0.28,
+    island_h=0.075,
+    island_top=0.015,
+    island_color=BEZEL_BLACK,
+    screen_fill=(200, 200, 200, 255),
+)
+
+PHONE_PNG_FRAME = replace(
+    APPSTORE_FRAME,
+    shadow_pad=50,
+    shadow_alpha=50,
+    shadow_blur=30,
+    shadow_insets=(0, 12, 0, -12),
+    shadow_offset=(-50, -50),
+    shadow_blend="alpha",
+)
+
+SOCIAL_FRAME = FrameStyle(
+    bezel=0.045,
+    outer_radius=0.14,
+    inner_radius=0.11,
+    layers=(
+        (0, 0, (22, 22, 26, 255), None),
+        (2, 0, (35, 35, 42, 255), None),
+        (4, -2, (18, 18, 22, 255), None),
+    ),
+    island_w=0.3,
+    island_h=0.08,
+    island_top=0.02,
+    island_color=(10, 10, 14, 255),
+    screen_fill=(255, 255, 255, 255),
+    screen_fill_overdraw=1,
+    shadow_pad=40,
+    shadow_alpha=95,
+    shadow_blur=22,
+    shadow_offset=(-40, -30),
+    shadow_blend="alpha",
+    phone_blend="alpha",
+)
+
+KITAP_FRAME = replace(
+    SOCIAL_FRAME,
+    layers=((0, 0, (16, 18, 22, 255), None), (3, -2, (29, 31, 36, 255), None)),
+    island_color=(9, 9, 11, 255),
+    screen_fill=None,
+    screen_fill_overdraw=0,
+    shadow_pad=30,
+    shadow_alpha=80,
+    shadow_blur=14,
+    shadow_offset=(-30, -24),
+)
+
+LINKEDIN_FRAME = FrameStyle(
+    bezel=8,
+    outer_radius=40,
+    inner_radius=30,
+    layers=((0, 0, (5, 7, 11, 255), None), (2, -2, None, (255, 255, 255, 28))),
+    island_w=112,
+    island_h=26,
+    island_top=2,
+    island_color=(2, 3, 5, 255),
+    island_box_adjust=-1,
+    shadow_pad=0,
+    shadow_alpha=120,
+    shadow_blur=16,
+    shadow_radius=60,
+    shadow_insets=(22, 34, 9, 9),
+    shadow_offset=(-18, 20),
+    shadow_blend="alpha",
+    phone_blend="alpha",
+    rotate=-6,
+)
@@ -0,0 +1,170 @@
+"""Output encoders: per-channel targets, byte budgets, background writes.
+
+The generators used to call `.save(path, quality=95)` on PNG paths, where
+`quality` is ignored and zlib runs at its default level and strategy. An
+`OutputTarget` names the format and its settings instead:
+
+- PNG: `compress_level` and zlib `compress_type`. RLE encodes a 1290x2796
+  preview in ~170 ms instead of ~360 ms at zlib's defaults, for ~4% more
+  bytes (measured on the ten iPhone 6.7" previews), so it is the default
+  (see optimize_png_assets.py for the same trade-off on assets);
+- JPEG / WebP: `quality` is the ceiling; with `max_bytes` set, the highest
+  quality down to `min_quality` whose encoding fits is binary searched;
+- WebP can also be `lossless`.
+
+Channel defaults:
+
+- `APP_STORE`: RGB PNG. Screenshots may not have alpha, and lossless keeps
+  small UI text crisp.
+- `INSTAGRAM`: JPEG, capped at the Graph API's 8 MB limit for JPEG posts.
+- `X`: JPEG, capped at its 5 MB image limit.
+
+At quality 92 with 4:4:4 chroma (coloured text keeps its edges), a
+1080x1350 post is ~180 KB instead of a ~420 KB PNG. `LOSSLESS` (PNG in the
+image's own mode) covers everything else.
+
+`write_output` encodes, compares with the file on disk and only replaces
+it (atomically) when the bytes differ. `OutputWriter` runs the same on a
+thread pool. Pillow releases the GIL while encoding, so the next image
+renders in the meantime. Images handed to it must not be drawn on
+afterwards.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+from . import trace
+from .trace import stage
+
+MB = 1024 * 1024
+SUFFIXES = {"PNG": ".png", "JPEG": ".jpg", "WEBP": ".webp"}
+
+
+@dataclass(frozen=True)
+class OutputTarget:
+    format: str = "PNG"  # "PNG", "JPEG" or "WEBP"
+    mode: Optional[str] = "RGB"  # converted to before encoding; None keeps the image's mode
+    compress_level: int = 9  # PNG
+    compress_type: int = zlib.Z_RLE  # PNG zlib strategy
+    quality: int = 92  # JPEG / WebP ceiling
+    min_quality: int = 60  # lowest quality the byte budget may push to
+    max_bytes: Optional[int] = None  # JPEG / WebP byte budget
+    subsampling: int = 0  # JPEG chroma: 0 = 4:4:4, 2 = 4:2:0
+    lossless: bool = False  # WebP
+
+    def __post_init__(self) -> None:
+        if self.format not in SUFFIXES:
+            raise ValueError(f"Unknown output format {self.format!r}; expected one of {sorted(SUFFIXES)}")
+
+    @property
+    def suffix(self) -> str:
+        return SUFFIXES[self.format]
+
+
+APP_STORE = OutputTarget("PNG")
+INSTAGRAM = OutputTarget("JPEG", max_bytes=8 * MB)
+X = OutputTarget("JPEG", max_bytes=5 * MB)
+LOSSLESS = OutputTarget("PNG", mode=None)
+
+
+@dataclass
+class WriteResult:
+    path: Path
+    size: int  # encoded bytes
+    written: bool  # False when the file already held exactly these bytes
+    encoding: str  # e.g. "PNG rle 9" or "JPEG q92"
+
+
+def _encode_at(img: Image.Image, target: OutputTarget, quality: int) -> bytes:
+    buf = io.BytesIO()
+    if target.format == "JPEG":
+        img.save(buf, "JPEG", quality=quality, optimize=True, subsampling=target.subsampling)
+    else:
+        img.save(buf, "WEBP", quality=quality, method=4)
+    return buf.getvalue()
+
+
+@stage
+def encode(img: Image.Image, target: OutputTarget = APP_STORE) -> tuple[bytes, str]:
+    """(encoded bytes, short description) of `img` for `target`."""
+    if target.mode and img.mode != target.mode:
+        img = img.convert(target.mode)
+    if target.format == "PNG":
+        buf = io.BytesIO()
+        img.save(buf, "PNG", compress_level=target.compress_level, compress_type=target.compress_type)
+        strategy = {zlib.Z_DEFAULT_STRATEGY: "default", zlib.Z_FILTERED: "filtered", zlib.Z_RLE: "rle"}
+        return buf.getvalue(), f"PNG {strategy.get(target.compress_type, target.compress_type)} {target.compress_level}"
+    if target.format == "WEBP" and target.lossless:
+        buf = io.BytesIO()
+        img.save(buf, "WEBP", lossless=True, method=4)
+        return buf.getvalue(), "WEBP lossless"
+
+    data = _encode_at(img, target, target.quality)
+    if target.max_bytes is None or len(data) <= target.max_bytes:
+        return data, f"{target.format} q{target.quality}"
+    # Largest quality in [min_quality, quality) that fits; min_quality if none does.
+    lo, hi = target.min_quality, target.quality - 1
+    best = None
+    while lo <= hi:
+        q = (lo + hi) // 2
+        candidate = _encode_at(img, target, q)
+        if len(candidate) <= target.max_bytes:
+            best, lo = (candidate, q), q + 1
+        else:
+            hi = q - 1
+    if best is None:
+        best = (_encode_at(img, target, target.min_quality), target.min_quality)
+    return best[0], f"{target.format} q{best[1]}"
+
+
+def _write(img: Image.Image, path: Path, target: OutputTarget) -> WriteResult:
+    data, encoding = encode(img, target)
+    try:
+        unchanged = path.stat().st_size == len(data) and path.read_bytes() == data
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return WriteResult(path, len(data), not unchanged, encoding)
+
+
+def write_output(img: Image.Image, path, target: OutputTarget = APP_STORE) -> WriteResult:
+    """Encode `img` to `path` (suffix replaced by the target's) unless the file already matches."""
+    path = Path(path).with_suffix(target.suffix)
+    result = _write(img, path, target)
+    trace.output(path)
+    return result
+
+
+class OutputWriter:
+    """`write_output` on a thread pool; use as a context manager, which waits for every write."""
+
+    def __init__(self, workers: int = 2) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="encode")
+
+    def submit(self, img: Image.Image, path, target: OutputTarget = APP_STORE) -> Future:
+        """Future of the WriteResult; `img` must not change until it is done."""
+        path = Path(path).with_suffix(target.suffix)
+        trace.output(path)  # the render is what the calling thread did for this output
+        return self._pool.submit(_write, img, path, target)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> OutputWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
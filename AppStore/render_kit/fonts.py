@@ -0,0 +1,177 @@
+"""Font registry: one cached scan of the font directories, memoized faces.
+
+The generators used to probe hard-coded macOS paths with `os.path.exists`
+and call `ImageFont.truetype` for every text element. Now:
+
+- `resolve_font(role, preferred)` tries the script's preferred files (the
+  same macOS paths as before, so output on a Mac is unchanged), then the
+  role's fallbacks, which are looked up in an index of every font file under
+  `font_dirs()`. That index is saved to `index_path()` and only rebuilt when
+  a font directory's mtime changes; `font_candidates` lists every match
+  that still exists, in order.
+- `load_font(role, size, preferred)` returns a `FreeTypeFont` memoized per
+  (file, size), moving on to the next candidate if a file fails to load;
+  faces are shared, so callers must not mutate them.
+
+Roles: "bold", "black" (heavy display titles), "regular" and "serif-italic".
+Extra directories can be listed in `UNTWIST_FONT_DIRS` (os.pathsep separated).
+`font_files/` ships DejaVu Sans, Sans Bold and Serif (Bitstream Vera license,
+see font_files/LICENSE) and is scanned last, so machines without any system
+fonts (Linux CI) still get real faces instead of Pillow's bitmap font.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from functools import lru_cache
+from typing import Optional, Sequence
+
+from PIL import ImageFont
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+INDEX_VERSION = 1
+
+SYSTEM_FONT_DIRS = (
+    "/System/Library/Fonts",
+    "/Library/Fonts",
+    "~/Library/Fonts",
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    "~/.local/share/fonts",
+    "~/.fonts",
+)
+BUNDLED_FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "font_files")
+
+# Portable stand-ins tried after a script's preferred files, in order.
+ROLE_FALLBACKS = {
+    "bold": (
+        "Arial Bold.ttf",
+        "DejaVuSans-Bold.ttf",
+        "LiberationSans-Bold.ttf",
+        "NotoSans-Bold.ttf",
+        "FreeSansBold.ttf",
+    ),
+    "regular": (
+        "Arial.ttf",
+        "DejaVuSans.ttf",
+        "LiberationSans-Regular.ttf",
+        "NotoSans-Regular.ttf",
+        "FreeSans.ttf",
+    ),
+    "serif-italic": (
+        "Georgia Italic.ttf",
+        "DejaVuSerif-Italic.ttf",
+        "LiberationSerif-Italic.ttf",
+        "NotoSerif-Italic.ttf",
+        "FreeSerifItalic.ttf",
+        # Upright serif beats falling through to Pillow's bitmap font.
+        "DejaVuSerif.ttf",
+        "LiberationSerif-Regular.ttf",
+    ),
+}
+ROLE_FALLBACKS["black"] = ROLE_FALLBACKS["bold"]
+
+
+def font_dirs() -> list[str]:
+    """Directories scanned for fonts: `UNTWIST_FONT_DIRS`, the system ones, then the bundled set."""
+    extra = [d for d in os.environ.get("UNTWIST_FONT_DIRS", "").split(os.pathsep) if d]
+    dirs = [os.path.expanduser(d) for d in [*extra, *SYSTEM_FONT_DIRS, BUNDLED_FONT_DIR]]
+    return [d for d in dict.fromkeys(dirs) if os.path.isdir(d)]
+
+
+def index_path() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.environ.get("UNTWIST_FONT_INDEX", os.path.join(cache_home, "untwist", "font_index.json"))
+
+
+def _dir_stamps(dirs: Sequence[str]) -> dict[str, float]:
+    # Top-level mtimes only: installing a font family adds a directory or a
+    # file there. Delete the index file to force a full rescan.
+    return {d: os.stat(d).st_mtime for d in dirs}
+
+
+def _scan(dirs: Sequence[str]) -> dict[str, str]:
+    """Map lower-cased file name -> path; earlier directories win."""
+    found: dict[str, str] = {}
+    for root_dir in dirs:
+        for root, subdirs, files in os.walk(root_dir):
+            subdirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(FONT_EXTENSIONS):
+                    found.setdefault(name.lower(), os.path.join(root, name))
+    return found
+
+
+@lru_cache(maxsize=1)
+def font_index() -> dict[str, str]:
+    """The file-name index, read from `index_path()` or rebuilt and saved."""
+    dirs = font_dirs()
+    stamps = _dir_stamps(dirs)
+    path = index_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") == INDEX_VERSION and cached.get("dirs") == stamps:
+            return cached["fonts"]
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    fonts = _scan(dirs)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "dirs": stamps, "fonts": fonts}, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # read-only home: keep the in-memory index
+    return fonts
+
+
+@lru_cache(maxsize=None)
+def font_candidates(role: str, preferred: tuple[str, ...] = ()) -> tuple[str, ...]:
+    """Existing font files for `role`, best first.
+
+    `preferred` entries may be absolute paths (used if they exist) or bare
+    file names (looked up in the index), and are tried before the role's
+    fallbacks. Index entries whose file has since gone are skipped: the
+    index is only rebuilt when a top-level directory changes.
+    """
+    if role not in ROLE_FALLBACKS:
+        raise ValueError(f"Unknown font role {role!r}; expected one of {sorted(ROLE_FALLBACKS)}.")
+    found = [c for c in preferred if os.path.isabs(c) and os.path.isfile(c)]
+    index = font_index()
+    for candidate in (*preferred, *ROLE_FALLBACKS[role]):
+        match = index.get(os.path.basename(candidate).lower())
+        if match and os.path.isfile(match):
+            found.append(match)
+    return tuple(dict.fromkeys(found))
+
+
+def resolve_font(role: str, preferred: tuple[str, ...] = ()) -> Optional[str]:
+    """Best local font file for `role`, or None if nothing matches."""
+    candidates = font_candidates(role, preferred)
+    return candidates[0] if candidates else None
+
+
+@lru_cache(maxsize=256)
+def _face(path: str, size: int):
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=256)
+def _role_face(role: str, preferred: tuple[str, ...], size: int):
+    # A file that exists but will not load (truncated, unsupported) falls
+    # through to the next candidate rather than straight to the bitmap font.
+    for path in font_candidates(role, preferred):
+        try:
+            return _face(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def load_font(role: str, size: int, preferred: Sequence[str] = ()):
+    """Memoized face for `role` at `size`; Pillow's built-in font if none is installed."""
+    return _role_face(role, tuple(preferred), int(size))
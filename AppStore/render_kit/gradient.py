@@ -0,0 +1,143 @@
+"""Array-based gradient backgrounds shared by the preview and social generators.
+
+A linear gradient only varies along one axis, so it is evaluated once as a
+1-pixel strip and stretched to the canvas. Radial gradients and dithered
+output need a value per pixel and are evaluated over the whole array.
+
+With the default settings the colours are bit-identical to the per-pixel
+loops they replace:
+- `create_gradient` (AppStore): t = y / h, colour = a + (b - a) * t
+- `make_vertical_gradient` (Social): t = y / (h - 1), colour = a * (1 - t) + b * t
+  -> use `endpoint=True, blend="weighted"`.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import numpy as np
+from PIL import Image
+
+from .trace import stage
+
+RGB = tuple[int, int, int]
+Stop = Union[RGB, tuple[float, RGB]]
+
+DIRECTIONS = ("vertical", "horizontal")
+BLENDS = ("offset", "weighted")
+
+
+def _normalize_stops(stops: Sequence[Stop]) -> tuple[np.ndarray, np.ndarray]:
+    """Return (positions, colours) arrays. Bare colours are spaced evenly."""
+    if len(stops) < 2:
+        raise ValueError("A gradient needs at least two colour stops.")
+    paired = [len(s) == 2 for s in stops]
+    if any(paired) and not all(paired):
+        raise ValueError("Mix of bare colours and (position, colour) stops.")
+    if all(paired):
+        positions = np.array([float(p) for p, _ in stops])
+        colors = np.array([c for _, c in stops], dtype=np.float64)
+    else:
+        positions = np.linspace(0.0, 1.0, len(stops))
+        colors = np.array(stops, dtype=np.float64)
+    if colors.shape[1] != 3:
+        raise ValueError("Gradient stops must be RGB colours.")
+    if np.any(np.diff(positions) <= 0):
+        raise ValueError("Gradient stop positions must be strictly increasing.")
+    return positions, colors
+
+
+def _evaluate(t: np.ndarray, stops: Sequence[Stop], blend: str) -> np.ndarray:
+    """Evaluate the stop ramp at parameter values `t`; returns float colours (..., 3)."""
+    if blend not in BLENDS:
+        raise ValueError(f"Unknown blend {blend!r}; expected one of {BLENDS}.")
+    positions, colors = _normalize_stops(stops)
+    t = np.clip(t, positions[0], positions[-1])
+
+    seg = np.clip(np.searchsorted(positions, t, side="right") - 1, 0, len(positions) - 2)
+    p0 = positions[seg]
+    p1 = positions[seg + 1]
+    # For the common [0, 1] two-stop case this is exactly `t`, which keeps
+    # the arithmetic identical to the legacy loops.
+    local = ((t - p0) / (p1 - p0))[..., None]
+    a = colors[seg]
+    b = colors[seg + 1]
+    if blend == "offset":
+        return a + (b - a) * local
+    return a * (1 - local) + b * local
+
+
+def _quantize(values: np.ndarray, dither: float, seed: int) -> np.ndarray:
+    if dither > 0:
+        rng = np.random.default_rng(seed)
+        values = values + rng.random(values.shape) * dither - dither / 2 + 0.5
+        values = np.floor(values)
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+
+@stage
+def linear_gradient(
+    size: tuple[int, int],
+    stops: Sequence[Stop],
+    direction: str = "vertical",
+    endpoint: bool = False,
+    blend: str = "offset",
+    dither: float = 0.0,
+    seed: int = 0,
+) -> Image.Image:
+    """Create an RGB linear gradient.
+
+    `stops` are RGB colours spaced evenly, or `(position, colour)` pairs with
+    positions in [0, 1]. `endpoint=True` makes the last row/column land
+    exactly on the last stop. `dither` (in 8-bit levels, ~1.0 is enough)
+    adds seeded noise before quantizing to hide banding.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Unknown direction {direction!r}; expected one of {DIRECTIONS}.")
+    w, h = size
+    length = h if direction == "vertical" else w
+    denom = max(1, length - 1) if endpoint else length
+    t = np.arange(length) / denom
+    strip = _evaluate(t, stops, blend)
+
+    if dither > 0:
+        shape = (h, w, 3)
+        axis_view = strip[:, None, :] if direction == "vertical" else strip[None, :, :]
+        return Image.fromarray(_quantize(np.broadcast_to(axis_view, shape), dither, seed))
+
+    strip = _quantize(strip, 0.0, seed)
+    if direction == "vertical":
+        img = Image.fromarray(np.ascontiguousarray(strip[:, None, :]))
+    else:
+        img = Image.fromarray(np.ascontiguousarray(strip[None, :, :]))
+    return img.resize(size, Image.Resampling.NEAREST)
+
+
+@stage
+def radial_gradient(
+    size: tuple[int, int],
+    stops: Sequence[Stop],
+    center: tuple[float, float] | None = None,
+    radius: float | None = None,
+    blend: str = "offset",
+    dither: float = 0.0,
+    seed: int = 0,
+) -> Image.Image:
+    """Create an RGB radial gradient; the first stop sits at `center`.
+
+    `radius` defaults to the distance from the centre to the farthest corner.
+    """
+    w, h = size
+    cx, cy = center if center is not None else (w / 2, h / 2)
+    if radius is None:
+        radius = max(np.hypot(x - cx, y - cy) for x in (0, w) for y in (0, h))
+    ys = (np.arange(h, dtype=np.float64) - cy)[:, None]
+    xs = (np.arange(w, dtype=np.float64) - cx)[None, :]
+    t = np.sqrt(xs * xs + ys * ys) / max(radius, 1e-9)
+    return Image.fromarray(_quantize(_evaluate(t, stops, blend), dither, seed))
+
+
+@stage
+def vertical_gradient(size: tuple[int, int], top: RGB, bottom: RGB, **kwargs) -> Image.Image:
+    """Two-stop top-to-bottom shorthand for `linear_gradient`."""
+    return linear_gradient(size, [top, bottom], direction="vertical", **kwargs)
@@ -0,0 +1,207 @@
+"""Decoded-and-resized image cache shared by the preview and social generators.
+
+The same simulator screenshots feed several posts and every preview size,
+and each use used to decode the PNG and Lanczos-resize it again. An
+`ImageCache` keys results by (file content hash, target size, mode,
+resample filter, fit mode):
+
+- decoded sources and fitted results live in an in-memory LRU bounded by
+  `max_bytes`;
+- fitted results are also spilled as raw pixel bytes to `spill_dir`, so a
+  later run skips both the PNG decode and the resample.
+
+Returned images are shared; copy before drawing on them.
+
+`default_cache()` spills to ~/.cache/untwist/images. Set
+`UNTWIST_IMAGE_CACHE` to another directory, or to an empty string to keep
+the cache in memory only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Optional
+
+from PIL import Image, ImageOps
+
+from .trace import stage
+
+FITS = ("stretch", "cover")
+LANCZOS = Image.Resampling.LANCZOS
+MB = 1024 * 1024
+
+Loader = Callable[[str], Optional[Image.Image]]
+
+
+def _nbytes(img: Image.Image) -> int:
+    return img.width * img.height * len(img.getbands())
+
+
+class ImageCache:
+    def __init__(self, max_bytes: int = 512 * MB, spill_dir: Optional[str] = None,
+                 spill_max_bytes: int = 1024 * MB):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes
+        self.stats = {"memory": 0, "disk": 0, "miss": 0}
+        self._entries: OrderedDict[tuple, Image.Image] = OrderedDict()
+        self._bytes = 0
+        self._digests: dict[tuple, str] = {}
+
+    # ── Keys ────────────────────────────────────────────────────────────────
+
+    def digest(self, path: str) -> Optional[str]:
+        """sha256 of the file's bytes, memoized per (path, mtime, size); None if missing."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (os.fspath(path), st.st_mtime_ns, st.st_size)
+        if stamp not in self._digests:
+            with open(path, "rb") as f:
+                self._digests[stamp] = hashlib.sha256(f.read()).hexdigest()
+        return self._digests[stamp]
+
+    # ── In-memory LRU ───────────────────────────────────────────────────────
+
+    def _get(self, key: tuple) -> Optional[Image.Image]:
+        img = self._entries.get(key)
+        if img is not None:
+            self._entries.move_to_end(key)
+        return img
+
+    def _put(self, key: tuple, img: Image.Image) -> None:
+        if key in self._entries:
+            return
+        self._entries[key] = img
+        self._bytes += _nbytes(img)
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= _nbytes(old)
+
+    # ── Disk spill ──────────────────────────────────────────────────────────
+
+    def _spill_path(self, key: tuple) -> Optional[str]:
+        if not self.spill_dir:
+            return None
+        name = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:40]
+        return os.path.join(self.spill_dir, f"{name}.raw")
+
+    def _spill_read(self, key: tuple, mode: str, size: tuple[int, int]) -> Optional[Image.Image]:
+        path = self._spill_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != size[0] * size[1] * len(mode):
+            return None
+        os.utime(path)  # keep recently used files out of the pruning order
+        return Image.frombytes(mode, size, data)
+
+    def _spill_write(self, key: tuple, img: Image.Image) -> None:
+        path = self._spill_path(key)
+        if path is None:
+            return
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(img.tobytes())
+            os.replace(tmp, path)
+            self._prune_spill()
+        except OSError:
+            pass  # the spill is an optimization; a read-only cache dir is fine
+
+    def _prune_spill(self) -> None:
+        """Drop least recently used spill files beyond `spill_max_bytes`."""
+        files = []
+        for entry in os.scandir(self.spill_dir):
+            if entry.name.endswith(".raw"):
+                st = entry.stat()
+                files.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.spill_max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    # ── Public API ──────────────────────────────────────────────────────────
+
+    def source(self, path: str, mode: str = "RGBA") -> Optional[Image.Image]:
+        """Decoded image at `path` converted to `mode`, or None if it is missing."""
+        digest = self.digest(path)
+        if digest is None:
+            return None
+        key = ("source", digest, mode)
+        img = self._get(key)
+        if img is None:
+            img = Image.open(path).convert(mode)
+            self._put(key, img)
+        return img
+
+    def fitted(
+        self,
+        path: str,
+        size: tuple[int, int],
+        mode: str = "RGBA",
+        resample: int = LANCZOS,
+        fit: str = "stretch",
+        loader: Optional[Loader] = None,
+    ) -> Optional[Image.Image]:
+        """`path` decoded to `mode` and resized to `size`, or None if it is missing.
+
+        fit="stretch" is `img.resize(size)`, fit="cover" is `ImageOps.fit`
+        (centre crop to the target aspect). `loader` overrides how the source
+        is decoded on a miss (e.g. from shared memory); it must return `mode`.
+        """
+        if fit not in FITS:
+            raise ValueError(f"Unknown fit {fit!r}; expected one of {FITS}.")
+        digest = self.digest(path)
+        if digest is None:
+            return None
+        size = (int(size[0]), int(size[1]))
+        key = ("fitted", digest, size, mode, int(resample), fit)
+
+        img = self._get(key)
+        if img is not None:
+            self.stats["memory"] += 1
+            return img
+        img = self._spill_read(key, mode, size)
+        if img is not None:
+            self.stats["disk"] += 1
+            self._put(key, img)
+            return img
+
+        self.stats["miss"] += 1
+        source = loader(path) if loader is not None else self.source(path, mode)
+        if source is None:
+            return None
+        if fit == "stretch":
+            img = source.resize(size, resample)
+        else:
+            img = ImageOps.fit(source, size, method=resample)
+        self._put(key, img)
+        self._spill_write(key, img)
+        return img
+
+
+@lru_cache(maxsize=1)
+def default_cache() -> ImageCache:
+    """Process-wide cache configured from `UNTWIST_IMAGE_CACHE`."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    spill_dir = os.environ.get("UNTWIST_IMAGE_CACHE", os.path.join(cache_home, "untwist", "images"))
+    return ImageCache(spill_dir=spill_dir or None)
+
+
+@stage
+def fit_cached(path, size: tuple[int, int], mode: str = "RGBA", fit: str = "stretch",
+               resample: int = LANCZOS, loader: Optional[Loader] = None) -> Optional[Image.Image]:
+    """`default_cache().fitted(...)`; None if `path` does not exist."""
+    return default_cache().fitted(os.fspath(path), size, mode=mode, resample=resample, fit=fit, loader=loader)
@@ -0,0 +1,216 @@
+"""Closed-form soft shadows and glows for rounded rectangles and ellipses.
+
+`ImageFilter.GaussianBlur` over a mostly empty RGBA layer was the slowest
+step of every phone mockup and blob background. For a convex shape every
+pixel row is a single span, so its Gaussian blur is a sum over rows of
+(vertical Gaussian weight) x (horizontal erf difference). Rows with the
+same span (the straight middle of a rounded rectangle) collapse into one
+term, which turns the whole blur into one small matrix product evaluated
+only over the shape's bounding box plus 4 sigma.
+
+`soft_layer` reproduces what drawing the shapes on a transparent layer and
+running `GaussianBlur(radius)` gives (Pillow blurs RGBA channels without
+premultiplying, so colour fades towards black together with alpha). The
+shapes are treated as lying on an infinite transparent plane; Pillow instead
+clamps at the layer edge, so shapes closer than `radius` to the edge should
+keep the filter (`shadow_layer` picks the path). Composited over black,
+white and brand purple the difference to Pillow's box-blur approximation is
+at most 3 levels for phone shadows and `DIFFERENCE_BOUND` levels for
+full-canvas blobs touching the edge (see `compare_to_blur`).
+
+`fast_blur` is the downscale-blur-upscale fallback for arbitrary shapes.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import NamedTuple, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from .trace import stage
+
+RGBA = tuple[int, int, int, int]
+Box = tuple[int, int, int, int]
+
+SHAPES = ("rounded_rectangle", "ellipse")
+COMPARE_BACKGROUNDS = ((0, 0, 0, 255), (255, 255, 255, 255), (108, 92, 231, 255))
+# Max composited difference (8-bit levels) vs. GaussianBlur measured on the
+# phone-shadow and blob presets; `bench_previews.py --check` re-checks it
+# with compare_to_blur().
+DIFFERENCE_BOUND = 6
+
+
+class SoftShape(NamedTuple):
+    kind: str  # "rounded_rectangle" or "ellipse"
+    box: Box  # inclusive (x0, y0, x1, y1), as passed to ImageDraw
+    fill: RGBA
+    radius: int = 0  # corner radius for rounded rectangles
+
+
+def _norm_cdf(z: np.ndarray) -> np.ndarray:
+    """Standard normal CDF via the Abramowitz-Stegun 7.1.26 erf (|err| < 1.5e-7)."""
+    x = np.abs(z) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-x * x)
+    return 0.5 * (1.0 + np.copysign(erf, z))
+
+
+def _row_spans(shape: SoftShape) -> tuple[int, np.ndarray, np.ndarray]:
+    """Rasterize the shape (no blur) and return (first row, left, right) spans."""
+    x0, y0, x1, y1 = shape.box
+    mask = Image.new("1", (x1 - x0 + 1, y1 - y0 + 1), 0)
+    draw = ImageDraw.Draw(mask)
+    local = (0, 0, x1 - x0, y1 - y0)
+    if shape.kind == "rounded_rectangle":
+        draw.rounded_rectangle(local, radius=shape.radius, fill=1)
+    elif shape.kind == "ellipse":
+        draw.ellipse(local, fill=1)
+    else:
+        raise ValueError(f"Unknown shape {shape.kind!r}; expected one of {SHAPES}.")
+
+    rows = np.asarray(mask, dtype=bool)
+    filled = rows.any(axis=1)
+    first = int(np.argmax(filled))
+    rows = rows[filled]
+    width = rows.shape[1]
+    left = np.argmax(rows, axis=1)
+    right = width - 1 - np.argmax(rows[:, ::-1], axis=1)
+    if np.any(rows.sum(axis=1) != right - left + 1):
+        raise ValueError("Shape rows are not single spans; use fast_blur instead.")
+    return y0 + first, left + x0, right + x0
+
+
+def _cdf_table(sigma: float) -> tuple[np.ndarray, int]:
+    """C[d + reach] = Phi((d + 0.5) / sigma) for integer offsets d; saturates past `reach`."""
+    reach = int(math.ceil(5 * sigma)) + 1
+    return _norm_cdf((np.arange(-reach, reach + 1) + 0.5) / sigma).astype(np.float32), reach
+
+
+def _span_weights(coords: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+                  table: np.ndarray, reach: int) -> np.ndarray:
+    """Gaussian mass of pixel spans [lo, hi] seen from `coords`; shape (len(coords), len(lo))."""
+    d = coords[:, None]
+    return (table[np.clip(d - lo[None, :], -reach, reach) + reach]
+            - table[np.clip(d - hi[None, :] - 1, -reach, reach) + reach])
+
+
+def _coverage(shape: SoftShape, sigma: float, region: Box) -> np.ndarray:
+    """Blurred 0..1 coverage of `shape` over `region` (x0, y0, x1, y1 exclusive).
+
+    The closed form is evaluated every `step` pixels (centred in each block)
+    and bilinearly upsampled; at step <= sigma / 8 that costs well under a
+    hundredth of an 8-bit level.
+    """
+    top, left, right = _row_spans(shape)
+    rx0, ry0, rx1, ry1 = region
+    table, reach = _cdf_table(sigma)
+    step = max(1, int(sigma // 8))
+
+    # Group consecutive rows that share a span: [starts[k], ends[k]] inclusive.
+    change = np.flatnonzero((np.diff(left) != 0) | (np.diff(right) != 0)) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change - 1, [len(left) - 1]))
+
+    def samples(start: int, stop: int) -> np.ndarray:
+        # One extra sample on each side keeps the resize edge clamp outside the region.
+        n = -(-(stop - start) // step) + 2
+        return start + (np.arange(n) - 1) * step + (step - 1) // 2
+
+    ys, xs = samples(ry0, ry1), samples(rx0, rx1)
+    gy = _span_weights(ys, top + starts, top + ends, table, reach)
+    gx = _span_weights(xs, left[starts], right[starts], table, reach)
+    coarse = gy @ gx.T
+    if step == 1:
+        return coarse[1:-1, 1:-1][: ry1 - ry0, : rx1 - rx0]
+    fine = Image.fromarray(coarse.astype(np.float32)).resize(
+        (len(xs) * step, len(ys) * step), Image.Resampling.BILINEAR
+    )
+    return np.asarray(fine)[step: step + ry1 - ry0, step: step + rx1 - rx0]
+
+
+@stage
+def soft_layer(size: tuple[int, int], shapes: list[SoftShape], radius: float) -> Image.Image:
+    """RGBA layer equal to drawing `shapes` on a transparent layer and blurring it.
+
+    Shapes must not overlap (overlapping fills would overwrite, not add).
+    """
+    w, h = size
+    sigma = max(float(radius), 1e-3)
+    reach = int(math.ceil(4 * sigma))
+    out = np.zeros((h, w, 4), dtype=np.float32)
+    for shape in shapes:
+        x0, y0, x1, y1 = shape.box
+        region = (max(0, x0 - reach), max(0, y0 - reach), min(w, x1 + reach + 1), min(h, y1 + reach + 1))
+        if region[0] >= region[2] or region[1] >= region[3]:
+            continue
+        cov = _coverage(shape, sigma, region)
+        view = out[region[1]:region[3], region[0]:region[2]]
+        for channel, value in enumerate(shape.fill):
+            if value:
+                view[..., channel] += cov * value
+    np.clip(out, 0, 255, out=out)
+    out += 0.5
+    return Image.fromarray(out.astype(np.uint8))
+
+
+def reference_layer(size: tuple[int, int], shapes: list[SoftShape], radius: float) -> Image.Image:
+    """The GaussianBlur path `soft_layer` replaces; used for comparisons."""
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    for shape in shapes:
+        if shape.kind == "rounded_rectangle":
+            draw.rounded_rectangle(shape.box, radius=shape.radius, fill=shape.fill)
+        else:
+            draw.ellipse(shape.box, fill=shape.fill)
+    return layer.filter(ImageFilter.GaussianBlur(radius=radius))
+
+
+def clear_of_edge(size: tuple[int, int], shapes: list[SoftShape], radius: float) -> bool:
+    """True if every shape keeps `radius` clear of the layer edge (`shadow_layer` then uses `soft_layer`)."""
+    w, h = size
+    margin = min((min(x0, y0, w - 1 - x1, h - 1 - y1) for x0, y0, x1, y1 in (s.box for s in shapes)), default=w)
+    return margin >= radius
+
+
+@stage
+def shadow_layer(size: tuple[int, int], shapes: list[SoftShape], radius: float) -> Image.Image:
+    """`soft_layer` when every shape keeps `radius` clear of the layer edge, else the filter."""
+    if clear_of_edge(size, shapes, radius):
+        return soft_layer(size, shapes, radius)
+    return reference_layer(size, shapes, radius)
+
+
+def compare_to_blur(size: tuple[int, int], shapes: list[SoftShape], radius: float) -> dict[str, float]:
+    """Max and mean difference (8-bit levels) between the two paths once composited.
+
+    Raw RGB differences are meaningless where alpha is ~0, so both layers are
+    alpha-composited over each of `COMPARE_BACKGROUNDS` and compared there.
+    """
+    fast = soft_layer(size, shapes, radius)
+    ref = reference_layer(size, shapes, radius)
+    worst, total = 0.0, 0.0
+    for color in COMPARE_BACKGROUNDS:
+        bg = Image.new("RGBA", size, color)
+        a = np.asarray(Image.alpha_composite(bg, fast), dtype=np.int16)
+        b = np.asarray(Image.alpha_composite(bg, ref), dtype=np.int16)
+        diff = np.abs(a - b)[..., :3]
+        worst = max(worst, float(diff.max()))
+        total += float(diff.mean())
+    return {"max": worst, "mean": total / len(COMPARE_BACKGROUNDS)}
+
+
+@stage
+def fast_blur(img: Image.Image, radius: float, factor: Optional[int] = None) -> Image.Image:
+    """Approximate `GaussianBlur(radius)` by blurring a reduced copy and scaling back up.
+
+    Meant for large radii on arbitrary shapes; small radii use the exact filter.
+    """
+    if factor is None:
+        factor = max(1, int(radius // 8))
+    if factor <= 1:
+        return img.filter(ImageFilter.GaussianBlur(radius=radius))
+    small = img.reduce(factor).filter(ImageFilter.GaussianBlur(radius=radius / factor))
+    return small.resize(img.size, Image.Resampling.BILINEAR)
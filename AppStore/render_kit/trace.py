@@ -0,0 +1,326 @@
+"""Opt-in render tracing: wall time, CPU time and Pillow allocations per stage.
+
+Off by default and free when off: `stage` hands back the function it
+decorates unchanged and Pillow is not patched. Turn it on for one run with
+`--trace out.json` on a generator's command line, `UNTWIST_TRACE=out.json`,
+or `UNTWIST_TRACE=1` (writes ./trace_<script>.json). The switch is read once,
+when render_kit is first imported, so it covers decorators that run at
+import time.
+
+When on:
+- every `@stage` function, plus the Pillow calls the generators spend their
+  time in (decode, convert, resize, filter/blur, paste, alpha_composite,
+  text layout and drawing, save/encode), becomes a nested span recording
+  wall time, CPU time of the calling thread and bytes of Pillow image
+  buffers allocated (NumPy temporaries are not counted);
+- every `Image.save` to a file (or `trace.output(path)`, used by
+  render_kit.encode) closes an output span covering what its thread did since
+  the previous output, so each written image gets totals;
+- worker processes (forked or spawned, e.g. the preview `--jobs` pool)
+  append their spans to `<out>.parts/`, merged by the tracing process.
+
+At exit the spans are written as a Chrome trace_event file (chrome://tracing
+or https://ui.perfetto.dev), and a per-stage / per-output table is printed
+and saved as `<out>.summary.md`.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, TypeVar
+
+ENV = "UNTWIST_TRACE"
+OWNER_ENV = "UNTWIST_TRACE_OWNER"
+OUTPUT_TID = 0  # output spans get their own track; native thread ids are never 0
+MB = 1024 * 1024
+
+F = TypeVar("F", bound=Callable)
+
+_events: list[dict] = []
+_local = threading.local()
+
+
+def _configured_path() -> Optional[Path]:
+    """Trace file requested by `--trace` (wins) or UNTWIST_TRACE, else None."""
+    argv = sys.argv[1:]
+    for i, arg in enumerate(argv):
+        if arg == "--trace" and i + 1 < len(argv):
+            return Path(argv[i + 1]).resolve()
+        if arg.startswith("--trace="):
+            return Path(arg.split("=", 1)[1]).resolve()
+    value = os.environ.get(ENV, "").strip()
+    if value.lower() in ("", "0", "false", "no", "off"):
+        return None
+    if value.lower() in ("1", "true", "yes", "on"):
+        script = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] not in ("", "-c") else "untwist"
+        return Path(f"trace_{script}.json").resolve()
+    return Path(value).resolve()
+
+
+_path = _configured_path()
+# The first traced process writes the file; its children only spool spans.
+_owner = _path is not None and os.environ.get(OWNER_ENV, str(os.getpid())) == str(os.getpid())
+
+
+def enabled() -> bool:
+    return _path is not None
+
+
+class _Thread:
+    """Per-thread span stack, allocation counter and start of the current output."""
+
+    def __init__(self) -> None:
+        self.tid = threading.get_native_id()
+        self.stack: list[list[int]] = []  # [child wall ns] per open span
+        self.allocated = 0
+        self.mark = (time.perf_counter_ns(), time.thread_time_ns(), 0)
+
+
+def _thread() -> _Thread:
+    t = getattr(_local, "t", None)
+    if t is None:
+        t = _local.t = _Thread()
+    return t
+
+
+def _event(name: str, cat: str, start: int, wall: int, tid: int, **args) -> dict:
+    return {
+        "name": name,
+        "cat": cat,
+        "ph": "X",
+        "ts": start / 1000,
+        "dur": wall / 1000,
+        "pid": os.getpid(),
+        "tid": tid,
+        "args": args,
+    }
+
+
+def _span(name: str, cat: str, fn: Callable, args: tuple, kwargs: dict):
+    t = _thread()
+    frame = [0]
+    t.stack.append(frame)
+    start, cpu, allocated = time.perf_counter_ns(), time.thread_time_ns(), t.allocated
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        wall = time.perf_counter_ns() - start
+        t.stack.pop()
+        if t.stack:
+            t.stack[-1][0] += wall
+        _events.append(_event(
+            name, cat, start, wall, t.tid,
+            self_ms=round((wall - frame[0]) / 1e6, 3),
+            cpu_ms=round((time.thread_time_ns() - cpu) / 1e6, 3),
+            alloc_mb=round((t.allocated - allocated) / MB, 3),
+        ))
+        if not t.stack and not _owner:
+            _flush()
+
+
+def _wrap(fn: Callable, name: str, cat: str) -> Callable:
+    @functools.wraps(fn)
+    def traced(*args, **kwargs):
+        return _span(name, cat, fn, args, kwargs)
+
+    return traced
+
+
+def stage(fn: F) -> F:
+    """Decorator: trace calls to `fn` as a stage; returns `fn` itself when tracing is off."""
+    if _path is None:
+        return fn
+    return _wrap(fn, fn.__qualname__, "stage")
+
+
+def _output(path: str) -> None:
+    t = _thread()
+    start, cpu, allocated = t.mark
+    t.mark = (time.perf_counter_ns(), time.thread_time_ns(), t.allocated)
+    _events.append(_event(
+        os.path.basename(path), "output", start, t.mark[0] - start, OUTPUT_TID,
+        path=path,
+        cpu_ms=round((t.mark[1] - cpu) / 1e6, 3),
+        alloc_mb=round((t.allocated - allocated) / MB, 3),
+    ))
+    if not _owner:
+        _flush()
+
+
+def output(path) -> None:
+    """Close an output span for `path` in the calling thread, for images that are
+    encoded to memory or handed to another thread instead of saved to a file."""
+    if _path is not None:
+        _output(os.fspath(path))
+
+
+# ── Pillow hooks ─────────────────────────────────────────────────────────────
+
+def _nbytes(core) -> int:
+    """Bytes Pillow allocates for a core image (1, L and P are 1 byte/px, I;16 2, the rest 4)."""
+    w, h = core.size
+    mode = core.mode
+    per_pixel = 1 if mode in ("1", "L", "P") else 2 if mode.startswith("I;16") else 4
+    return w * h * per_pixel
+
+
+def _patch_pillow() -> None:
+    from PIL import Image, ImageDraw, ImageFile
+
+    for cls, names in (
+        (Image.Image, ("convert", "resize", "filter", "paste")),
+        (ImageDraw.ImageDraw, ("text", "textbbox", "textlength")),
+        (ImageFile.ImageFile, ("load",)),
+    ):
+        for name in names:
+            setattr(cls, name, _wrap(getattr(cls, name), f"{cls.__name__}.{name}", "pillow"))
+    # Image.Image.alpha_composite goes through the module function.
+    Image.alpha_composite = _wrap(Image.alpha_composite, "Image.alpha_composite", "pillow")
+
+    save = Image.Image.save
+
+    @functools.wraps(save)
+    def traced_save(self, fp, *args, **kwargs):
+        result = _span("Image.save", "pillow", save, (self, fp) + args, kwargs)
+        if isinstance(fp, (str, os.PathLike)):
+            _output(os.fspath(fp))
+        return result
+
+    Image.Image.save = traced_save
+
+    # Every derived image is wrapped by Image._new; decoded files allocate in load_prepare.
+    new = Image.Image._new
+
+    @functools.wraps(new)
+    def counted_new(self, im):
+        _thread().allocated += _nbytes(im)
+        return new(self, im)
+
+    Image.Image._new = counted_new
+
+    prepare = ImageFile.ImageFile.load_prepare
+
+    @functools.wraps(prepare)
+    def counted_prepare(self):
+        before = self._im
+        prepare(self)
+        if self._im is not None and self._im is not before:
+            _thread().allocated += _nbytes(self._im)
+
+    ImageFile.ImageFile.load_prepare = counted_prepare
+
+
+# ── Output ───────────────────────────────────────────────────────────────────
+
+def _parts_dir() -> Path:
+    return _path.with_name(_path.name + ".parts")
+
+
+def _flush() -> None:
+    """Worker processes: append finished spans to <out>.parts/<pid>.jsonl."""
+    if not _events:
+        return
+    batch = _events[:]
+    del _events[:len(batch)]
+    parts = _parts_dir()
+    parts.mkdir(parents=True, exist_ok=True)
+    with open(parts / f"{os.getpid()}.jsonl", "a", encoding="utf-8") as f:
+        f.writelines(json.dumps(e) + "\n" for e in batch)
+
+
+def summary_lines(events: list[dict]) -> list[str]:
+    """Markdown tables: stages by self time, then outputs in write order."""
+    stages: dict[str, list[float]] = {}
+    outputs = []
+    for e in events:
+        if e.get("ph") != "X":
+            continue
+        if e["cat"] == "output":
+            outputs.append(e)
+            continue
+        s = stages.setdefault(e["name"], [0, 0.0, 0.0, 0.0, 0.0])
+        s[0] += 1
+        s[1] += e["dur"] / 1000
+        s[2] += e["args"]["self_ms"]
+        s[3] += e["args"]["cpu_ms"]
+        s[4] += e["args"]["alloc_mb"]
+
+    lines = ["## Stages", "", "| Stage | Calls | Wall ms | Self ms | CPU ms | Alloc MB |", "|---|---:|---:|---:|---:|---:|"]
+    for name, (calls, wall, own, cpu, alloc) in sorted(stages.items(), key=lambda kv: -kv[1][2]):
+        lines.append(f"| `{name}` | {calls} | {wall:.1f} | {own:.1f} | {cpu:.1f} | {alloc:.1f} |")
+    if not stages:
+        lines.append("| _None_ | - | - | - | - | - |")
+    lines += ["", "## Outputs", "", "| Output | Wall ms | CPU ms | Alloc MB |", "|---|---:|---:|---:|"]
+    for e in sorted(outputs, key=lambda e: e["ts"] + e["dur"]):
+        lines.append(f"| `{e['name']}` | {e['dur'] / 1000:.1f} | {e['args']['cpu_ms']:.1f} | {e['args']['alloc_mb']:.1f} |")
+    if not outputs:
+        lines.append("| _None_ | - | - | - |")
+    lines.append("")
+    return lines
+
+
+def _metadata(events: list[dict]) -> list[dict]:
+    script = Path(sys.argv[0]).name if sys.argv and sys.argv[0] else "python"
+    meta = []
+    for pid in sorted({e["pid"] for e in events} | {os.getpid()}):
+        name = script if pid == os.getpid() else f"{script} worker {pid}"
+        meta.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": name}})
+        meta.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": OUTPUT_TID, "args": {"name": "outputs"}})
+    return meta
+
+
+def _finish() -> None:
+    events = list(_events)
+    parts = _parts_dir()
+    if parts.is_dir():
+        for part in sorted(parts.glob("*.jsonl")):
+            events.extend(json.loads(line) for line in part.read_text(encoding="utf-8").splitlines() if line)
+            part.unlink()
+        try:
+            parts.rmdir()
+        except OSError:
+            pass
+    events.sort(key=lambda e: (e["pid"], e["ts"]))
+    trace = {
+        "traceEvents": _metadata(events) + events,
+        "displayTimeUnit": "ms",
+        "otherData": {"command": " ".join(sys.argv)},
+    }
+    _path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _path.with_name(f".{_path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(trace), encoding="utf-8")
+    os.replace(tmp, _path)
+
+    lines = summary_lines(events)
+    summary = _path.with_suffix(".summary.md")
+    summary.write_text("\n".join([f"# Render Trace ({' '.join(sys.argv)})", ""] + lines), encoding="utf-8")
+    print("\n" + "\n".join(lines), file=sys.stderr)
+    print(f"Trace: {_path} ({len(events)} spans); summary: {summary}", file=sys.stderr)
+
+
+def _forked() -> None:
+    global _owner, _local
+    _owner = False
+    _events.clear()
+    _local = threading.local()
+
+
+if _path is not None:
+    _patch_pillow()
+    if _owner:
+        os.environ[ENV] = str(_path)
+        os.environ[OWNER_ENV] = str(os.getpid())
+        for stale in _parts_dir().glob("*.jsonl"):
+            stale.unlink()
+        atexit.register(_finish)
+    else:
+        atexit.register(_flush)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_forked)
@@ -0,0 +1,178 @@
+"""Watch mode: keep a generator warm in one process and re-render on edits.
+
+A cold run pays for the Python start, the Pillow import, font lookup,
+screenshot decoding and the whole pack, even when one headline changed.
+`serve` instead stays up. It polls the generator script, its input folders
+and render_kit itself, and after each change:
+
+- reloads the script if it changed, as a fresh module (its `__main__` block
+  does not run). render_kit is not reloaded, so font faces, frame templates
+  and fitted screenshots (`image_cache`, keyed by file content) stay warm;
+- drops entries for changed files from the script's path-keyed caches
+  (`carry`) and hands the rest to the reloaded module;
+- asks the script for every job's inputs as named parts (copy, theme,
+  screenshot digest, source of the drawing code, ...) and re-renders only
+  the jobs whose parts differ from the last build, logging which parts
+  changed.
+
+An edit to render_kit itself restarts the process: its modules are shared
+by everything already loaded and cannot be swapped safely.
+
+Polling (mtime and size, every `interval` seconds) needs no extra
+dependency and works the same on macOS and Linux.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Iterable, Optional
+
+from .encode import OutputWriter, WriteResult
+
+RENDER_KIT_DIR = Path(__file__).absolute().parent
+IGNORED_SUFFIXES = (".tmp", ".swp", ".swx", "~", ".pyc")
+
+Inputs = dict[str, Any]  # input name -> JSON-able value
+JobsFn = Callable[[ModuleType], dict[Any, Inputs]]
+RenderFn = Callable[[ModuleType, Any, OutputWriter], list]
+BuiltFn = Callable[[ModuleType, Any, list[WriteResult]], None]
+
+
+def log(message: str) -> None:
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+
+
+class Watcher:
+    """Reports files added, removed or modified under `paths` (files or flat directories)."""
+
+    def __init__(self, paths: Iterable) -> None:
+        self.paths = [Path(p).absolute() for p in paths]
+        self._stamps = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        stamps = {}
+        for path in self.paths:
+            files = sorted(path.iterdir()) if path.is_dir() else [path]
+            for f in files:
+                if f.name.startswith(".") or f.name.endswith(IGNORED_SUFFIXES):
+                    continue
+                try:
+                    st = f.stat()
+                except OSError:
+                    continue
+                if not f.is_dir():
+                    stamps[f] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def poll(self) -> list[Path]:
+        stamps = self._scan()
+        changed = sorted(p for p in stamps.keys() | self._stamps.keys() if stamps.get(p) != self._stamps.get(p))
+        self._stamps = stamps
+        return changed
+
+
+def load_script(path) -> ModuleType:
+    """Execute a generator script as a new module named after it (not `__main__`)."""
+    path = Path(path).absolute()
+    spec = importlib.util.spec_from_file_location(f"{path.stem}_watch", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def changed_parts(old: Optional[Inputs], new: Inputs) -> list[str]:
+    """Names of the inputs that differ; ["new"] for a job not built before."""
+    if old is None:
+        return ["new"]
+    return sorted(k for k in old.keys() | new.keys() if old.get(k) != new.get(k))
+
+
+def restart() -> None:
+    """Replace this process with a fresh run of the same command line."""
+    log("render_kit changed; restarting")
+    sys.stdout.flush()
+    os.execv(sys.executable, [sys.executable, *sys.argv])
+
+
+def _build(module: ModuleType, todo: list, reasons: dict, render: RenderFn, built: Optional[BuiltFn]) -> None:
+    start = time.perf_counter()
+    count = 0
+    with OutputWriter() as writer:
+        pending = [(key, render(module, key, writer)) for key in todo]
+    for key, results in pending:
+        results = [r.result() if hasattr(r, "result") else r for r in results]
+        for r in results:
+            count += 1
+            mark, state = ("+", f"{r.size // 1024} KB") if r.written else ("=", "unchanged")
+            log(f"  {mark} {r.path.name} ({state}) [{', '.join(reasons[key])}]")
+        if built is not None:
+            built(module, key, results)
+    log(f"Rebuilt {count} output(s) in {time.perf_counter() - start:.2f} s")
+
+
+def serve(module: ModuleType, paths: Iterable, jobs: JobsFn, render: RenderFn,
+          initial: Optional[Iterable] = None, built: Optional[BuiltFn] = None,
+          carry: Iterable[str] = (), interval: float = 0.3) -> None:
+    """Build, then rebuild affected jobs on every change under `paths` until Ctrl-C.
+
+    `module` is the running generator; its file is reloaded when edited.
+    `jobs(module)` maps each job key to its named inputs, `render(module, key,
+    writer)` returns that job's WriteResults or futures of them, and
+    `built(module, key, results)` runs after each job is written. The first
+    build covers `initial` (every job if None). `carry` names module-level
+    dicts keyed by file path that survive reloads.
+    """
+    script = Path(module.__file__).absolute()
+    carry = tuple(carry)
+    watcher = Watcher([script, RENDER_KIT_DIR, *paths])
+    current = jobs(module)
+    todo = list(current) if initial is None else list(initial)
+    log(f"Watching {script.name}, render_kit and {len(watcher.paths) - 2} input path(s); Ctrl-C to stop")
+    try:
+        if todo:
+            _build(module, todo, {key: ["startup"] for key in todo}, render, built)
+    except Exception:
+        traceback.print_exc()
+        log("Build failed; every job is rebuilt after the next change")
+        current = {}
+
+    try:
+        while True:
+            time.sleep(interval)
+            changed = watcher.poll()
+            if not changed:
+                continue
+            time.sleep(interval)  # editors often save in more than one write
+            changed = sorted(set(changed) | set(watcher.poll()))
+            log("Changed: " + ", ".join(p.name for p in changed))
+            if any(RENDER_KIT_DIR in p.parents for p in changed):
+                restart()
+            try:
+                for name in carry:
+                    cache = getattr(module, name)
+                    for p in changed:
+                        cache.pop(str(p), None)
+                if script in changed:
+                    fresh = load_script(script)
+                    for name in carry:
+                        getattr(fresh, name).update(getattr(module, name))
+                    module = fresh
+                latest = jobs(module)
+                reasons = {key: changed_parts(current.get(key), inputs) for key, inputs in latest.items()}
+                todo = [key for key, parts in reasons.items() if parts]
+                if todo:
+                    _build(module, todo, reasons, render, built)
+                else:
+                    log("No output affected")
+                current = latest
+            except Exception:
+                traceback.print_exc()
+                log("Build failed; fix the error and save again")
+    except KeyboardInterrupt:
+        log("Stopped")
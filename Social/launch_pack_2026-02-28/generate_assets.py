@@ -2,15 +2,17 @@
 """
 Generate Untwist launch social assets (IG + X + profile).
 
-Outputs:
-- images/instagram/*.png   (1080x1350)
-- images/x/*.png           (1600x900 + 1500x500 header)
+Outputs (encoded by render_kit.encode: JPEG under each network's size limit
+for posts, lossless PNG for profile images):
+- images/instagram/*.jpg   (1080x1350)
+- images/x/*.jpg           (1600x900 + 1500x500 header)
 - images/profile/*.png     (1024x1024)
 """
 
 from __future__ import annotations
 
 from pathlib import Path
+import sys
 from typing import Iterable
 
 from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
@@ -18,6 +20,13 @@ from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
 
 THIS_DIR = Path(__file__).resolve().parent
 ROOT = THIS_DIR.parents[1]
+sys.path.insert(0, str(ROOT / "AppStore"))
+
+from render_kit import SoftShape, fonts, soft_layer, trace, vertical_gradient  # noqa: E402
+from render_kit.device_frame import SOCIAL_FRAME, frame_template, place_phone  # noqa: E402
+from render_kit.encode import INSTAGRAM, LOSSLESS, X, write_output  # noqa: E402
+from render_kit.image_cache import fit_cached  # noqa: E402
+
 OUT_IG = THIS_DIR / "images" / "instagram"
 OUT_X = THIS_DIR / "images" / "x"
 OUT_PROFILE = THIS_DIR / "images" / "profile"
@@ -159,42 +168,28 @@ def pick_path(candidates: Iterable[str]) -> Path:
 
 def load_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
     if bold:
-        candidates = [
+        preferred = [
             "/Library/Fonts/SF-Pro-Display-Black.otf",
             "/Library/Fonts/SF-Pro-Display-Bold.otf",
             "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
         ]
     else:
-        candidates = [
+        preferred = [
             "/Library/Fonts/SF-Pro-Text-Regular.otf",
             "/System/Library/Fonts/Supplemental/Arial.ttf",
         ]
-
-    for font_path in candidates:
-        path = Path(font_path)
-        if path.exists():
-            try:
-                return ImageFont.truetype(str(path), size)
-            except OSError:
-                continue
-    return ImageFont.load_default()
+    return fonts.load_font("bold" if bold else "regular", size, preferred)
 
 
+@trace.stage
 def make_vertical_gradient(size: tuple[int, int], top: tuple[int, int, int], bottom: tuple[int, int, int]) -> Image.Image:
-    w, h = size
-    image = Image.new("RGB", size)
-    draw = ImageDraw.Draw(image)
-    for y in range(h):
-        t = y / max(1, h - 1)
-        color = tuple(int(top[i] * (1 - t) + bottom[i] * t) for i in range(3))
-        draw.line([(0, y), (w, y)], fill=color)
-    return image
+    return vertical_gradient(size, top, bottom, endpoint=True, blend="weighted")
 
 
+@trace.stage
 def draw_soft_blobs(canvas: Image.Image, palette: dict, seed: int) -> None:
     w, h = canvas.size
-    overlay = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
+    shapes = []
     blobs = [
         (int(w * 0.1), int(h * 0.08), int(w * 0.7), int(h * 0.45), 32),
         (int(w * 0.35), int(h * 0.55), int(w * 0.95), int(h * 0.98), 26),
@@ -202,11 +197,11 @@ def draw_soft_blobs(canvas: Image.Image, palette: dict, seed: int) -> None:
     for i, (x1, y1, x2, y2, alpha) in enumerate(blobs):
         a = alpha + (seed * 3 + i * 5) % 12
         color = (*palette["muted"], min(255, a))
-        draw.ellipse((x1, y1, x2, y2), fill=color)
-    overlay = overlay.filter(ImageFilter.GaussianBlur(radius=36))
-    canvas.alpha_composite(overlay)
+        shapes.append(SoftShape("ellipse", (x1, y1, x2, y2), color))
+    canvas.alpha_composite(soft_layer(canvas.size, shapes, 36))
 
 
+@trace.stage
 def wrap_text(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
     words = text.split()
     if not words:
@@ -226,54 +221,22 @@ def wrap_text(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont
     return lines
 
 
+@trace.stage
 def fit_source(path: Path, size: tuple[int, int]) -> Image.Image:
-    source = Image.open(path).convert("RGB")
-    return ImageOps.fit(source, size, method=Image.Resampling.LANCZOS)
+    fitted = fit_cached(path, size, mode="RGB", fit="cover")
+    if fitted is None:
+        raise FileNotFoundError(path)
+    return fitted
 
 
+@trace.stage
 def paste_phone(canvas: Image.Image, screenshot_path: Path, center_x: int, top_y: int, screen_w: int, screen_h: int) -> None:
-    bezel = int(screen_w * 0.045)
-    outer_radius = int(screen_w * 0.14)
-    inner_radius = int(screen_w * 0.11)
-    phone_w = screen_w + bezel * 2
-    phone_h = screen_h + bezel * 2
-    phone_x = center_x - phone_w // 2
-    phone_y = top_y
-
-    phone = Image.new("RGBA", (phone_w, phone_h), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(phone)
-    draw.rounded_rectangle((0, 0, phone_w - 1, phone_h - 1), radius=outer_radius, fill=(22, 22, 26, 255))
-    draw.rounded_rectangle((2, 2, phone_w - 3, phone_h - 3), radius=outer_radius, fill=(35, 35, 42, 255))
-    draw.rounded_rectangle((4, 4, phone_w - 5, phone_h - 5), radius=outer_radius - 2, fill=(18, 18, 22, 255))
-
-    screen_x = bezel
-    screen_y = bezel
-    draw.rounded_rectangle((screen_x, screen_y, screen_x + screen_w, screen_y + screen_h), radius=inner_radius, fill=(255, 255, 255, 255))
-
+    phone_w = frame_template(SOCIAL_FRAME, screen_w, screen_h).size[0]
     shot = fit_source(screenshot_path, (screen_w, screen_h)).convert("RGBA")
-    mask = Image.new("L", (screen_w, screen_h), 0)
-    ImageDraw.Draw(mask).rounded_rectangle((0, 0, screen_w - 1, screen_h - 1), radius=inner_radius, fill=255)
-    phone.paste(shot, (screen_x, screen_y), mask)
-
-    notch_w = int(screen_w * 0.3)
-    notch_h = int(screen_w * 0.08)
-    notch_x = phone_w // 2 - notch_w // 2
-    notch_y = bezel + int(screen_h * 0.02)
-    draw.rounded_rectangle(
-        (notch_x, notch_y, notch_x + notch_w, notch_y + notch_h),
-        radius=notch_h // 2,
-        fill=(10, 10, 14, 255),
-    )
-
-    shadow = Image.new("RGBA", (phone_w + 80, phone_h + 80), (0, 0, 0, 0))
-    sdraw = ImageDraw.Draw(shadow)
-    sdraw.rounded_rectangle((40, 40, 40 + phone_w - 1, 40 + phone_h - 1), radius=outer_radius, fill=(0, 0, 0, 95))
-    shadow = shadow.filter(ImageFilter.GaussianBlur(radius=22))
-
-    canvas.alpha_composite(shadow, (phone_x - 40, phone_y - 30))
-    canvas.alpha_composite(phone, (phone_x, phone_y))
+    place_phone(canvas, SOCIAL_FRAME, shot, center_x - phone_w // 2, top_y, screen_w, screen_h)
 
 
+@trace.stage
 def draw_cta(draw: ImageDraw.ImageDraw, text: str, center_x: int, y: int, font: ImageFont.FreeTypeFont, bg_color: tuple[int, int, int], text_color: tuple[int, int, int]) -> None:
     bbox = draw.textbbox((0, 0), text, font=font)
     tw = bbox[2] - bbox[0]
@@ -287,6 +250,7 @@ def draw_cta(draw: ImageDraw.ImageDraw, text: str, center_x: int, y: int, font:
     draw.text((center_x - tw // 2, y + (h - th) // 2 - 1), text, font=font, fill=text_color)
 
 
+@trace.stage
 def render_instagram_post(idx: int, cfg: dict) -> Path:
     size = (1080, 1350)
     palette = PALETTES[idx % len(PALETTES)]
@@ -318,11 +282,10 @@ def render_instagram_post(idx: int, cfg: dict) -> Path:
     paste_phone(bg, source, center_x=size[0] // 2, top_y=390, screen_w=430, screen_h=930)
     draw_cta(draw, cfg["cta"], center_x=size[0] // 2, y=1244, font=font_cta, bg_color=palette["cta"], text_color=palette["cta_text"])
 
-    output = OUT_IG / f"ig_{cfg['slug']}.png"
-    bg.convert("RGB").save(output, "PNG")
-    return output
+    return write_output(bg, OUT_IG / f"ig_{cfg['slug']}.jpg", INSTAGRAM).path
 
 
+@trace.stage
 def render_x_post(idx: int, cfg: dict) -> Path:
     size = (1600, 900)
     palette = PALETTES[(idx + 1) % len(PALETTES)]
@@ -356,28 +319,23 @@ def render_x_post(idx: int, cfg: dict) -> Path:
     paste_phone(bg, source, center_x=1240, top_y=75, screen_w=355, screen_h=770)
     draw_cta(draw, cfg["cta"], center_x=330, y=760, font=font_cta, bg_color=palette["cta"], text_color=palette["cta_text"])
 
-    output = OUT_X / f"x_{cfg['slug']}.png"
-    bg.convert("RGB").save(output, "PNG")
-    return output
+    return write_output(bg, OUT_X / f"x_{cfg['slug']}.jpg", X).path
 
 
+@trace.stage
 def render_profile_assets() -> list[Path]:
     outputs: list[Path] = []
 
     if APP_ICON.exists():
         square = Image.open(APP_ICON).convert("RGBA").resize((1024, 1024), Image.Resampling.LANCZOS)
-        square_path = OUT_PROFILE / "profile_square_appicon_1024.png"
-        square.save(square_path, "PNG")
-        outputs.append(square_path)
+        outputs.append(write_output(square, OUT_PROFILE / "profile_square_appicon_1024.png", LOSSLESS).path)
 
         # Circular-safe preview to check center composition.
         circle_bg = Image.new("RGBA", (1024, 1024), (255, 255, 255, 0))
         mask = Image.new("L", (1024, 1024), 0)
         ImageDraw.Draw(mask).ellipse((60, 60, 964, 964), fill=255)
         circle_bg.paste(square, (0, 0), mask)
-        circle_path = OUT_PROFILE / "profile_circle_preview_1024.png"
-        circle_bg.save(circle_path, "PNG")
-        outputs.append(circle_path)
+        outputs.append(write_output(circle_bg, OUT_PROFILE / "profile_circle_preview_1024.png", LOSSLESS).path)
 
     # X Header (1500x500)
     size = (1500, 500)
@@ -412,9 +370,7 @@ def render_profile_assets() -> list[Path]:
         header.alpha_composite(shadow, (60, 88))
         header.alpha_composite(twisty, (95, 95))
 
-    header_path = OUT_X / "x_header_1500x500.png"
-    header.convert("RGB").save(header_path, "PNG")
-    outputs.append(header_path)
+    outputs.append(write_output(header, OUT_X / "x_header_1500x500.jpg", X).path)
 
     return outputs
 
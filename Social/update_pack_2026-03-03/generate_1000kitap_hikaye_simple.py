@@ -6,8 +6,14 @@ only user message + home screen screenshot.
 
 from pathlib import Path
 import shutil
+import sys
 
-from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "AppStore"))
+
+from render_kit import fonts, trace  # noqa: E402
+from render_kit.image_cache import fit_cached  # noqa: E402
 
 
 OUT_DIR = Path("/Users/osmanseven/Untwist/Social/update_pack_2026-03-03/images/1000kitap")
@@ -48,20 +54,20 @@ VARIANTS = [
 
 
 def load_font(size: int, bold: bool = False):
-    paths = [
-        "/Library/Fonts/SF-Pro-Display-Bold.otf" if bold else "/Library/Fonts/SF-Pro-Text-Regular.otf",
-        "/System/Library/Fonts/Supplemental/Arial Bold.ttf" if bold else "/System/Library/Fonts/Supplemental/Arial.ttf",
-    ]
-    for p in paths:
-        fp = Path(p)
-        if fp.exists():
-            try:
-                return ImageFont.truetype(str(fp), size)
-            except OSError:
-                continue
-    return ImageFont.load_default()
-
-
+    if bold:
+        preferred = [
+            "/Library/Fonts/SF-Pro-Display-Bold.otf",
+            "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+        ]
+    else:
+        preferred = [
+            "/Library/Fonts/SF-Pro-Text-Regular.otf",
+            "/System/Library/Fonts/Supplemental/Arial.ttf",
+        ]
+    return fonts.load_font("bold" if bold else "regular", size, preferred)
+
+
+@trace.stage
 def wrap(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont, max_w: int):
     words = text.split()
     if not words:
@@ -79,6 +85,7 @@ def wrap(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont, max
     return lines
 
 
+@trace.stage
 def render(output_path: Path, paragraphs):
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -93,7 +100,9 @@ def render(output_path: Path, paragraphs):
             y += 62 if is_bold else 47
         y += 20
 
-    shot = ImageOps.fit(Image.open(SHOT).convert("RGB"), (952, 840), method=Image.Resampling.LANCZOS)
+    shot = fit_cached(SHOT, (952, 840), mode="RGB", fit="cover")
+    if shot is None:
+        raise FileNotFoundError(SHOT)
     mask = Image.new("L", (952, 840), 0)
     ImageDraw.Draw(mask).rounded_rectangle((0, 0, 951, 839), radius=36, fill=255)
 
@@ -4,8 +4,14 @@ Generate one minimal 1000Kitap visual with sincere copy + current home screensho
 """
 
 from pathlib import Path
+import sys
 
-from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "AppStore"))
+
+from render_kit import fonts, trace  # noqa: E402
+from render_kit.image_cache import fit_cached  # noqa: E402
 
 
 OUT = Path("/Users/osmanseven/Untwist/Social/update_pack_2026-03-03/images/1000kitap/1000kitap_minimal_1080x1350.png")
@@ -24,20 +30,20 @@ TEXT_BLOCKS = [
 
 
 def load_font(size: int, bold: bool = False):
-    paths = [
-        "/Library/Fonts/SF-Pro-Display-Bold.otf" if bold else "/Library/Fonts/SF-Pro-Text-Regular.otf",
-        "/System/Library/Fonts/Supplemental/Arial Bold.ttf" if bold else "/System/Library/Fonts/Supplemental/Arial.ttf",
-    ]
-    for p in paths:
-        fp = Path(p)
-        if fp.exists():
-            try:
-                return ImageFont.truetype(str(fp), size)
-            except OSError:
-                continue
-    return ImageFont.load_default()
-
-
+    if bold:
+        preferred = [
+            "/Library/Fonts/SF-Pro-Display-Bold.otf",
+            "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+        ]
+    else:
+        preferred = [
+            "/Library/Fonts/SF-Pro-Text-Regular.otf",
+            "/System/Library/Fonts/Supplemental/Arial.ttf",
+        ]
+    return fonts.load_font("bold" if bold else "regular", size, preferred)
+
+
+@trace.stage
 def wrap(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont, max_w: int):
     words = text.split()
     if not words:
@@ -70,7 +76,9 @@ def main():
         y += 18
 
     shot_h = 812
-    shot = ImageOps.fit(Image.open(SHOT).convert("RGB"), (952, shot_h), method=Image.Resampling.LANCZOS)
+    shot = fit_cached(SHOT, (952, shot_h), mode="RGB", fit="cover")
+    if shot is None:
+        raise FileNotFoundError(SHOT)
     mask = Image.new("L", (952, shot_h), 0)
     ImageDraw.Draw(mask).rounded_rectangle((0, 0, 951, shot_h - 1), radius=36, fill=255)
 
@@ -9,13 +9,20 @@ Output:
 from __future__ import annotations
 
 from pathlib import Path
+import sys
 from typing import Iterable
 
-from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFont
 
 
 THIS_DIR = Path(__file__).resolve().parent
 ROOT = THIS_DIR.parents[1]
+sys.path.insert(0, str(ROOT / "AppStore"))
+
+from render_kit import fonts, trace  # noqa: E402
+from render_kit.device_frame import KITAP_FRAME, place_phone  # noqa: E402
+from render_kit.image_cache import fit_cached  # noqa: E402
+
 OUT_DIR = THIS_DIR / "images" / "1000kitap"
 OUT_PATH = OUT_DIR / "1000kitap_samimi_paylasim_1080x1350.png"
 
@@ -41,28 +48,27 @@ def pick_path(candidates: Iterable[str]) -> Path:
 
 def load_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
     if bold:
-        font_paths = [
+        preferred = [
             "/Library/Fonts/SF-Pro-Display-Bold.otf",
             "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
         ]
     else:
-        font_paths = [
+        preferred = [
             "/Library/Fonts/SF-Pro-Text-Regular.otf",
             "/System/Library/Fonts/Supplemental/Arial.ttf",
         ]
-    for p in font_paths:
-        if Path(p).exists():
-            try:
-                return ImageFont.truetype(p, size)
-            except OSError:
-                continue
-    return ImageFont.load_default()
+    return fonts.load_font("bold" if bold else "regular", size, preferred)
 
 
+@trace.stage
 def fit_image(path: Path, size: tuple[int, int]) -> Image.Image:
-    return ImageOps.fit(Image.open(path).convert("RGB"), size, method=Image.Resampling.LANCZOS)
+    fitted = fit_cached(path, size, mode="RGB", fit="cover")
+    if fitted is None:
+        raise FileNotFoundError(path)
+    return fitted
 
 
+@trace.stage
 def wrap_text(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
     words = text.split()
     if not words:
@@ -81,36 +87,10 @@ def wrap_text(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont
     return lines
 
 
+@trace.stage
 def draw_phone(canvas: Image.Image, screenshot_path: Path, x: int, y: int, screen_w: int, screen_h: int) -> None:
-    bezel = int(screen_w * 0.045)
-    outer_radius = int(screen_w * 0.14)
-    inner_radius = int(screen_w * 0.11)
-    phone_w = screen_w + bezel * 2
-    phone_h = screen_h + bezel * 2
-
-    phone = Image.new("RGBA", (phone_w, phone_h), (0, 0, 0, 0))
-    pd = ImageDraw.Draw(phone)
-    pd.rounded_rectangle((0, 0, phone_w - 1, phone_h - 1), radius=outer_radius, fill=(16, 18, 22, 255))
-    pd.rounded_rectangle((3, 3, phone_w - 4, phone_h - 4), radius=outer_radius - 2, fill=(29, 31, 36, 255))
-
     shot = fit_image(screenshot_path, (screen_w, screen_h)).convert("RGBA")
-    mask = Image.new("L", (screen_w, screen_h), 0)
-    ImageDraw.Draw(mask).rounded_rectangle((0, 0, screen_w - 1, screen_h - 1), radius=inner_radius, fill=255)
-    phone.paste(shot, (bezel, bezel), mask)
-
-    notch_w = int(screen_w * 0.3)
-    notch_h = int(screen_w * 0.08)
-    notch_x = phone_w // 2 - notch_w // 2
-    notch_y = bezel + int(screen_h * 0.02)
-    pd.rounded_rectangle((notch_x, notch_y, notch_x + notch_w, notch_y + notch_h), radius=notch_h // 2, fill=(9, 9, 11, 255))
-
-    shadow = Image.new("RGBA", (phone_w + 60, phone_h + 60), (0, 0, 0, 0))
-    sd = ImageDraw.Draw(shadow)
-    sd.rounded_rectangle((30, 30, 30 + phone_w - 1, 30 + phone_h - 1), radius=outer_radius, fill=(0, 0, 0, 80))
-    shadow = shadow.filter(ImageFilter.GaussianBlur(radius=14))
-
-    canvas.alpha_composite(shadow, (x - 30, y - 24))
-    canvas.alpha_composite(phone, (x, y))
+    place_phone(canvas, KITAP_FRAME, shot, x, y, screen_w, screen_h)
 
 
 def main() -> None:
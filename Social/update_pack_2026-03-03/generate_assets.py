@@ -3,14 +3,26 @@
 Generate Untwist v1.1 social assets (Instagram + X + 1000Kitap).
 
 Outputs:
-- images/instagram/*.png  (1080x1350)
-- images/x/*.png          (1600x900 + 1500x500 header)
+- images/instagram/*.jpg  (1080x1350)
+- images/x/*.jpg          (1600x900 + 1500x500 header)
 - images/1000kitap/*.png  (1080x1350, 1080x1080, 1200x628)
+
+Encoders come from render_kit.encode: JPEG within each channel's upload
+limit for Instagram and X (PNGs of these were 2-3x larger), lossless PNG
+for 1000Kitap. Files are encoded on background threads while the next
+image renders, and files whose bytes would not change are not rewritten.
+
+--watch stays running and re-renders only the images whose post, palette,
+code or source images change (see AppStore/render_kit/watch.py).
 """
 
 from __future__ import annotations
 
+import argparse
+from concurrent.futures import Future
+import inspect
 from pathlib import Path
+import sys
 from typing import Iterable
 
 from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
@@ -18,9 +30,18 @@ from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
 
 THIS_DIR = Path(__file__).resolve().parent
 ROOT = THIS_DIR.parents[1]
+sys.path.insert(0, str(ROOT / "AppStore"))
+
+from render_kit import SoftShape, fonts, soft_layer, trace, vertical_gradient  # noqa: E402
+from render_kit.device_frame import SOCIAL_FRAME, frame_template, place_phone  # noqa: E402
+from render_kit.encode import INSTAGRAM, LOSSLESS, X, OutputWriter  # noqa: E402
+from render_kit.image_cache import default_cache, fit_cached  # noqa: E402
+from render_kit.watch import serve  # noqa: E402
+
 OUT_IG = THIS_DIR / "images" / "instagram"
 OUT_X = THIS_DIR / "images" / "x"
 OUT_1000KITAP = THIS_DIR / "images" / "1000kitap"
+SCREENSHOTS = ROOT / "AppStore" / "screenshots"
 
 
 PALETTES = [
@@ -122,42 +143,28 @@ def pick_path(candidates: Iterable[str]) -> Path:
 
 def load_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
     if bold:
-        candidates = [
+        preferred = [
             "/Library/Fonts/SF-Pro-Display-Black.otf",
             "/Library/Fonts/SF-Pro-Display-Bold.otf",
             "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
         ]
     else:
-        candidates = [
+        preferred = [
             "/Library/Fonts/SF-Pro-Text-Regular.otf",
             "/System/Library/Fonts/Supplemental/Arial.ttf",
         ]
-
-    for font_path in candidates:
-        path = Path(font_path)
-        if path.exists():
-            try:
-                return ImageFont.truetype(str(path), size)
-            except OSError:
-                continue
-    return ImageFont.load_default()
+    return fonts.load_font("bold" if bold else "regular", size, preferred)
 
 
+@trace.stage
 def make_vertical_gradient(size: tuple[int, int], top: tuple[int, int, int], bottom: tuple[int, int, int]) -> Image.Image:
-    w, h = size
-    image = Image.new("RGB", size)
-    draw = ImageDraw.Draw(image)
-    for y in range(h):
-        t = y / max(1, h - 1)
-        color = tuple(int(top[i] * (1 - t) + bottom[i] * t) for i in range(3))
-        draw.line([(0, y), (w, y)], fill=color)
-    return image
+    return vertical_gradient(size, top, bottom, endpoint=True, blend="weighted")
 
 
+@trace.stage
 def draw_soft_blobs(canvas: Image.Image, palette: dict, seed: int) -> None:
     w, h = canvas.size
-    overlay = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
+    shapes = []
     blobs = [
         (int(w * 0.1), int(h * 0.08), int(w * 0.7), int(h * 0.45), 32),
         (int(w * 0.35), int(h * 0.55), int(w * 0.95), int(h * 0.98), 26),
@@ -165,11 +172,11 @@ def draw_soft_blobs(canvas: Image.Image, palette: dict, seed: int) -> None:
     for i, (x1, y1, x2, y2, alpha) in enumerate(blobs):
         a = alpha + (seed * 3 + i * 5) % 12
         color = (*palette["muted"], min(255, a))
-        draw.ellipse((x1, y1, x2, y2), fill=color)
-    overlay = overlay.filter(ImageFilter.GaussianBlur(radius=36))
-    canvas.alpha_composite(overlay)
+        shapes.append(SoftShape("ellipse", (x1, y1, x2, y2), color))
+    canvas.alpha_composite(soft_layer(canvas.size, shapes, 36))
 
 
+@trace.stage
 def wrap_text(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
     words = text.split()
     if not words:
@@ -189,53 +196,22 @@ def wrap_text(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont
     return lines
 
 
+@trace.stage
 def fit_source(path: Path, size: tuple[int, int]) -> Image.Image:
-    source = Image.open(path).convert("RGB")
-    return ImageOps.fit(source, size, method=Image.Resampling.LANCZOS)
+    fitted = fit_cached(path, size, mode="RGB", fit="cover")
+    if fitted is None:
+        raise FileNotFoundError(path)
+    return fitted
 
 
+@trace.stage
 def paste_phone(canvas: Image.Image, screenshot_path: Path, center_x: int, top_y: int, screen_w: int, screen_h: int) -> None:
-    bezel = int(screen_w * 0.045)
-    outer_radius = int(screen_w * 0.14)
-    inner_radius = int(screen_w * 0.11)
-    phone_w = screen_w + bezel * 2
-    phone_h = screen_h + bezel * 2
-    phone_x = center_x - phone_w // 2
-
-    phone = Image.new("RGBA", (phone_w, phone_h), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(phone)
-    draw.rounded_rectangle((0, 0, phone_w - 1, phone_h - 1), radius=outer_radius, fill=(22, 22, 26, 255))
-    draw.rounded_rectangle((2, 2, phone_w - 3, phone_h - 3), radius=outer_radius, fill=(35, 35, 42, 255))
-    draw.rounded_rectangle((4, 4, phone_w - 5, phone_h - 5), radius=outer_radius - 2, fill=(18, 18, 22, 255))
-
-    screen_x = bezel
-    screen_y = bezel
-    draw.rounded_rectangle((screen_x, screen_y, screen_x + screen_w, screen_y + screen_h), radius=inner_radius, fill=(255, 255, 255, 255))
-
+    phone_w = frame_template(SOCIAL_FRAME, screen_w, screen_h).size[0]
     shot = fit_source(screenshot_path, (screen_w, screen_h)).convert("RGBA")
-    mask = Image.new("L", (screen_w, screen_h), 0)
-    ImageDraw.Draw(mask).rounded_rectangle((0, 0, screen_w - 1, screen_h - 1), radius=inner_radius, fill=255)
-    phone.paste(shot, (screen_x, screen_y), mask)
-
-    notch_w = int(screen_w * 0.3)
-    notch_h = int(screen_w * 0.08)
-    notch_x = phone_w // 2 - notch_w // 2
-    notch_y = bezel + int(screen_h * 0.02)
-    draw.rounded_rectangle(
-        (notch_x, notch_y, notch_x + notch_w, notch_y + notch_h),
-        radius=notch_h // 2,
-        fill=(10, 10, 14, 255),
-    )
-
-    shadow = Image.new("RGBA", (phone_w + 80, phone_h + 80), (0, 0, 0, 0))
-    sdraw = ImageDraw.Draw(shadow)
-    sdraw.rounded_rectangle((40, 40, 40 + phone_w - 1, 40 + phone_h - 1), radius=outer_radius, fill=(0, 0, 0, 95))
-    shadow = shadow.filter(ImageFilter.GaussianBlur(radius=22))
-
-    canvas.alpha_composite(shadow, (phone_x - 40, top_y - 30))
-    canvas.alpha_composite(phone, (phone_x, top_y))
+    place_phone(canvas, SOCIAL_FRAME, shot, center_x - phone_w // 2, top_y, screen_w, screen_h)
 
 
+@trace.stage
 def draw_cta(draw: ImageDraw.ImageDraw, text: str, center_x: int, y: int, font: ImageFont.FreeTypeFont, bg_color: tuple[int, int, int], text_color: tuple[int, int, int]) -> None:
     bbox = draw.textbbox((0, 0), text, font=font)
     tw = bbox[2] - bbox[0]
@@ -249,7 +225,8 @@ def draw_cta(draw: ImageDraw.ImageDraw, text: str, center_x: int, y: int, font:
     draw.text((center_x - tw // 2, y + (h - th) // 2 - 1), text, font=font, fill=text_color)
 
 
-def render_instagram_post(idx: int, cfg: dict) -> Path:
+@trace.stage
+def render_instagram_post(idx: int, cfg: dict, writer: OutputWriter) -> Future:
     size = (1080, 1350)
     palette = PALETTES[idx % len(PALETTES)]
     bg = make_vertical_gradient(size, palette["top"], palette["bottom"]).convert("RGBA")
@@ -280,12 +257,11 @@ def render_instagram_post(idx: int, cfg: dict) -> Path:
     paste_phone(bg, source, center_x=size[0] // 2, top_y=390, screen_w=430, screen_h=930)
     draw_cta(draw, cfg["cta"], center_x=size[0] // 2, y=1244, font=font_cta, bg_color=palette["cta"], text_color=palette["cta_text"])
 
-    output = OUT_IG / f"ig_{cfg['slug']}.png"
-    bg.convert("RGB").save(output, "PNG")
-    return output
+    return writer.submit(bg, OUT_IG / f"ig_{cfg['slug']}.jpg", INSTAGRAM)
 
 
-def render_x_post(idx: int, cfg: dict) -> Path:
+@trace.stage
+def render_x_post(idx: int, cfg: dict, writer: OutputWriter) -> Future:
     size = (1600, 900)
     palette = PALETTES[(idx + 1) % len(PALETTES)]
     bg = make_vertical_gradient(size, palette["top"], palette["bottom"]).convert("RGBA")
@@ -318,12 +294,11 @@ def render_x_post(idx: int, cfg: dict) -> Path:
     paste_phone(bg, source, center_x=1240, top_y=75, screen_w=355, screen_h=770)
     draw_cta(draw, cfg["cta"], center_x=330, y=760, font=font_cta, bg_color=palette["cta"], text_color=palette["cta_text"])
 
-    output = OUT_X / f"x_{cfg['slug']}.png"
-    bg.convert("RGB").save(output, "PNG")
-    return output
+    return writer.submit(bg, OUT_X / f"x_{cfg['slug']}.jpg", X)
 
 
-def render_x_header() -> Path:
+@trace.stage
+def render_x_header(writer: OutputWriter) -> Future:
     size = (1500, 500)
     palette = PALETTES[2]
     header = make_vertical_gradient(size, palette["top"], palette["bottom"]).convert("RGBA")
@@ -360,13 +335,12 @@ def render_x_header() -> Path:
         icon = ImageOps.contain(icon, (240, 240), Image.Resampling.LANCZOS)
         header.alpha_composite(icon, (120, 130))
 
-    output = OUT_X / "x_header_v11_1500x500.png"
-    header.convert("RGB").save(output, "PNG")
-    return output
+    return writer.submit(header, OUT_X / "x_header_v11_1500x500.jpg", X)
 
 
-def render_1000kitap_assets() -> list[Path]:
-    outputs: list[Path] = []
+@trace.stage
+def render_1000kitap_assets(writer: OutputWriter) -> list[Future]:
+    outputs: list[Future] = []
 
     # Feed creative (1080x1350)
     size = (1080, 1350)
@@ -399,9 +373,7 @@ def render_1000kitap_assets() -> list[Path]:
     paste_phone(feed, source, center_x=size[0] // 2, top_y=410, screen_w=420, screen_h=900)
     draw_cta(draw, "Untwist'i dene", center_x=size[0] // 2, y=1240, font=cta_font, bg_color=palette["cta"], text_color=palette["cta_text"])
 
-    out_feed = OUT_1000KITAP / "1000kitap_feed_1080x1350.png"
-    feed.convert("RGB").save(out_feed, "PNG")
-    outputs.append(out_feed)
+    outputs.append(writer.submit(feed.convert("RGB"), OUT_1000KITAP / "1000kitap_feed_1080x1350.png", LOSSLESS))
 
     # Square creative (1080x1080)
     size = (1080, 1080)
@@ -434,9 +406,7 @@ def render_1000kitap_assets() -> list[Path]:
     paste_phone(square, source, center_x=820, top_y=120, screen_w=250, screen_h=540)
     draw_cta(draw, "Ücretsiz indir", center_x=330, y=930, font=cta_font, bg_color=palette["cta"], text_color=palette["cta_text"])
 
-    out_square = OUT_1000KITAP / "1000kitap_square_1080x1080.png"
-    square.convert("RGB").save(out_square, "PNG")
-    outputs.append(out_square)
+    outputs.append(writer.submit(square.convert("RGB"), OUT_1000KITAP / "1000kitap_square_1080x1080.png", LOSSLESS))
 
     # Banner creative (1200x628)
     size = (1200, 628)
@@ -469,33 +439,84 @@ def render_1000kitap_assets() -> list[Path]:
     paste_phone(banner, source, center_x=960, top_y=54, screen_w=210, screen_h=455)
     draw_cta(draw, "Şimdi indir", center_x=250, y=538, font=cta_font, bg_color=palette["cta"], text_color=palette["cta_text"])
 
-    out_banner = OUT_1000KITAP / "1000kitap_banner_1200x628.png"
-    banner.convert("RGB").save(out_banner, "PNG")
-    outputs.append(out_banner)
+    outputs.append(writer.submit(banner.convert("RGB"), OUT_1000KITAP / "1000kitap_banner_1200x628.png", LOSSLESS))
 
     return outputs
 
 
+def job_keys() -> list[tuple]:
+    return ([("instagram", i) for i in range(len(POSTS))] + [("x", i) for i in range(len(POSTS[:5]))]
+            + [("x_header",), ("1000kitap",)])
+
+
+def render_job(key: tuple, writer: OutputWriter) -> list[Future]:
+    """One ("instagram", idx), ("x", idx), ("x_header",) or ("1000kitap",) job."""
+    kind = key[0]
+    if kind == "instagram":
+        return [render_instagram_post(key[1], POSTS[key[1]], writer)]
+    if kind == "x":
+        return [render_x_post(key[1], POSTS[key[1]], writer)]
+    if kind == "x_header":
+        return [render_x_header(writer)]
+    return render_1000kitap_assets(writer)
+
+
+def job_inputs() -> dict[tuple, dict]:
+    """Every job's inputs by name, for --watch."""
+    digest = default_cache().digest
+    helpers = [inspect.getsource(fn) for fn in (
+        pick_path, load_font, make_vertical_gradient, draw_soft_blobs, wrap_text, fit_source, paste_phone, draw_cta,
+    )]
+
+    def post_inputs(cfg: dict, palette: dict, render) -> dict:
+        return {
+            "post": cfg,
+            "palette": palette,
+            "screenshots": [digest(str(ROOT / c)) for c in cfg["source_candidates"]],
+            "code": helpers + [inspect.getsource(render)],
+        }
+
+    jobs = {}
+    for key in job_keys():
+        if key[0] == "instagram":
+            jobs[key] = post_inputs(POSTS[key[1]], PALETTES[key[1] % len(PALETTES)], render_instagram_post)
+        elif key[0] == "x":
+            jobs[key] = post_inputs(POSTS[key[1]], PALETTES[(key[1] + 1) % len(PALETTES)], render_x_post)
+    jobs[("x_header",)] = {
+        "palette": PALETTES[2],
+        "artwork": [digest(str(p)) for p in (TWISTY_WAVING, TWISTY_CALM, APP_ICON)],
+        "code": helpers + [inspect.getsource(render_x_header)],
+    }
+    jobs[("1000kitap",)] = {
+        "palettes": [PALETTES[3], PALETTES[1], PALETTES[0]],
+        "screenshots": {p.name: digest(str(p)) for p in sorted(SCREENSHOTS.glob("*.png"))},
+        "code": helpers + [inspect.getsource(render_1000kitap_assets)],
+    }
+    return jobs
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate Untwist v1.1 social assets")
+    parser.add_argument("--watch", action="store_true",
+                        help="Stay running and re-render images whose post, palette, code or sources change")
+    parser.add_argument("--trace", metavar="OUT.json",
+                        help="Write a Chrome trace of every render stage (read by render_kit.trace)")
+    args = parser.parse_args()
     ensure_dirs()
 
-    ig_outputs = [render_instagram_post(i, cfg) for i, cfg in enumerate(POSTS)]
-    x_outputs = [render_x_post(i, cfg) for i, cfg in enumerate(POSTS[:5])]
-    x_header = render_x_header()
-    kitapk_outputs = render_1000kitap_assets()
-
-    print("Generated Instagram images:")
-    for path in ig_outputs:
-        print(f"  - {path.relative_to(THIS_DIR)}")
+    if args.watch:
+        serve(sys.modules[__name__], [SCREENSHOTS], lambda m: m.job_inputs(),
+              lambda m, key, writer: m.render_job(key, writer))
+        return
 
-    print("\nGenerated X images:")
-    for path in x_outputs:
-        print(f"  - {path.relative_to(THIS_DIR)}")
-    print(f"  - {x_header.relative_to(THIS_DIR)}")
+    with OutputWriter() as writer:
+        pending = [future for key in job_keys() for future in render_job(key, writer)]
 
-    print("\nGenerated 1000Kitap images:")
-    for path in kitapk_outputs:
-        print(f"  - {path.relative_to(THIS_DIR)}")
+    print("Generated images:")
+    for future in pending:
+        result = future.result()
+        state = f"{result.size // 1024} KB, {result.encoding}" if result.written else "unchanged"
+        print(f"  - {result.path.relative_to(THIS_DIR)} ({state})")
 
 
 if __name__ == "__main__":
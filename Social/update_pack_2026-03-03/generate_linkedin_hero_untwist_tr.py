@@ -4,8 +4,9 @@ Generate a simple LinkedIn hero visual for Untwist (TR).
 """
 
 from pathlib import Path
+import sys
 
-from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
 
 
 OUT = Path("/Users/osmanseven/Untwist/Social/update_pack_2026-03-03/images/1000kitap/Untwist_LinkedIn_Hero_TR.png")
@@ -13,23 +14,30 @@ SHOT = Path("/Users/osmanseven/Untwist/AppStore/screenshots/Simulator Screenshot
 ICON = Path("/Users/osmanseven/Untwist/Untwist/Resources/Assets.xcassets/AppIcon.appiconset/AppIcon.png")
 
 W, H = 1200, 628
+PHONE_SCREEN = (226, 488)
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "AppStore"))
 
-def load_font(size: int, bold: bool = False):
-    candidates = [
-        "/Library/Fonts/SF-Pro-Display-Bold.otf" if bold else "/Library/Fonts/SF-Pro-Text-Regular.otf",
-        "/System/Library/Fonts/Supplemental/Arial Bold.ttf" if bold else "/System/Library/Fonts/Supplemental/Arial.ttf",
-    ]
-    for path in candidates:
-        p = Path(path)
-        if p.exists():
-            try:
-                return ImageFont.truetype(str(p), size)
-            except OSError:
-                pass
-    return ImageFont.load_default()
+from render_kit import fonts, trace  # noqa: E402
+from render_kit.device_frame import LINKEDIN_FRAME, place_phone  # noqa: E402
+from render_kit.image_cache import fit_cached  # noqa: E402
 
 
+def load_font(size: int, bold: bool = False):
+    if bold:
+        preferred = [
+            "/Library/Fonts/SF-Pro-Display-Bold.otf",
+            "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+        ]
+    else:
+        preferred = [
+            "/Library/Fonts/SF-Pro-Text-Regular.otf",
+            "/System/Library/Fonts/Supplemental/Arial.ttf",
+        ]
+    return fonts.load_font("bold" if bold else "regular", size, preferred)
+
+
+@trace.stage
 def make_bg():
     grad = Image.linear_gradient("L").resize((W, H))
     bg = ImageOps.colorize(grad, "#0A1628", "#1C4D87").convert("RGBA")
@@ -42,6 +50,7 @@ def make_bg():
     return bg
 
 
+@trace.stage
 def wrap(draw: ImageDraw.ImageDraw, text: str, font, max_w: int):
     words = text.split()
     if not words:
@@ -59,6 +68,7 @@ def wrap(draw: ImageDraw.ImageDraw, text: str, font, max_w: int):
     return lines
 
 
+@trace.stage
 def draw_button(draw: ImageDraw.ImageDraw, box, text: str):
     draw.rounded_rectangle(box, radius=14, fill="#0A84FF")
     font = load_font(20, bold=True)
@@ -68,27 +78,15 @@ def draw_button(draw: ImageDraw.ImageDraw, box, text: str):
     draw.text((x1 + (x2 - x1 - tw) / 2, y1 + (y2 - y1 - th) / 2 - 1), text, fill="white", font=font)
 
 
-def build_phone():
-    screen_w, screen_h = 226, 488
-    body_w, body_h = screen_w + 16, screen_h + 16
-    phone = Image.new("RGBA", (body_w, body_h), (0, 0, 0, 0))
-    d = ImageDraw.Draw(phone)
-
-    d.rounded_rectangle((0, 0, body_w - 1, body_h - 1), radius=40, fill="#05070B")
-    d.rounded_rectangle((2, 2, body_w - 3, body_h - 3), radius=38, outline=(255, 255, 255, 28), width=1)
-
-    shot = ImageOps.fit(Image.open(SHOT).convert("RGB"), (screen_w, screen_h), method=Image.Resampling.LANCZOS)
-    mask = Image.new("L", (screen_w, screen_h), 0)
-    ImageDraw.Draw(mask).rounded_rectangle((0, 0, screen_w - 1, screen_h - 1), radius=30, fill=255)
-    phone.paste(shot, (8, 8), mask)
-
-    notch = Image.new("RGBA", (112, 26), (0, 0, 0, 0))
-    nd = ImageDraw.Draw(notch)
-    nd.rounded_rectangle((0, 0, 111, 25), radius=13, fill="#020305")
-    phone.alpha_composite(notch, ((body_w - 112) // 2, 10))
-    return phone.rotate(-6, resample=Image.Resampling.BICUBIC, expand=True)
+@trace.stage
+def build_phone_screen():
+    shot = fit_cached(SHOT, PHONE_SCREEN, mode="RGB", fit="cover")
+    if shot is None:
+        raise FileNotFoundError(SHOT)
+    return shot
 
 
+@trace.stage
 def draw_copy(draw: ImageDraw.ImageDraw):
     badge_font = load_font(13, bold=True)
     title_font = load_font(74, bold=True)
@@ -109,6 +107,7 @@ def draw_copy(draw: ImageDraw.ImageDraw):
     draw_button(draw, (56, 542, 314, 602), "Untwist'i İncele")
 
 
+@trace.stage
 def draw_brand(draw: ImageDraw.ImageDraw, canvas: Image.Image):
     icon = ImageOps.fit(Image.open(ICON).convert("RGB"), (36, 36), method=Image.Resampling.LANCZOS).convert("RGBA")
     mask = Image.new("L", (36, 36), 0)
@@ -125,15 +124,7 @@ def main():
     draw = ImageDraw.Draw(canvas)
     draw_copy(draw)
 
-    phone = build_phone()
-    shadow = Image.new("RGBA", phone.size, (0, 0, 0, 0))
-    sd = ImageDraw.Draw(shadow)
-    sd.rounded_rectangle((22, 34, phone.size[0] - 10, phone.size[1] - 10), radius=60, fill=(0, 0, 0, 120))
-    shadow = shadow.filter(ImageFilter.GaussianBlur(16))
-
-    px, py = 882, 38
-    canvas.alpha_composite(shadow, (px - 18, py + 20))
-    canvas.alpha_composite(phone, (px, py))
+    place_phone(canvas, LINKEDIN_FRAME, build_phone_screen(), 882, 38, *PHONE_SCREEN)
     draw_brand(draw, canvas)
 
     canvas.convert("RGB").save(OUT, "PNG")